@@ -1,12 +1,48 @@
 """Pulsera server configuration via Pydantic Settings."""
 
+import tempfile
+from pathlib import Path
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite+aiosqlite:///./pulsera.db"
 
-    PULSENET_CHECKPOINT_DIR: str = "checkpoints"
+    PULSENET_CHECKPOINT_DIR: str = "checkpoints"  # also the model registry root (versions/<version>/)
+    PULSENET_ADMIN_TOKEN: str = ""  # required as X-Admin-Token on model admin endpoints ("" = endpoints disabled)
+    PULSENET_BATCH_MAX_SIZE: int = 32  # 1 disables micro-batching
+    PULSENET_BATCH_MAX_WAIT_MS: float = 2.0
+    PULSENET_EXECUTOR_WORKERS: int = 2  # in-process inference threads (concurrent batches)
+    PULSENET_TORCH_THREADS: int = 0  # torch intra-op threads (0 = torch default)
+    PULSENET_AUTOTUNE: bool = False  # benchmark executor/threads/batch size at startup and keep the fastest
+    PULSENET_AUTOTUNE_PIN: str = ""  # comma-separated of executor_workers,torch_threads,max_batch_size to keep as configured
+    PULSENET_DATA_CACHE_DIR: str = str(Path(tempfile.gettempdir()) / "pulsenet-data-cache")  # memory-mapped synthetic datasets ("" = off)
+    PULSENET_MODEL_VARIANT: str = "full"  # "full" | "tiny" (distilled student)
+    PULSENET_BACKEND: str = "torch"  # "torch" | "torch_int8" | "onnx" | "numpy"
+    PULSENET_PROCESS_WORKERS: int = 0  # 0 = in-process thread pool
+    PULSENET_INCREMENTAL_PROJECTION: bool = False  # cache projected readings per device
+    PULSENET_PREFILTER: bool = False  # EWMA z-score gate before PulseNet on streaming ingest
+    PULSENET_PREFILTER_Z: float = 4.0
+    PULSENET_PREFILTER_MAX_SKIP: int = 30  # force a real inference after this many skipped windows
+    PULSENET_PREFILTER_DECAY: float = 0.95  # per-skip decay of the reused score
+    PULSENET_EARLY_EXIT: bool = False  # stop at confident exit heads (checkpoints trained with them)
+    PULSENET_EARLY_EXIT_LOW: float = 0.1
+    PULSENET_EARLY_EXIT_HIGH: float = 0.9
+    PULSENET_ADAPTIVE_CADENCE: bool = False  # score healthy devices every N readings instead of every reading
+    PULSENET_CADENCE_MIN_STRIDE: int = 1
+    PULSENET_CADENCE_MAX_STRIDE: int = 8
+    PULSENET_CADENCE_LOW_SCORE: float = 0.2  # below this, a device's stride keeps growing
+    PULSENET_COALESCE: bool = False  # per device, only the newest window waiting behind an in-flight inference is scored
+    PULSENET_PRIORITY_SCORE: float = 0.5  # last max score that puts a device in the urgent inference lane
+    PULSENET_ROUTINE_MAX_WAIT_MS: float = 50.0  # routine batches waiting this long are served before urgent ones
+    PULSENET_SLOW_INFERENCE_MS: float = 0.0  # log a per-stage breakdown for batches slower than this (0 = off)
+    PULSENET_RESULT_CACHE_SIZE: int = 0  # LRU entries keyed by quantised window content (0 = off)
+    PULSENET_RESULT_CACHE_TTL_S: float = 30.0
+    PULSENET_RESULT_CACHE_QUANTUM: float = 1e-3  # windows equal at this resolution share a cached result
+    PULSENET_SHADOW_VERSION: str = ""  # registry version scored alongside the primary model ("" = off)
+    PULSENET_SHADOW_SAMPLE_RATE: float = 0.1  # fraction of primary inferences mirrored to the shadow
+    PULSENET_SHADOW_QUEUE_SIZE: int = 64  # pending shadow windows before new ones are dropped
 
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:3001"]
 
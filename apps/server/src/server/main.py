@@ -36,6 +36,7 @@ async def lifespan(app: FastAPI):
     logger.info("PulseNet inference service initialized")
     yield
     logger.info("Shutting down Pulsera server...")
+    await anomaly_detection_service.shutdown()
 
 
 app = FastAPI(
@@ -0,0 +1,153 @@
+"""
+Startup autotuner for PulseNet inference concurrency.
+
+The best executor size, torch intra-op thread count and micro-batch limit
+depend on the host: a laptop wants a couple of threads, a 32-core node
+wants several executor threads each running multi-threaded forwards. The
+tuner runs short concurrent benchmarks through the live service and keeps
+the fastest configuration:
+
+  1. (intra-op threads, executor workers) pairs that fit the core count,
+     at the current batch limit
+  2. max batch sizes, at the best pair
+
+A candidate only replaces the current best if it is at least `min_gain`
+faster, so noise does not push the choice toward larger settings.
+Parameters listed in `pinned` keep their configured values. With worker
+processes enabled, the executor and thread count are not tuned because
+the workers do the scoring.
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+import numpy as np
+
+from .dataset import HELD_OUT_SEED, PulseNetDataset
+from .inference import PulseNetInferenceService, ResultDetail
+
+try:
+    import torch
+except ImportError:  # serving-only install
+    torch = None
+
+logger = logging.getLogger(__name__)
+
+TUNABLE = ("executor_workers", "torch_threads", "max_batch_size")
+
+
+def _powers_of_two(limit: int) -> list[int]:
+    values, v = [], 1
+    while v <= limit:
+        values.append(v)
+        v *= 2
+    return values
+
+
+def candidate_pairs(cpu_count: int, max_executor_workers: int = 8) -> list[tuple[int, int]]:
+    """(torch_threads, executor_workers) pairs using at most `cpu_count` cores, smallest first."""
+    pairs = []
+    for threads in _powers_of_two(cpu_count):
+        for workers in _powers_of_two(min(max_executor_workers, cpu_count // threads)):
+            pairs.append((threads, workers))
+    return sorted(pairs, key=lambda p: (p[0] * p[1], p[1]))
+
+
+async def _measure(service: PulseNetInferenceService, windows: np.ndarray, repeats: int) -> dict:
+    """Throughput (best repeat) and p95 latency of all windows submitted concurrently."""
+    async def one(window: np.ndarray) -> float:
+        t = time.perf_counter()
+        await service.infer(window, ResultDetail.score)
+        return (time.perf_counter() - t) * 1000.0
+
+    await asyncio.gather(*(one(w) for w in windows[:8]))  # warm-up
+    elapsed, latencies = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        latencies += await asyncio.gather(*(one(w) for w in windows))
+        elapsed.append(time.perf_counter() - start)
+    return {
+        "windows_per_s": len(windows) / min(elapsed),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+async def autotune(
+    service: PulseNetInferenceService,
+    pinned: set[str] | frozenset[str] = frozenset(),
+    batch_sizes: tuple[int, ...] = (8, 16, 32, 64),
+    n_windows: int = 256,
+    repeats: int = 2,
+    min_gain: float = 0.05,
+    cpu_count: int | None = None,
+) -> dict:
+    """Benchmark candidate configurations on a loaded, idle service and apply the fastest.
+
+    Returns a report with the chosen configuration, the pinned parameters
+    and every trial measured.
+    """
+    start = time.perf_counter()
+    cpu_count = cpu_count or os.cpu_count() or 1
+    windows = PulseNetDataset(n_samples=n_windows, anomaly_ratio=0.3, seed=HELD_OUT_SEED).data
+    # The service is idle during startup, so the result cache would only measure itself
+    cache, service.result_cache = service.result_cache, None
+    config = service.get_runtime_config()
+    trials = []
+
+    async def trial(**candidate) -> dict:
+        service.reconfigure(**candidate)
+        measured = {**service.get_runtime_config(), **await _measure(service, windows, repeats)}
+        trials.append(measured)
+        return measured
+
+    def better(candidate: dict, best: dict) -> bool:
+        return candidate["windows_per_s"] > best["windows_per_s"] * (1.0 + min_gain)
+
+    try:
+        best = await trial()  # the configured settings are the bar to beat
+        tune_threads = torch is not None and "torch_threads" not in pinned and service.process_workers == 0
+        tune_workers = "executor_workers" not in pinned and service.process_workers == 0
+        if tune_threads or tune_workers:
+            for threads, workers in candidate_pairs(cpu_count):
+                candidate = {
+                    "torch_threads": threads if tune_threads else config["torch_threads"],
+                    "executor_workers": workers if tune_workers else config["executor_workers"],
+                }
+                if any(t["torch_threads"] == candidate["torch_threads"]
+                       and t["executor_workers"] == candidate["executor_workers"] for t in trials):
+                    continue
+                measured = await trial(**candidate)
+                if better(measured, best):
+                    best = measured
+
+        if "max_batch_size" not in pinned:
+            base = best
+            for batch_size in batch_sizes:
+                measured = await trial(
+                    torch_threads=base["torch_threads"],
+                    executor_workers=base["executor_workers"],
+                    max_batch_size=batch_size,
+                )
+                if better(measured, best):
+                    best = measured
+
+        chosen = {name: best[name] for name in TUNABLE}
+        service.reconfigure(**chosen)
+    finally:
+        service.result_cache = cache
+
+    report = {
+        "chosen": chosen,
+        "pinned": sorted(pinned),
+        "cpu_count": cpu_count,
+        "duration_s": time.perf_counter() - start,
+        "trials": trials,
+    }
+    logger.info(
+        f"PulseNet autotune chose executor_workers={chosen['executor_workers']} "
+        f"torch_threads={chosen['torch_threads']} max_batch_size={chosen['max_batch_size']} "
+        f"({len(trials)} trials, {report['duration_s']:.1f}s)"
+    )
+    return report
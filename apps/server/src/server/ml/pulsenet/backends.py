@@ -0,0 +1,152 @@
+"""
+PulseNet inference backends.
+
+A backend runs the forward pass on a batch of raw windows and returns numpy
+arrays; PulseNetInferenceService turns those into result dicts. Every
+backend expects input normalization to be folded into the model (see
+`PulseNet.freeze_for_inference`), so windows are passed in raw units.
+
+Outputs of `run(windows, full)`:
+  scores:          (batch, seq_len) per-timestep anomaly scores
+  reconstruction:  (batch, seq_len, n_features) in normalized units   [full only]
+  attention:       (batch, seq_len, seq_len) last-layer series attention, head mean   [full only]
+  prior:           (n_heads, seq_len, seq_len) last-layer prior attention   [full only]
+  discrepancy:     (batch,) association discrepancy   [full only]
+  exit_layer:      (batch,) 1-based layer each window exited after   [early-exit torch models, not full]
+
+TorchBackend can also time its internal stages (to_tensor, forward,
+discrepancy, to_numpy) into a `StageLatency` assigned to `stages`.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .metrics import StageLatency
+
+try:
+    import torch
+
+    from .model import PulseNet
+except ImportError:  # serving-only install; see numpy_engine.py
+    torch = None
+
+
+class TorchBackend:
+    """Eager PyTorch forward on a frozen (optionally int8-quantized) PulseNet.
+
+    With `early_exit` thresholds (low, high), score-only batches on a model
+    built with exit heads go through `PulseNet.forward_early_exit`.
+    """
+
+    supports_projected = True
+
+    def __init__(
+        self,
+        model: PulseNet,
+        device: torch.device,
+        name: str = "torch",
+        early_exit: tuple[float, float] | None = None,
+    ):
+        self.model = model
+        self.device = device
+        self.name = name
+        self.early_exit = early_exit
+        self.stages: StageLatency | None = None
+
+    @property
+    def input_projection(self) -> tuple[np.ndarray, np.ndarray]:
+        """Projection weights (normalization folded in) for the streaming cache."""
+        projection = self.model.input_projection
+        return projection.weight.detach().cpu().numpy(), projection.bias.detach().cpu().numpy()
+
+    def run(self, windows: np.ndarray, full: bool, projected: bool = False) -> dict[str, np.ndarray]:
+        marks = [("start", time.perf_counter())]
+        x = torch.tensor(windows, dtype=torch.float32)
+        x = x.to(self.device)
+        marks.append(("to_tensor", time.perf_counter()))
+
+        if not full and self.early_exit is not None:
+            with torch.no_grad():
+                h = x if projected else self.model.input_projection(x)
+                scores, exit_layers = self.model.forward_early_exit(h, *self.early_exit)
+            marks.append(("forward", time.perf_counter()))
+            out = {"scores": scores.cpu().numpy(), "exit_layer": exit_layers.cpu().numpy()}
+            marks.append(("to_numpy", time.perf_counter()))
+            self._record(marks)
+            return out
+
+        with torch.no_grad():
+            if projected:
+                outputs = self.model.forward_projected(x, return_attentions=full)
+            else:
+                outputs = self.model(x, return_attentions=full)
+            reconstruction, anomaly_scores, series_attns, prior_attns = outputs
+            marks.append(("forward", time.perf_counter()))
+            if full:
+                discrepancy = self.model.compute_association_discrepancy(series_attns, prior_attns)
+                marks.append(("discrepancy", time.perf_counter()))
+
+        out = {"scores": anomaly_scores[:, :, 0].cpu().numpy()}
+        if full:
+            out["reconstruction"] = reconstruction.cpu().numpy()
+            out["attention"] = series_attns[-1].mean(dim=1).cpu().numpy()
+            out["prior"] = prior_attns[-1].cpu().numpy()
+            out["discrepancy"] = discrepancy.cpu().numpy()
+        marks.append(("to_numpy", time.perf_counter()))
+        self._record(marks)
+        return out
+
+    def _record(self, marks: list[tuple[str, float]]):
+        if self.stages is None:
+            return
+        for (_, previous), (stage, now) in zip(marks, marks[1:]):
+            self.stages.observe(stage, (now - previous) * 1000.0)
+
+
+class OnnxBackend:
+    """ONNX Runtime CPU forward on a graph exported by `onnx_export.export_onnx`."""
+
+    name = "onnx"
+    supports_projected = False
+
+    def __init__(self, onnx_path: str | Path, intra_op_threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(
+            str(onnx_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        # The prior is a constant of the frozen graph; fetch it once
+        self._prior = self.session.run(
+            ["prior"], {self.input_name: np.zeros(self._input_shape(1), dtype=np.float32)}
+        )[0]
+
+    def _input_shape(self, batch: int) -> tuple[int, ...]:
+        _, seq_len, n_features = self.session.get_inputs()[0].shape
+        return (batch, seq_len, n_features)
+
+    def run(self, windows: np.ndarray, full: bool, projected: bool = False) -> dict[str, np.ndarray]:
+        if projected:
+            raise ValueError("ONNX backend does not accept projected windows")
+        feed = {self.input_name: np.ascontiguousarray(windows, dtype=np.float32)}
+        if not full:
+            (scores,) = self.session.run(["scores"], feed)
+            return {"scores": scores}
+        scores, reconstruction, attention, discrepancy = self.session.run(
+            ["scores", "reconstruction", "attention", "discrepancy"], feed
+        )
+        return {
+            "scores": scores,
+            "reconstruction": reconstruction,
+            "attention": attention,
+            "prior": self._prior,
+            "discrepancy": discrepancy,
+        }
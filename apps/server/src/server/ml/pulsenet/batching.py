@@ -0,0 +1,108 @@
+"""
+Micro-batching for PulseNet inference.
+
+Concurrent callers submit single windows; the batcher gathers them into one
+batch and runs a single forward pass. A batch is dispatched as soon as it
+reaches `max_batch_size`, or `max_wait_ms` after its first window arrived,
+whichever comes first. Each caller awaits its own future.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+import numpy as np
+
+from .metrics import RollingHistogram
+
+BatchRunner = Callable[[Hashable, np.ndarray], Awaitable[list[Any]]]
+
+
+class MicroBatcher:
+    """Gathers concurrent single-window requests into batched forwards.
+
+    Windows are grouped by a hashable key (e.g. window shape) so that only
+    stackable windows end up in the same batch.
+
+    Args:
+        run_batch: Coroutine taking (key, stacked windows) and returning one result per window
+        max_batch_size: Largest batch dispatched in one forward pass
+        max_wait_ms: Longest a window waits for company before its batch is dispatched
+    """
+
+    def __init__(self, run_batch: BatchRunner, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        self._run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self._pending: dict[Hashable, list[tuple[np.ndarray, asyncio.Future]]] = {}
+        self._timers: dict[Hashable, asyncio.TimerHandle] = {}
+        self._opened: dict[Hashable, float] = {}  # when each pending batch got its first window
+        self.wait_ms = RollingHistogram()  # time the oldest window of each batch waited
+        self._tasks: set[asyncio.Task] = set()
+        self.batches_dispatched = 0
+        self.windows_dispatched = 0
+
+    async def submit(self, key: Hashable, window: np.ndarray) -> Any:
+        """Queue a window and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        if not pending:
+            self._opened[key] = time.perf_counter()
+        pending.append((window, future))
+
+        if len(pending) >= self.max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait_ms / 1000.0, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Hashable):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        pending = self._pending.pop(key, [])
+        opened = self._opened.pop(key, None)
+        if opened is not None:
+            self.wait_ms.observe((time.perf_counter() - opened) * 1000.0)
+        batch = [(w, f) for w, f in pending if not f.done()]
+        while batch:
+            chunk, batch = batch[:self.max_batch_size], batch[self.max_batch_size:]
+            task = asyncio.ensure_future(self._dispatch(key, chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, key: Hashable, batch: list[tuple[np.ndarray, asyncio.Future]]):
+        windows = np.stack([w for w, _ in batch])
+        try:
+            results = await self._run_batch(key, windows)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches_dispatched += 1
+        self.windows_dispatched += len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    @property
+    def pending_count(self) -> int:
+        return sum(len(p) for p in self._pending.values())
+
+    def get_stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "pending": self.pending_count,
+            "batches_dispatched": self.batches_dispatched,
+            "windows_dispatched": self.windows_dispatched,
+            "mean_batch_size": (
+                self.windows_dispatched / self.batches_dispatched if self.batches_dispatched else 0.0
+            ),
+        }
@@ -0,0 +1,238 @@
+"""
+Reproducible PulseNet inference benchmark.
+
+Two scenarios are measured on PulseNetDataset windows (fixed seed):
+  batch       `infer_batch_sync` on whole batches, per torch thread count,
+              batch size and detail level
+  concurrent  many concurrent `infer` callers through the micro-batcher,
+              per torch thread count, executor size, max batch size and
+              detail level
+
+Each result row carries a stable `key` (e.g. "batch/t1/b8/score"), so two
+reports can be diffed and checked against each other. `compare` flags rows
+whose throughput dropped, or whose p95 latency grew, by more than the
+tolerance against a stored baseline report. Runs on CPU-only machines,
+and without torch (numpy backend), where the thread grid collapses to the
+default thread count ("t0").
+
+Usage:
+    python -m server.ml.pulsenet.benchmark --output bench.json
+    python -m server.ml.pulsenet.benchmark --quick --baseline bench.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .dataset import HELD_OUT_SEED, PulseNetDataset
+from .inference import PulseNetInferenceService, ResultDetail
+
+try:
+    import torch
+except ImportError:  # serving-only install: numpy backend only
+    torch = None
+
+DEFAULT_GRID = {
+    "threads": (1, 4),
+    "batch_sizes": (1, 8, 32),
+    "executor_sizes": (1, 2, 4),
+    "details": ("score", "timesteps", "full"),
+}
+QUICK_GRID = {
+    "threads": (1,),
+    "batch_sizes": (1, 8),
+    "executor_sizes": (2,),
+    "details": ("score",),
+}
+
+
+def _summarize(key: str, n_windows: int, elapsed_s: list[float], latencies_ms: list[float], **params) -> dict:
+    """Throughput is taken from the fastest repeat, which is the least noisy on shared CPUs."""
+    latencies = np.array(latencies_ms)
+    return {
+        "key": key,
+        **params,
+        "windows": n_windows,
+        "windows_per_s": n_windows / min(elapsed_s),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+def bench_batch(
+    service: PulseNetInferenceService, windows: np.ndarray, batch_size: int, detail: ResultDetail, repeats: int
+) -> tuple[int, list[float], list[float]]:
+    """Windows per pass, elapsed seconds per pass and per-batch latencies over `repeats` passes."""
+    batches = [windows[i:i + batch_size] for i in range(0, len(windows) - batch_size + 1, batch_size)]
+    service.infer_batch_sync(batches[0], detail)  # warm-up
+    elapsed, latencies = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for batch in batches:
+            t = time.perf_counter()
+            service.infer_batch_sync(batch, detail)
+            latencies.append((time.perf_counter() - t) * 1000.0)
+        elapsed.append(time.perf_counter() - start)
+    return len(batches) * batch_size, elapsed, latencies
+
+
+async def bench_concurrent(
+    service: PulseNetInferenceService, windows: np.ndarray, detail: ResultDetail, repeats: int
+) -> tuple[int, list[float], list[float]]:
+    """Like `bench_batch`, with every window submitted concurrently to `infer` on each pass."""
+    async def one(window: np.ndarray) -> float:
+        t = time.perf_counter()
+        await service.infer(window, detail)
+        return (time.perf_counter() - t) * 1000.0
+
+    await asyncio.gather(*(one(w) for w in windows[:8]))  # warm-up
+    elapsed, latencies = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        latencies += await asyncio.gather(*(one(w) for w in windows))
+        elapsed.append(time.perf_counter() - start)
+    return len(windows), elapsed, latencies
+
+
+def run_benchmark(
+    checkpoint_dir: str | Path = "checkpoints",
+    n_windows: int = 256,
+    repeats: int = 5,
+    backend: str = "torch",
+    grid: dict | None = None,
+) -> dict:
+    """Run both scenarios over the grid and return a JSON-serialisable report.
+
+    Raises RuntimeError if the model cannot be loaded, rather than timing
+    the error path.
+    """
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    if torch is None:
+        grid["threads"] = (0,)
+    windows = PulseNetDataset(n_samples=n_windows, anomaly_ratio=0.3, seed=HELD_OUT_SEED).data
+    original_threads = torch.get_num_threads() if torch is not None else 0
+    results = []
+
+    def load(service: PulseNetInferenceService) -> PulseNetInferenceService:
+        if not service.load():
+            service.shutdown()
+            raise RuntimeError(f"Failed to load PulseNet from {checkpoint_dir} ({backend} backend)")
+        return service
+
+    try:
+        for threads in grid["threads"]:
+            if torch is not None:
+                torch.set_num_threads(threads)
+            service = load(PulseNetInferenceService(str(checkpoint_dir), max_batch_size=1, backend=backend))
+            for detail in map(ResultDetail, grid["details"]):
+                for batch_size in grid["batch_sizes"]:
+                    measured = bench_batch(service, windows, batch_size, detail, repeats)
+                    results.append(_summarize(
+                        f"batch/t{threads}/b{batch_size}/{detail.value}", *measured,
+                        scenario="batch", threads=threads, batch_size=batch_size, detail=detail.value,
+                    ))
+            service.shutdown()
+
+            for executor_size in grid["executor_sizes"]:
+                for batch_size in grid["batch_sizes"]:
+                    service = load(PulseNetInferenceService(
+                        str(checkpoint_dir), max_batch_size=batch_size, backend=backend,
+                        executor_workers=executor_size,
+                    ))
+                    for detail in map(ResultDetail, grid["details"]):
+                        measured = asyncio.run(bench_concurrent(service, windows, detail, repeats))
+                        results.append(_summarize(
+                            f"concurrent/t{threads}/e{executor_size}/b{batch_size}/{detail.value}", *measured,
+                            scenario="concurrent", threads=threads, executor_size=executor_size,
+                            batch_size=batch_size, detail=detail.value,
+                        ))
+                    service.shutdown()
+    finally:
+        if torch is not None:
+            torch.set_num_threads(original_threads)
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "backend": backend,
+            "n_windows": n_windows,
+            "repeats": repeats,
+            "seed": HELD_OUT_SEED,
+            "torch": torch.__version__ if torch is not None else None,
+            "numpy": np.__version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.25) -> list[dict]:
+    """Rows of `report` that regressed against `baseline` by more than `tolerance`.
+
+    A row regresses when its throughput fell below (1 - tolerance) x baseline,
+    or its p95 latency rose above (1 + tolerance) x baseline. Rows missing
+    from either report are ignored.
+    """
+    baseline_rows = {row["key"]: row for row in baseline["results"]}
+    regressions = []
+    for row in report["results"]:
+        base = baseline_rows.get(row["key"])
+        if base is None:
+            continue
+        throughput = row["windows_per_s"] / base["windows_per_s"]
+        p95 = row["p95_ms"] / base["p95_ms"] if base["p95_ms"] > 0 else 1.0
+        if throughput < 1.0 - tolerance or p95 > 1.0 + tolerance:
+            regressions.append({
+                "key": row["key"],
+                "windows_per_s": row["windows_per_s"],
+                "baseline_windows_per_s": base["windows_per_s"],
+                "throughput_ratio": throughput,
+                "p95_ms": row["p95_ms"],
+                "baseline_p95_ms": base["p95_ms"],
+                "p95_ratio": p95,
+            })
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PulseNet inference benchmark")
+    parser.add_argument("--checkpoint-dir", default="checkpoints")
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--n-windows", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="Small grid for smoke runs")
+    parser.add_argument("--output", default=None, help="JSON path for the report")
+    parser.add_argument("--baseline", default=None, help="Report to check for regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        args.checkpoint_dir, args.n_windows, args.repeats, args.backend, QUICK_GRID if args.quick else None
+    )
+    print(f"{'key':<40} {'win/s':>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for row in report["results"]:
+        print(f"{row['key']:<40} {row['windows_per_s']:>10.1f} {row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for r in regressions:
+            print(
+                f"REGRESSION {r['key']}: {r['windows_per_s']:.1f} win/s "
+                f"({r['throughput_ratio']:.2f}x baseline), p95 {r['p95_ms']:.3f} ms ({r['p95_ratio']:.2f}x)"
+            )
+        if regressions:
+            raise SystemExit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
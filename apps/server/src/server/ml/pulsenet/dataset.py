@@ -10,19 +10,75 @@ Generates realistic wearable health data windows:
 Includes normal patterns, exercise patterns, and injected anomalies.
 """
 
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+
 import numpy as np
-import torch
-from torch.utils.data import Dataset
+
+try:
+    import torch
+    from torch.utils.data import Dataset, IterableDataset, get_worker_info
+except ImportError:  # serving-only install: raw arrays (.data etc.) still work
+    torch = None
+    Dataset = IterableDataset = object
+
+logger = logging.getLogger(__name__)
+
+
+NORMAL_PATTERNS = ("resting", "light_activity", "exercise", "sleep")
+ANOMALY_TYPES = (
+    "hr_spike", "hr_drop", "hr_flatline", "hr_irregular",
+    "multi_signal", "sudden_collapse", "stress_response",
+)
+
+# Bump whenever generation changes, so cached datasets are regenerated
+GENERATOR_VERSION = 1
+CACHED_ARRAYS = ("data", "labels", "anomaly_masks")
+
+# Seed for evaluation windows, kept apart from the training default (42)
+HELD_OUT_SEED = 11
+
+
+def feature_moments(chunks) -> tuple[np.ndarray, np.ndarray]:
+    """Per-feature mean and std over an iterable of (..., 4) chunks, accumulated in float64."""
+    total = np.zeros(4, dtype=np.float64)
+    total_sq = np.zeros(4, dtype=np.float64)
+    count = 0
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=np.float64).reshape(-1, 4)
+        total += chunk.sum(axis=0)
+        total_sq += np.square(chunk).sum(axis=0)
+        count += len(chunk)
+    mean = total / count
+    std = np.sqrt(np.maximum(total_sq / count - mean ** 2, 0.0))
+    return mean.astype(np.float32), std.astype(np.float32)
 
 
 class PulseNetDataset(Dataset):
     """Synthetic wearable health data for anomaly detection training.
 
+    Windows are generated in chunks of `chunk_size`: every window of a pattern,
+    and every injection of an anomaly type, is built with array operations over
+    the sample axis, so construction scales to millions of windows. Output is
+    reproducible for a fixed seed (and chunk size).
+
+    With `cache_dir` and a fixed seed, the arrays are written to `.npy` files
+    keyed by the generation parameters on first use, and later constructions
+    reopen them memory-mapped (read-only). Datasets larger than memory then
+    stream from disk, and repeated runs skip generation. If the cache cannot
+    be written, the dataset is generated in memory instead.
+
     Args:
         n_samples: Number of windows to generate
         seq_len: Timesteps per window (default: 60)
         anomaly_ratio: Fraction of windows that contain anomalies
         seed: Random seed for reproducibility
+        chunk_size: Windows generated per vectorized chunk (bounds temporary memory)
+        cache_dir: Directory for memory-mapped cached datasets (None = keep in memory)
     """
 
     def __init__(
@@ -31,129 +87,206 @@ class PulseNetDataset(Dataset):
         seq_len: int = 60,
         anomaly_ratio: float = 0.3,
         seed: int = 42,
+        chunk_size: int = 65536,
+        cache_dir: str | Path | None = None,
     ):
         self.n_samples = n_samples
         self.seq_len = seq_len
         self.anomaly_ratio = anomaly_ratio
-        self.rng = np.random.RandomState(seed)
-
-        self.data, self.labels, self.anomaly_masks = self._generate()
+        self.seed = seed
+        self.chunk_size = max(1, chunk_size)
+        self.rng = np.random.default_rng(seed)
+
+        self.cache_path = None
+        if cache_dir is not None and seed is not None:
+            self.cache_path = Path(cache_dir) / self.cache_key()
+            try:
+                self.data, self.labels, self.anomaly_masks = self._load_or_generate_cached()
+            except OSError as e:
+                logger.warning(f"Dataset cache {self.cache_path} unusable ({e}); generating in memory")
+                self.cache_path = None
+                self.rng = np.random.default_rng(seed)  # a failed write may have consumed draws
+        if self.cache_path is None:
+            self.data = np.empty((n_samples, seq_len, 4), dtype=np.float32)
+            self.labels = np.zeros(n_samples, dtype=np.float32)
+            self.anomaly_masks = np.zeros((n_samples, seq_len), dtype=np.float32)
+            self._generate(self.data, self.labels, self.anomaly_masks)
+
+    def cache_key(self) -> str:
+        """Directory name identifying this dataset's generation parameters."""
+        params = self._cache_params()
+        digest = hashlib.blake2b(json.dumps(params, sort_keys=True).encode(), digest_size=6).hexdigest()
+        return f"pulsenet-n{self.n_samples}-l{self.seq_len}-s{self.seed}-{digest}"
+
+    def _cache_params(self) -> dict:
+        return {
+            "generator_version": GENERATOR_VERSION,
+            "n_samples": self.n_samples,
+            "seq_len": self.seq_len,
+            "anomaly_ratio": self.anomaly_ratio,
+            "seed": self.seed,
+            "chunk_size": self.chunk_size,
+        }
 
-    def _generate(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    def _load_or_generate_cached(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        path = self.cache_path
+        if not (path / "params.json").exists():
+            # Generate straight into (zero-filled) .npy memmaps in a scratch directory, then publish it atomically
+            tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp.mkdir(parents=True)
+            try:
+                data = np.lib.format.open_memmap(
+                    tmp / "data.npy", mode="w+", dtype=np.float32, shape=(self.n_samples, self.seq_len, 4)
+                )
+                labels = np.lib.format.open_memmap(
+                    tmp / "labels.npy", mode="w+", dtype=np.float32, shape=(self.n_samples,)
+                )
+                masks = np.lib.format.open_memmap(
+                    tmp / "anomaly_masks.npy", mode="w+", dtype=np.float32, shape=(self.n_samples, self.seq_len)
+                )
+                self._generate(data, labels, masks)
+                for array in (data, labels, masks):
+                    array.flush()
+                del data, labels, masks
+                # Written last: its presence marks a complete entry
+                with open(tmp / "params.json", "w") as f:
+                    json.dump(self._cache_params(), f, indent=2)
+                os.replace(tmp, path)
+            except OSError:
+                if not (path / "params.json").exists():
+                    raise
+                # Another process published the same entry first
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+        return tuple(np.load(path / f"{name}.npy", mmap_mode="r") for name in CACHED_ARRAYS)
+
+    def _generate(self, data: np.ndarray, labels: np.ndarray, masks: np.ndarray):
+        """Fill zeroed `labels` and `masks` and uninitialised `data` (arrays or memmaps)."""
         n_normal = int(self.n_samples * (1 - self.anomaly_ratio))
         n_anomaly = self.n_samples - n_normal
 
-        normal_data = np.stack([self._gen_normal() for _ in range(n_normal)])
-        normal_labels = np.zeros(n_normal, dtype=np.float32)
-        normal_masks = np.zeros((n_normal, self.seq_len), dtype=np.float32)
-
-        anomaly_data = []
-        anomaly_labels = []
-        anomaly_masks = []
-        for _ in range(n_anomaly):
-            window, mask = self._gen_anomaly()
-            anomaly_data.append(window)
-            anomaly_labels.append(1.0)
-            anomaly_masks.append(mask)
-
-        anomaly_data = np.stack(anomaly_data)
-        anomaly_labels = np.array(anomaly_labels, dtype=np.float32)
-        anomaly_masks = np.stack(anomaly_masks)
-
-        data = np.concatenate([normal_data, anomaly_data], axis=0)
-        labels = np.concatenate([normal_labels, anomaly_labels], axis=0)
-        masks = np.concatenate([normal_masks, anomaly_masks], axis=0)
-
-        shuffle_idx = self.rng.permutation(len(data))
-        return data[shuffle_idx], labels[shuffle_idx], masks[shuffle_idx]
-
-    def _gen_normal(self) -> np.ndarray:
-        """Generate a normal health data window."""
-        pattern = self.rng.choice(["resting", "light_activity", "exercise", "sleep"])
-        t = np.arange(self.seq_len, dtype=np.float32)
-
-        if pattern == "resting":
-            hr = self.rng.uniform(62, 78) + self.rng.randn(self.seq_len) * 2
-            hrv = self.rng.uniform(40, 70) + self.rng.randn(self.seq_len) * 5
-            accel = self.rng.uniform(0.95, 1.05, self.seq_len)
-            temp = self.rng.uniform(36.2, 36.8) + self.rng.randn(self.seq_len) * 0.1
-
-        elif pattern == "light_activity":
-            hr = self.rng.uniform(80, 100) + np.sin(t * 0.1) * 3 + self.rng.randn(self.seq_len) * 3
-            hrv = self.rng.uniform(30, 50) + self.rng.randn(self.seq_len) * 4
-            accel = self.rng.uniform(1.0, 1.5, self.seq_len) + np.sin(t * 0.3) * 0.2
-            temp = self.rng.uniform(36.5, 37.0) + self.rng.randn(self.seq_len) * 0.1
-
-        elif pattern == "exercise":
-            ramp = np.linspace(0, 1, self.seq_len)
-            hr = 80 + ramp * 60 + self.rng.randn(self.seq_len) * 4
-            hrv = 50 - ramp * 20 + self.rng.randn(self.seq_len) * 3
-            accel = 1.0 + ramp * 2.0 + np.sin(t * 0.5) * 0.3 + self.rng.randn(self.seq_len) * 0.2
-            temp = 36.5 + ramp * 0.8 + self.rng.randn(self.seq_len) * 0.1
-
-        else:  # sleep
-            hr = self.rng.uniform(55, 65) + np.sin(t * 0.05) * 3 + self.rng.randn(self.seq_len) * 1.5
-            hrv = self.rng.uniform(50, 80) + self.rng.randn(self.seq_len) * 4
-            accel = self.rng.uniform(0.95, 1.02, self.seq_len)
-            temp = self.rng.uniform(35.8, 36.5) + self.rng.randn(self.seq_len) * 0.1
-
-        return np.stack([hr, hrv, accel, temp], axis=-1).astype(np.float32)
-
-    def _gen_anomaly(self) -> tuple[np.ndarray, np.ndarray]:
-        """Generate a window with injected anomaly. Returns (window, anomaly_mask)."""
-        window = self._gen_normal()
-        mask = np.zeros(self.seq_len, dtype=np.float32)
-
-        anomaly_type = self.rng.choice([
-            "hr_spike", "hr_drop", "hr_flatline", "hr_irregular",
-            "multi_signal", "sudden_collapse", "stress_response",
-        ])
-
-        start = self.rng.randint(5, self.seq_len - 15)
-        duration = self.rng.randint(5, min(15, self.seq_len - start))
-        end = start + duration
-        mask[start:end] = 1.0
-
-        if anomaly_type == "hr_spike":
-            window[start:end, 0] += self.rng.uniform(30, 60)
-            window[start:end, 1] -= self.rng.uniform(15, 30)
-
-        elif anomaly_type == "hr_drop":
-            window[start:end, 0] -= self.rng.uniform(20, 40)
-            window[start:end, 1] += self.rng.uniform(10, 30)
-
-        elif anomaly_type == "hr_flatline":
-            flat_val = window[start, 0]
-            window[start:end, 0] = flat_val
-            window[start:end, 1] = 0
-
-        elif anomaly_type == "hr_irregular":
-            window[start:end, 0] += self.rng.randn(duration) * 20
-            window[start:end, 1] = self.rng.uniform(5, 15, duration)
-
-        elif anomaly_type == "multi_signal":
-            window[start:end, 0] += self.rng.uniform(20, 50)
-            window[start:end, 2] += self.rng.uniform(1, 3)
-            window[start:end, 3] += self.rng.uniform(0.5, 1.5)
-
-        elif anomaly_type == "sudden_collapse":
-            window[start:end, 0] = self.rng.uniform(30, 45, duration)
-            window[start:end, 2] += self.rng.uniform(3, 8)
-            window[start:end, 3] -= self.rng.uniform(0.5, 1.0)
-
-        elif anomaly_type == "stress_response":
-            ramp = np.linspace(0, 1, duration)
-            window[start:end, 0] += ramp * self.rng.uniform(25, 45)
-            window[start:end, 1] -= ramp * self.rng.uniform(15, 25)
-            window[start:end, 3] += ramp * self.rng.uniform(0.3, 0.8)
-
-        return window, mask
+        # Place anomalies at random positions up front instead of shuffling afterwards
+        labels[self.rng.permutation(self.n_samples)[:n_anomaly]] = 1.0
+
+        for lo in range(0, self.n_samples, self.chunk_size):
+            hi = min(lo + self.chunk_size, self.n_samples)
+            self._gen_normal(data[lo:hi])
+            anomalous = np.flatnonzero(labels[lo:hi]) + lo
+            if len(anomalous):
+                windows = data[anomalous]
+                masks[anomalous] = self._gen_anomaly(windows)
+                data[anomalous] = windows
+
+    def _uniform(self, low: float, high: float, size) -> np.ndarray:
+        return self.rng.random(size, dtype=np.float32) * np.float32(high - low) + np.float32(low)
+
+    def _gen_normal(self, out: np.ndarray):
+        """Fill `out` (n, seq_len, 4) with normal health data windows."""
+        n, L = len(out), self.seq_len
+        t = np.arange(L, dtype=np.float32)
+        ramp = np.linspace(0, 1, L, dtype=np.float32)
+        patterns = self.rng.integers(0, len(NORMAL_PATTERNS), n)
+
+        for p, pattern in enumerate(NORMAL_PATTERNS):
+            idx = np.flatnonzero(patterns == p)
+            k = len(idx)
+            if k == 0:
+                continue
+            noise = self.rng.standard_normal((k, L, 4), dtype=np.float32)
+            w = np.empty((k, L, 4), dtype=np.float32)
+
+            if pattern == "resting":
+                w[..., 0] = self._uniform(62, 78, (k, 1)) + noise[..., 0] * 2
+                w[..., 1] = self._uniform(40, 70, (k, 1)) + noise[..., 1] * 5
+                w[..., 2] = self._uniform(0.95, 1.05, (k, L))
+                w[..., 3] = self._uniform(36.2, 36.8, (k, 1)) + noise[..., 3] * 0.1
+
+            elif pattern == "light_activity":
+                w[..., 0] = self._uniform(80, 100, (k, 1)) + np.sin(t * 0.1) * 3 + noise[..., 0] * 3
+                w[..., 1] = self._uniform(30, 50, (k, 1)) + noise[..., 1] * 4
+                w[..., 2] = self._uniform(1.0, 1.5, (k, L)) + np.sin(t * 0.3) * 0.2
+                w[..., 3] = self._uniform(36.5, 37.0, (k, 1)) + noise[..., 3] * 0.1
+
+            elif pattern == "exercise":
+                w[..., 0] = 80 + ramp * 60 + noise[..., 0] * 4
+                w[..., 1] = 50 - ramp * 20 + noise[..., 1] * 3
+                w[..., 2] = 1.0 + ramp * 2.0 + np.sin(t * 0.5) * 0.3 + noise[..., 2] * 0.2
+                w[..., 3] = 36.5 + ramp * 0.8 + noise[..., 3] * 0.1
+
+            else:  # sleep
+                w[..., 0] = self._uniform(55, 65, (k, 1)) + np.sin(t * 0.05) * 3 + noise[..., 0] * 1.5
+                w[..., 1] = self._uniform(50, 80, (k, 1)) + noise[..., 1] * 4
+                w[..., 2] = self._uniform(0.95, 1.02, (k, L))
+                w[..., 3] = self._uniform(35.8, 36.5, (k, 1)) + noise[..., 3] * 0.1
+
+            out[idx] = w
+
+    def _gen_anomaly(self, windows: np.ndarray) -> np.ndarray:
+        """Inject anomalies into `windows` (n, seq_len, 4) in place. Returns the (n, seq_len) masks."""
+        n, L = len(windows), self.seq_len
+        t = np.arange(L)
+        types = self.rng.integers(0, len(ANOMALY_TYPES), n)
+        start = self.rng.integers(5, L - 15, n)
+        duration = self.rng.integers(5, np.minimum(15, L - start))
+        in_span = (t >= start[:, None]) & (t < (start + duration)[:, None])
+
+        for a, anomaly_type in enumerate(ANOMALY_TYPES):
+            idx = np.flatnonzero(types == a)
+            k = len(idx)
+            if k == 0:
+                continue
+            w = windows[idx]
+            m = in_span[idx]
+            mf = m.astype(np.float32)
+
+            if anomaly_type == "hr_spike":
+                w[..., 0] += mf * self._uniform(30, 60, (k, 1))
+                w[..., 1] -= mf * self._uniform(15, 30, (k, 1))
+
+            elif anomaly_type == "hr_drop":
+                w[..., 0] -= mf * self._uniform(20, 40, (k, 1))
+                w[..., 1] += mf * self._uniform(10, 30, (k, 1))
+
+            elif anomaly_type == "hr_flatline":
+                flat_val = w[np.arange(k), start[idx], 0]
+                w[..., 0] = np.where(m, flat_val[:, None], w[..., 0])
+                w[..., 1] = np.where(m, 0.0, w[..., 1])
+
+            elif anomaly_type == "hr_irregular":
+                w[..., 0] += mf * self.rng.standard_normal((k, L), dtype=np.float32) * 20
+                w[..., 1] = np.where(m, self._uniform(5, 15, (k, L)), w[..., 1])
+
+            elif anomaly_type == "multi_signal":
+                w[..., 0] += mf * self._uniform(20, 50, (k, 1))
+                w[..., 2] += mf * self._uniform(1, 3, (k, 1))
+                w[..., 3] += mf * self._uniform(0.5, 1.5, (k, 1))
+
+            elif anomaly_type == "sudden_collapse":
+                w[..., 0] = np.where(m, self._uniform(30, 45, (k, L)), w[..., 0])
+                w[..., 2] += mf * self._uniform(3, 8, (k, 1))
+                w[..., 3] -= mf * self._uniform(0.5, 1.0, (k, 1))
+
+            elif anomaly_type == "stress_response":
+                # linspace(0, 1, duration) over the span, 0 elsewhere
+                ramp = np.where(m, (t - start[idx, None]) / (duration[idx, None] - 1), 0.0).astype(np.float32)
+                w[..., 0] += ramp * self._uniform(25, 45, (k, 1))
+                w[..., 1] -= ramp * self._uniform(15, 25, (k, 1))
+                w[..., 3] += ramp * self._uniform(0.3, 0.8, (k, 1))
+
+            windows[idx] = w
+
+        return in_span.astype(np.float32)
 
     def get_normalization_stats(self) -> tuple[np.ndarray, np.ndarray]:
-        """Compute mean and std for normalization."""
-        mean = self.data.reshape(-1, 4).mean(axis=0)
-        std = self.data.reshape(-1, 4).std(axis=0)
-        return mean, std
+        """Compute mean and std for normalization.
+
+        Accumulated chunk by chunk in float64, so memory-mapped datasets are
+        not pulled into memory in one piece.
+        """
+        return feature_moments(
+            self.data[lo:lo + self.chunk_size] for lo in range(0, self.n_samples, self.chunk_size)
+        )
 
     def __len__(self) -> int:
         return self.n_samples
@@ -166,9 +299,163 @@ class PulseNetDataset(Dataset):
         }
 
 
+class TensorBatchLoader:
+    """Yields whole batches of a PulseNetDataset by index-slicing contiguous tensors.
+
+    A drop-in replacement for `DataLoader(dataset, batch_size, ...)` that skips
+    the per-item `__getitem__` calls and dict collation: the selected windows
+    are copied once into contiguous tensors (optionally pinned), and each batch
+    is a slice of them (or a single gather when shuffling). Memory-mapped
+    datasets are not copied up front; each batch is gathered from the mapped
+    arrays instead, so they still stream from disk.
+
+    Args:
+        dataset: Source dataset
+        indices: Windows to serve, e.g. `Subset.indices` from `random_split` (default: all)
+        batch_size: Windows per batch
+        shuffle: Reshuffle the order every epoch (uses the global torch RNG unless `generator` is given)
+        drop_last: Drop the final incomplete batch
+        pin_memory: Pin the batches in page-locked memory for faster host-to-GPU copies
+        generator: Optional torch.Generator for the shuffle order
+    """
+
+    KEYS = (("input", "data"), ("label", "labels"), ("anomaly_mask", "anomaly_masks"))
+
+    def __init__(
+        self,
+        dataset: PulseNetDataset,
+        indices=None,
+        batch_size: int = 128,
+        shuffle: bool = False,
+        drop_last: bool = False,
+        pin_memory: bool = False,
+        generator=None,
+    ):
+        self.indices = np.arange(len(dataset)) if indices is None else np.asarray(indices, dtype=np.int64)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.pin_memory = pin_memory and torch.cuda.is_available()
+        self.generator = generator
+        self.memory_mapped = isinstance(dataset.data, np.memmap)
+
+        if self.memory_mapped:
+            self._arrays = {key: getattr(dataset, attr) for key, attr in self.KEYS}
+            self._tensors = None
+        else:
+            self._arrays = None
+            self._tensors = {
+                key: torch.from_numpy(np.ascontiguousarray(getattr(dataset, attr)[self.indices]))
+                for key, attr in self.KEYS
+            }
+            if self.pin_memory:
+                self._tensors = {key: t.pin_memory() for key, t in self._tensors.items()}
+
+    def __len__(self) -> int:
+        n = len(self.indices)
+        return n // self.batch_size if self.drop_last else -(-n // self.batch_size)
+
+    def __iter__(self):
+        n = len(self.indices)
+        order = torch.randperm(n, generator=self.generator) if self.shuffle else None
+        for b in range(len(self)):
+            lo, hi = b * self.batch_size, min((b + 1) * self.batch_size, n)
+            if self._tensors is None:
+                batch = self._gather_mapped(order, lo, hi)
+            elif order is None:
+                batch = {key: t[lo:hi] for key, t in self._tensors.items()}  # views, already pinned
+            else:
+                batch = {key: t.index_select(0, order[lo:hi]) for key, t in self._tensors.items()}
+                if self.pin_memory:
+                    batch = {key: t.pin_memory() for key, t in batch.items()}
+            yield batch
+
+    def _gather_mapped(self, order, lo: int, hi: int) -> dict:
+        positions = np.arange(lo, hi) if order is None else order[lo:hi].numpy()
+        # Sorted rows read the mapped files sequentially; order within a batch does not matter
+        rows = np.sort(self.indices[positions])
+        batch = {key: torch.from_numpy(np.ascontiguousarray(array[rows])) for key, array in self._arrays.items()}
+        if self.pin_memory:
+            batch = {key: t.pin_memory() for key, t in batch.items()}
+        return batch
+
+
+class StreamingPulseNetDataset(IterableDataset):
+    """Unbounded synthetic training stream that yields whole batches.
+
+    Every batch is a fresh `PulseNetDataset` of `batch_size` windows, so
+    memory stays constant however long training runs. Use it with
+    `DataLoader(stream, batch_size=None, num_workers=...)`. Each DataLoader
+    worker draws from its own deterministic stream, derived from
+    (`seed`, epoch, worker id). The stream never repeats across workers or
+    epochs, and a run is reproducible for a fixed seed, worker count and
+    `set_epoch` sequence.
+
+    Args:
+        batch_size: Windows per yielded batch
+        seq_len: Timesteps per window
+        anomaly_ratio: Fraction of windows per batch that contain anomalies
+        seed: Root seed of every worker stream
+    """
+
+    def __init__(self, batch_size: int = 128, seq_len: int = 60, anomaly_ratio: float = 0.3, seed: int = 42):
+        self.batch_size = batch_size
+        self.seq_len = seq_len
+        self.anomaly_ratio = anomaly_ratio
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        """Select the epoch's streams; call before creating the DataLoader iterator."""
+        self.epoch = epoch
+
+    def _rng(self, *spawn_key: int) -> np.random.Generator:
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=spawn_key))
+
+    def _batch(self, rng: np.random.Generator) -> PulseNetDataset:
+        return PulseNetDataset(
+            n_samples=self.batch_size, seq_len=self.seq_len, anomaly_ratio=self.anomaly_ratio,
+            seed=int(rng.integers(2**63)),
+        )
+
+    def __iter__(self):
+        worker = get_worker_info()
+        rng = self._rng(1, self.epoch, worker.id if worker is not None else 0)
+        while True:
+            batch = self._batch(rng)
+            yield {
+                "input": torch.from_numpy(batch.data),
+                "label": torch.from_numpy(batch.labels),
+                "anomaly_mask": torch.from_numpy(batch.anomaly_masks),
+            }
+
+    def estimate_normalization_stats(self, n_windows: int = 20000) -> tuple[np.ndarray, np.ndarray]:
+        """Mean and std from a sample of about `n_windows` windows.
+
+        The sample comes from a stream reserved for statistics, never the training stream.
+        """
+        rng = self._rng(0)
+        n_batches = max(1, -(-n_windows // self.batch_size))
+        return feature_moments(self._batch(rng).data for _ in range(n_batches))
+
+
 class CommunityAnomalyDataset(Dataset):
     """Generates correlated anomaly windows across multiple simulated community members.
-    Used to train/validate community-level pattern detection."""
+    Used to train/validate community-level pattern detection.
+
+    `data` has shape (n_samples, n_members, seq_len, 4). It is filled chunk by
+    chunk, at most about `chunk_size` member windows at a time: the normal
+    windows are written in place, and the correlated shifts are applied with
+    masked array ops. Peak memory is the output plus one chunk, even with
+    hundreds of members per zone.
+
+    Args:
+        n_samples: Number of community samples
+        n_members: Members per sample
+        seq_len: Timesteps per window
+        seed: Random seed for reproducibility
+        chunk_size: Member windows generated per vectorized chunk
+    """
 
     def __init__(
         self,
@@ -176,49 +463,51 @@ class CommunityAnomalyDataset(Dataset):
         n_members: int = 5,
         seq_len: int = 60,
         seed: int = 123,
+        chunk_size: int = 65536,
     ):
         self.n_samples = n_samples
         self.n_members = n_members
         self.seq_len = seq_len
-        self.rng = np.random.RandomState(seed)
+        self.chunk_size = max(1, chunk_size)
+        self.rng = np.random.default_rng(seed)
 
         self.data, self.labels = self._generate()
 
     def _generate(self) -> tuple[np.ndarray, np.ndarray]:
-        base_gen = PulseNetDataset(
-            n_samples=self.n_samples * self.n_members,
-            seq_len=self.seq_len,
-            anomaly_ratio=0.0,
-            seed=self.rng.randint(0, 100000),
-        )
-
-        data = []
-        labels = []
-
-        for i in range(self.n_samples):
-            members = []
-            for j in range(self.n_members):
-                idx = i * self.n_members + j
-                members.append(base_gen.data[idx].copy())
-
-            is_community_anomaly = self.rng.random() < 0.3
-            if is_community_anomaly:
-                start = self.rng.randint(10, self.seq_len - 20)
-                duration = self.rng.randint(8, 15)
-                n_affected = self.rng.randint(3, self.n_members + 1)
-                affected = self.rng.choice(self.n_members, n_affected, replace=False)
-                for m_idx in affected:
-                    delay = self.rng.randint(0, 5)
-                    s = min(start + delay, self.seq_len - duration)
-                    members[m_idx][s:s + duration, 0] += self.rng.uniform(15, 35)
-                    members[m_idx][s:s + duration, 1] -= self.rng.uniform(10, 20)
-                labels.append(1.0)
-            else:
-                labels.append(0.0)
-
-            data.append(np.stack(members))
-
-        return np.array(data, dtype=np.float32), np.array(labels, dtype=np.float32)
+        M, L = self.n_members, self.seq_len
+        windows = PulseNetDataset(n_samples=0, seq_len=L, anomaly_ratio=0.0, seed=int(self.rng.integers(2**63)))
+        data = np.empty((self.n_samples, M, L, 4), dtype=np.float32)
+        labels = (self.rng.random(self.n_samples) < 0.3).astype(np.float32)
+
+        per_chunk = max(1, self.chunk_size // M)
+        for lo in range(0, self.n_samples, per_chunk):
+            hi = min(lo + per_chunk, self.n_samples)
+            windows._gen_normal(data[lo:hi].reshape(-1, L, 4))
+            anomalous = np.flatnonzero(labels[lo:hi]) + lo
+            if len(anomalous):
+                data[anomalous] = self._inject(data[anomalous])
+        return data, labels
+
+    def _inject(self, samples: np.ndarray) -> np.ndarray:
+        """Shift HR up and HRV down over a shared, per-member delayed span in 3+ random members."""
+        k, M, L = len(samples), self.n_members, self.seq_len
+        t = np.arange(L)
+        start = self.rng.integers(10, L - 20, k)
+        duration = self.rng.integers(8, 15, k)
+        n_affected = self.rng.integers(min(3, M), M + 1, k)
+        # The members with the n_affected smallest random keys: a sample without replacement per row
+        ranks = self.rng.random((k, M)).argsort(axis=1).argsort(axis=1)
+        affected = ranks < n_affected[:, None]
+
+        delay = self.rng.integers(0, 5, (k, M))
+        span_start = np.minimum(start[:, None] + delay, (L - duration)[:, None])  # [k, M]
+        span = (t >= span_start[..., None]) & (t < (span_start + duration[:, None])[..., None])
+        span &= affected[..., None]  # [k, M, L]
+
+        mf = span.astype(np.float32)
+        samples[..., 0] += mf * self.rng.uniform(15, 35, (k, M, 1)).astype(np.float32)
+        samples[..., 1] -= mf * self.rng.uniform(10, 20, (k, M, 1)).astype(np.float32)
+        return samples
 
     def __len__(self) -> int:
         return self.n_samples
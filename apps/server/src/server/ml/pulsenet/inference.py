@@ -2,160 +2,776 @@
 PulseNet Real-Time Inference Service
 
 Loads trained model checkpoint, provides async inference for the backend.
-Runs in a ThreadPoolExecutor to avoid blocking the event loop.
+Runs in a ThreadPoolExecutor to avoid blocking the event loop. Concurrent
+single-window requests are micro-batched into one forward pass. The
+forward pass itself is delegated to a backend (see backends.py).
+
+PyTorch is optional: without it the service serves the pure-NumPy engine
+from a `pulsenet.npz` weight export.
 """
 
+from __future__ import annotations
+
 import asyncio
+import enum
+import json
+import logging
+import time
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
-import torch
 
-from .model import PulseNet
+try:
+    import torch
+except ImportError:  # serving-only install
+    torch = None
+
+from ...config import settings
+from .backends import OnnxBackend, TorchBackend
+from .batching import MicroBatcher
+from .metrics import StageLatency
+from .numpy_engine import NumpyBackend, NumpyPulseNet
+from .priority import Lane, PriorityGate
+from .process_pool import ProcessPoolInference
+from .result_cache import ResultCache
+
+if torch is not None:
+    from .model import PulseNet
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MEAN = np.array([72.0, 50.0, 1.0, 36.5], dtype=np.float32)
+DEFAULT_STD = np.array([15.0, 15.0, 0.5, 0.5], dtype=np.float32)
+
+
+# Checkpoint files per model variant, in order of preference
+MODEL_VARIANTS = {
+    "full": ("pulsenet_best.pt", "pulsenet_final.pt"),
+    "tiny": ("pulsenet_tiny.pt",),  # distilled student, see train.distill_pulsenet
+}
+
+
+def find_checkpoint(checkpoint_dir: Path, variant: str = "full") -> Path | None:
+    """Checkpoint for a model variant (for "full": best, falling back to final)."""
+    for name in MODEL_VARIANTS[variant]:
+        path = Path(checkpoint_dir) / name
+        if path.exists():
+            return path
+    return None
+
+
+def export_stem(variant: str = "full") -> str:
+    """Base file name for a variant's ONNX / numpy exports ("pulsenet", "pulsenet_tiny")."""
+    return "pulsenet" if variant == "full" else f"pulsenet_{variant}"
+
+
+def export_is_stale(export_path: Path, checkpoint_path: Path | None) -> bool:
+    """True if an export is missing or older than the checkpoint or norm stats folded into it."""
+    if not export_path.exists() or checkpoint_path is None:
+        return True
+    sources = [checkpoint_path, *(checkpoint_path.parent / name for name in ("norm_mean.npy", "norm_std.npy"))]
+    built = export_path.stat().st_mtime
+    return any(path.exists() and path.stat().st_mtime > built for path in sources)
+
+
+def load_pulsenet(checkpoint_path: Path, device: torch.device) -> PulseNet:
+    """Build a PulseNet from a training checkpoint (weights + config)."""
+    checkpoint = torch.load(checkpoint_path, map_location=device, weights_only=False)
+    config = checkpoint.get("config", {})
+    model = PulseNet(
+        seq_len=config.get("seq_len", 60),
+        n_features=config.get("n_features", 4),
+        d_model=config.get("d_model", 64),
+        n_heads=config.get("n_heads", 4),
+        n_layers=config.get("n_layers", 3),
+        d_ff=config.get("d_ff", 128),
+        early_exit=config.get("early_exit", False),
+    ).to(device)
+    model.load_state_dict(checkpoint["model_state_dict"])
+    model.eval()
+    return model
+
+
+def load_norm_stats(checkpoint_dir: Path) -> tuple[np.ndarray, np.ndarray]:
+    """Normalization mean/std saved by training, or demo defaults."""
+    mean_path = Path(checkpoint_dir) / "norm_mean.npy"
+    std_path = Path(checkpoint_dir) / "norm_std.npy"
+    if mean_path.exists() and std_path.exists():
+        return np.load(mean_path), np.load(std_path)
+    return DEFAULT_MEAN.copy(), DEFAULT_STD.copy()
+
+
+class StaleProjectionError(RuntimeError):
+    """A projected window was queued under a model that has since been swapped out."""
+
+
+class ResultDetail(str, enum.Enum):
+    """How much of the inference result to compute and serialize.
+
+    score: overall_score, max_score, is_anomaly
+    timesteps: score fields + per_timestep_scores
+    full: timesteps fields + reconstruction, association discrepancy and attention maps
+    """
+
+    score = "score"
+    timesteps = "timesteps"
+    full = "full"
 
 
 class PulseNetInferenceService:
-    """Real-time inference service for PulseNet anomaly detection."""
+    """Real-time inference service for PulseNet anomaly detection.
 
-    def __init__(self, checkpoint_dir: str = "checkpoints"):
+    Args:
+        checkpoint_dir: Directory holding the checkpoint and normalization stats
+        max_batch_size: Largest micro-batch per forward pass (1 disables batching)
+        max_batch_wait_ms: Longest a window waits to be batched with others
+        backend: Forward-pass backend — "torch" (eager PyTorch), "torch_int8" (dynamic
+            int8 quantized PyTorch on CPU), "onnx" (onnxruntime CPU) or "numpy"
+            (pure NumPy; also the fallback when torch is not installed)
+        process_workers: If > 0, score/timestep batches run in this many worker
+            processes fed through shared memory instead of the thread pool
+        early_exit: (low, high) exit thresholds for checkpoints trained with early-exit
+            heads. Score/timestep requests on the torch backends then stop at the
+            first confident head and report `exit_layer`. Ignored for other
+            checkpoints and backends.
+        model_variant: Which checkpoint to serve — "full" or "tiny" (the distilled
+            student; falls back to "full" when no tiny checkpoint exists)
+        version: Registry version label of `checkpoint_dir`, if any (see registry.py)
+        result_cache_size: If > 0, `infer` and `infer_batch_sync` reuse results for
+            windows seen recently (see result_cache.py); hits skip the executor
+        result_cache_ttl_s: Seconds a cached result stays valid
+        result_cache_quantum: Resolution windows are rounded to before hashing
+        routine_max_wait_ms: When the executor is saturated, urgent-lane batches are
+            served first; a routine batch that has waited this long goes next
+            (see priority.py)
+        executor_workers: Threads (and concurrent batches) in the in-process executor
+        slow_inference_ms: If > 0, batches whose service time (slot wait through
+            result building) exceeds this are logged with their stage breakdown
+    """
+
+    def __init__(
+        self,
+        checkpoint_dir: str = "checkpoints",
+        max_batch_size: int = 32,
+        max_batch_wait_ms: float = 2.0,
+        backend: str = "torch",
+        process_workers: int = 0,
+        early_exit: tuple[float, float] | None = None,
+        model_variant: str = "full",
+        version: str | None = None,
+        result_cache_size: int = 0,
+        result_cache_ttl_s: float = 30.0,
+        result_cache_quantum: float = 1e-3,
+        routine_max_wait_ms: float = 50.0,
+        slow_inference_ms: float = 0.0,
+        executor_workers: int = 2,
+    ):
+        if model_variant not in MODEL_VARIANTS:
+            raise ValueError(f"Unknown PulseNet model variant: {model_variant}")
         self.checkpoint_dir = Path(checkpoint_dir)
+        self.model_variant = model_variant
+        self.requested_variant = model_variant
+        self.version = version
+        self.backend_name = backend
+        self.backend: TorchBackend | OnnxBackend | NumpyBackend | None = None
         self.model: PulseNet | None = None
         self.device: torch.device | None = None
+        self.parameter_count = 0
+        self.seq_len = 60
+        self.n_features = 4
         self.mean: np.ndarray | None = None
         self.std: np.ndarray | None = None
-        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pulsenet")
-        self._lock = asyncio.Semaphore(2)
+        self._concurrency = max(1, executor_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix="pulsenet")
+        self._gate = PriorityGate(self._concurrency, routine_max_wait_ms)
         self._loaded = False
+        self.generation = 0  # bumped on every successful load; invalidates streaming caches
+        self._projection: tuple[np.ndarray, np.ndarray] | None = None
+        self.process_workers = process_workers
+        self._process_pool: ProcessPoolInference | None = None
+        # Two shared-memory slots per worker (see process_pool.py)
+        self._pool_gate = PriorityGate(2 * process_workers, routine_max_wait_ms) if process_workers > 0 else None
+        self.early_exit = early_exit
+        self._exit_counts: dict[int, int] = {}
+        self._batcher = MicroBatcher(self._run_batch, max_batch_size, max_batch_wait_ms)
+        self.stages = StageLatency()
+        self.slow_inference_ms = slow_inference_ms
+        self.result_cache = (
+            ResultCache(result_cache_size, result_cache_ttl_s, result_cache_quantum)
+            if result_cache_size > 0 else None
+        )
+        # Hot reload: (checkpoint_dir, version) of earlier models, for rollback
+        self._version_history: list[tuple[Path, str | None]] = []
+        self._swap_lock = asyncio.Lock()
+        self._swap_task: asyncio.Task | None = None
+        self._retiring: set[asyncio.Task] = set()
+        self.reload_status: dict = {"state": "idle", "version": None, "error": None}
 
     def load(self) -> bool:
         """Load model from checkpoint. Returns True if successful."""
         try:
-            if torch.backends.mps.is_available():
-                self.device = torch.device("mps")
-            elif torch.cuda.is_available():
-                self.device = torch.device("cuda")
-            else:
-                self.device = torch.device("cpu")
-
-            checkpoint_path = self.checkpoint_dir / "pulsenet_best.pt"
-            if not checkpoint_path.exists():
-                checkpoint_path = self.checkpoint_dir / "pulsenet_final.pt"
-
-            if not checkpoint_path.exists():
-                print("No PulseNet checkpoint found. Using random weights for demo.")
-                self.model = PulseNet().to(self.device)
-                self.mean = np.array([72.0, 50.0, 1.0, 36.5], dtype=np.float32)
-                self.std = np.array([15.0, 15.0, 0.5, 0.5], dtype=np.float32)
-                self._loaded = True
-                return True
-
-            checkpoint = torch.load(checkpoint_path, map_location=self.device, weights_only=False)
-            config = checkpoint.get("config", {})
-            self.model = PulseNet(
-                seq_len=config.get("seq_len", 60),
-                n_features=config.get("n_features", 4),
-                d_model=config.get("d_model", 64),
-                n_heads=config.get("n_heads", 4),
-                n_layers=config.get("n_layers", 3),
-                d_ff=config.get("d_ff", 128),
-            ).to(self.device)
-            self.model.load_state_dict(checkpoint["model_state_dict"])
-            self.model.eval()
-
-            mean_path = self.checkpoint_dir / "norm_mean.npy"
-            std_path = self.checkpoint_dir / "norm_std.npy"
-            if mean_path.exists() and std_path.exists():
-                self.mean = np.load(mean_path)
-                self.std = np.load(std_path)
+            checkpoint_path = find_checkpoint(self.checkpoint_dir, self.model_variant)
+            if checkpoint_path is None and self.model_variant != "full":
+                print(f"No {self.model_variant} PulseNet checkpoint found; serving the full model.")
+                self.model_variant = "full"
+                checkpoint_path = find_checkpoint(self.checkpoint_dir)
+            self.mean, self.std = load_norm_stats(self.checkpoint_dir)
+
+            backend_name = self.backend_name
+            if torch is None:
+                if backend_name != "numpy":
+                    print(f"PyTorch not installed; using numpy backend instead of {backend_name}.")
+                backend_name = "numpy"
             else:
-                self.mean = np.array([72.0, 50.0, 1.0, 36.5], dtype=np.float32)
-                self.std = np.array([15.0, 15.0, 0.5, 0.5], dtype=np.float32)
+                self._load_torch_model(checkpoint_path, backend_name)
 
-            self._loaded = True
-            print(f"PulseNet loaded from {checkpoint_path} ({self.model.count_parameters():,} params)")
+            self.backend = self._create_backend(backend_name, checkpoint_path)
+            self._finish_load()
+            # Without torch the weights come from the .npz export, not the checkpoint
+            loaded_from = self._numpy_export_path() if self.model is None else checkpoint_path
+            print(
+                f"PulseNet loaded from {loaded_from or 'random init'} "
+                f"({self.model_variant}, {self.parameter_count:,} params, {self.backend.name} backend)"
+            )
             return True
 
         except Exception as e:
             print(f"Failed to load PulseNet: {e}")
             return False
 
-    def _infer_sync(self, window: np.ndarray) -> dict:
-        """Synchronous inference on a single window. Called in thread pool."""
-        if self.model is None:
-            return {"error": "Model not loaded"}
+    def _load_torch_model(self, checkpoint_path: Path | None, backend_name: str):
+        if backend_name != "torch":
+            self.device = torch.device("cpu")
+        elif torch.backends.mps.is_available():
+            self.device = torch.device("mps")
+        elif torch.cuda.is_available():
+            self.device = torch.device("cuda")
+        else:
+            self.device = torch.device("cpu")
+
+        if checkpoint_path is None:
+            print("No PulseNet checkpoint found. Using random weights for demo.")
+            self.model = PulseNet().to(self.device)
+        else:
+            self.model = load_pulsenet(checkpoint_path, self.device)
+
+        self.model.freeze_for_inference(self.mean, self.std)
+        self.parameter_count = self.model.count_parameters()
+        self.seq_len = self.model.seq_len
+        self.n_features = self.model.n_features
+
+    def _finish_load(self):
+        self._attach_stage_timer()
+        self._projection = self.backend.input_projection if self.backend.supports_projected else None
+        if self.process_workers > 0:
+            self._start_process_pool()
+        self.generation += 1
+        self._loaded = True
+
+    def _attach_stage_timer(self):
+        if isinstance(self.backend, TorchBackend):
+            self.backend.stages = self.stages
+
+    def _create_backend(
+        self, backend_name: str, checkpoint_path: Path | None
+    ) -> TorchBackend | OnnxBackend | NumpyBackend:
+        early_exit = self.early_exit if self.model is not None and self.model.early_exit else None
+        if backend_name == "torch":
+            return TorchBackend(self.model, self.device, early_exit=early_exit)
+        if backend_name == "torch_int8":
+            from .quantization import quantize_pulsenet
+
+            return TorchBackend(
+                quantize_pulsenet(self.model), self.device, name="torch_int8", early_exit=early_exit
+            )
+        if backend_name == "onnx":
+            from .onnx_export import export_model
+
+            onnx_path = self.checkpoint_dir / f"{export_stem(self.model_variant)}.onnx"
+            if export_is_stale(onnx_path, checkpoint_path):
+                export_model(self.model, onnx_path)
+            return OnnxBackend(onnx_path)
+        if backend_name == "numpy":
+            if self.model is not None:
+                weights = {k: v.detach().cpu().numpy() for k, v in self.model.state_dict().items()}
+                engine = NumpyPulseNet(weights)
+            else:
+                engine = NumpyPulseNet.load(self._numpy_export_path())
+                self.parameter_count = engine.count_parameters()
+                self.seq_len = engine.seq_len
+                self.n_features = engine.n_features
+            return NumpyBackend(engine)
+        raise ValueError(f"Unknown PulseNet backend: {backend_name}")
+
+    def _numpy_export_path(self) -> Path:
+        return self.checkpoint_dir / f"{export_stem(self.model_variant)}.npz"
+
+    def _start_process_pool(self):
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+        self._process_pool = self._create_process_pool(self.process_workers, self._batcher.max_batch_size)
+
+    def _create_process_pool(self, n_workers: int, capacity: int) -> ProcessPoolInference:
+        return ProcessPoolInference(
+            str(self.checkpoint_dir),
+            self.backend_name,
+            n_workers,
+            capacity=capacity,
+            seq_len=self.seq_len,
+            n_features=self.n_features,
+            early_exit=self.early_exit,
+            model_variant=self.model_variant,
+        )
+
+    def warm_up(self, batch_sizes: tuple[int, ...] = (1, 8)):
+        """Run throwaway forwards so first real requests don't pay for lazy initialization."""
+        center = self.mean if self.mean is not None else DEFAULT_MEAN
+        for batch_size in batch_sizes:
+            windows = np.broadcast_to(center, (batch_size, self.seq_len, self.n_features)).astype(np.float32)
+            for detail in (ResultDetail.score, ResultDetail.full):
+                self._infer_batch_sync(windows, detail)
+
+    @property
+    def swap_in_progress(self) -> bool:
+        return self._swap_task is not None and not self._swap_task.done()
 
-        x = torch.tensor(window, dtype=torch.float32)
-        if x.dim() == 2:
-            x = x.unsqueeze(0)
+    def start_hot_swap(self, checkpoint_dir: str | Path, version: str | None = None) -> asyncio.Task:
+        """Begin `hot_swap` in the background; progress is reported in `reload_status`."""
+        if self.swap_in_progress:
+            raise RuntimeError("A PulseNet model swap is already in progress")
+        self._swap_task = asyncio.create_task(self.hot_swap(checkpoint_dir, version))
+        return self._swap_task
 
-        mean_t = torch.tensor(self.mean, dtype=torch.float32, device=self.device)
-        std_t = torch.tensor(self.std, dtype=torch.float32, device=self.device)
+    def start_rollback(self) -> asyncio.Task:
+        """Begin `rollback` in the background."""
+        if self.swap_in_progress:
+            raise RuntimeError("A PulseNet model swap is already in progress")
+        if not self._version_history:
+            raise RuntimeError("No previous PulseNet version to roll back to")
+        self._swap_task = asyncio.create_task(self.rollback())
+        return self._swap_task
 
-        x = x.to(self.device)
-        x_norm = (x - mean_t) / (std_t + 1e-8)
+    async def hot_swap(self, checkpoint_dir: str | Path, version: str | None = None) -> dict:
+        """Load a checkpoint directory off the serving path, warm it up and swap it in.
 
-        with torch.no_grad():
-            reconstruction, anomaly_scores, series_attns, prior_attns = self.model(x_norm)
-            discrepancy = self.model.compute_association_discrepancy(series_attns, prior_attns)
+        Loading and warm-up run in a separate thread (and, with process
+        workers, a fresh worker pool), so the current model keeps serving.
+        The swap then waits for in-flight thread-pool forwards to finish and
+        replaces the model references in one step on the event loop. The old
+        worker pool is retired once its in-flight batches return. The previous
+        model is kept for `rollback`.
+        """
+        async with self._swap_lock:
+            previous = (self.checkpoint_dir, self.version)
+            await self._swap_to(Path(checkpoint_dir), version)
+            self._version_history.append(previous)
+            return self.get_model_info()
 
-        recon_np = reconstruction[0].cpu().numpy()
-        recon_denorm = recon_np * (self.std + 1e-8) + self.mean
+    async def rollback(self) -> dict:
+        """Swap back to the model that was serving before the last `hot_swap`."""
+        async with self._swap_lock:
+            if not self._version_history:
+                raise RuntimeError("No previous PulseNet version to roll back to")
+            checkpoint_dir, version = self._version_history[-1]
+            await self._swap_to(checkpoint_dir, version)
+            self._version_history.pop()
+            return self.get_model_info()
 
-        scores_np = anomaly_scores[0, :, 0].cpu().numpy()
-        disc_np = discrepancy[0].cpu().item()
+    async def _swap_to(self, checkpoint_dir: Path, version: str | None):
+        self.reload_status = {"state": "loading", "version": version, "error": None}
+        candidate = PulseNetInferenceService(
+            str(checkpoint_dir),
+            max_batch_size=1,
+            backend=self.backend_name,
+            early_exit=self.early_exit,
+            model_variant=self.requested_variant,
+            version=version,
+        )
+        pool = None
+        try:
+            if not await asyncio.to_thread(candidate.load):
+                raise RuntimeError(f"Failed to load PulseNet from {checkpoint_dir}")
+            self.reload_status["state"] = "warming"
+            await asyncio.to_thread(candidate.warm_up)
+            if self.process_workers > 0:
+                pool = candidate._create_process_pool(self.process_workers, self._batcher.max_batch_size)
+                probe = np.zeros((1, candidate.seq_len, candidate.n_features), dtype=np.float32)
+                # One concurrent batch per worker makes every worker spawn and load its model
+                await asyncio.gather(*(pool.score(probe) for _ in range(self.process_workers)))
+        except Exception as e:
+            if pool is not None:
+                pool.shutdown()
+            self.reload_status = {"state": "failed", "version": version, "error": str(e)}
+            raise
+        finally:
+            candidate._executor.shutdown(wait=False)
+
+        # Hold every executor permit: in-flight forwards finish, new ones wait for the swap
+        for _ in range(self._gate.permits):
+            await self._gate.acquire(Lane.urgent)
+        try:
+            old_pool = self._adopt(candidate, pool)
+        finally:
+            for _ in range(self._gate.permits):
+                self._gate.release()
 
-        series_attn_np = series_attns[-1][0].cpu().numpy().mean(axis=0).tolist()
-        prior_attn_np = prior_attns[-1][0].cpu().numpy().tolist()
+        if old_pool is not None:
+            task = asyncio.create_task(old_pool.drain())
+            self._retiring.add(task)
+            task.add_done_callback(self._retiring.discard)
+        self.reload_status = {"state": "active", "version": version, "error": None}
+        print(f"PulseNet hot-swapped to {version or checkpoint_dir} (generation {self.generation})")
 
-        overall_score = float(np.mean(scores_np))
-        max_score = float(np.max(scores_np))
-        is_anomaly = max_score > 0.5
+    def _adopt(
+        self, candidate: PulseNetInferenceService, pool: ProcessPoolInference | None
+    ) -> ProcessPoolInference | None:
+        """Take over a loaded candidate's model state. Returns the replaced worker pool."""
+        for name in (
+            "checkpoint_dir", "model_variant", "version", "backend", "model", "device",
+            "parameter_count", "seq_len", "n_features", "mean", "std", "_projection",
+        ):
+            setattr(self, name, getattr(candidate, name))
+        old_pool, self._process_pool = self._process_pool, pool
+        self._exit_counts = {}
+        self._attach_stage_timer()
+        self.generation += 1
+        if self.result_cache is not None:
+            self.result_cache.clear()
+        self._loaded = True
+        return old_pool
 
+    def get_model_info(self) -> dict:
         return {
-            "overall_score": overall_score,
-            "max_score": max_score,
-            "is_anomaly": is_anomaly,
-            "per_timestep_scores": scores_np.tolist(),
-            "reconstruction": recon_denorm.tolist(),
-            "association_discrepancy": disc_np,
-            "attention_heatmap": series_attn_np,
-            "prior_attention": prior_attn_np,
+            "version": self.version,
+            "checkpoint_dir": str(self.checkpoint_dir),
+            "model_variant": self.model_variant,
+            "generation": self.generation,
+            "parameters": self.parameter_count,
+            "previous_versions": [version for _, version in self._version_history],
+            "reload": dict(self.reload_status),
         }
 
-    async def infer(self, window: np.ndarray) -> dict:
-        """Async inference — runs in thread pool to avoid blocking."""
-        if not self._loaded:
-            self.load()
-        async with self._lock:
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(self._executor, self._infer_sync, window)
+    def shutdown(self):
+        """Stop worker processes and threads."""
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+            self._process_pool = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
-    def infer_batch_sync(self, windows: np.ndarray) -> list[dict]:
-        """Synchronous batch inference on multiple windows."""
-        if self.model is None:
+    @property
+    def supports_projection(self) -> bool:
+        """Whether cached projected windows can be served (in-process backends only)."""
+        return (
+            self.backend is not None
+            and self.backend.supports_projected
+            and self._process_pool is None
+        )
+
+    def _infer_sync(self, window: np.ndarray, detail: ResultDetail = ResultDetail.full) -> dict:
+        """Synchronous inference on a single window. Called in thread pool."""
+        if self.backend is None:
+            return {"error": "Model not loaded"}
+
+        windows = window if window.ndim == 3 else window[np.newaxis]
+        return self._infer_batch_sync(windows[:1], detail)[0]
+
+    def _infer_batch_sync(
+        self,
+        windows: np.ndarray,
+        detail: ResultDetail,
+        projected: bool = False,
+        timings: dict[str, float] | None = None,
+    ) -> list[dict]:
+        """Synchronous inference on a batch of windows at the requested detail level.
+
+        Attention maps are only collected, and the association discrepancy
+        only computed, when the full visualization payload is requested.
+        With `projected`, windows are (seq_len, d_model) outputs of
+        `project_readings` and the input projection is skipped. Input
+        normalization is folded into the frozen model at load time.
+        Stage times (ms) are recorded and, if given, also written to `timings`.
+        """
+        if self.backend is None:
             return [{"error": "Model not loaded"}] * len(windows)
 
-        x = torch.tensor(windows, dtype=torch.float32).to(self.device)
-        mean_t = torch.tensor(self.mean, dtype=torch.float32, device=self.device)
-        std_t = torch.tensor(self.std, dtype=torch.float32, device=self.device)
-        x_norm = (x - mean_t) / (std_t + 1e-8)
+        start = time.perf_counter()
+        outputs = self.backend.run(windows, detail == ResultDetail.full, projected)
+        ran = time.perf_counter()
+        results = self._build_results(outputs, detail)
+        built = time.perf_counter()
 
-        with torch.no_grad():
-            reconstruction, anomaly_scores, series_attns, prior_attns = self.model(x_norm)
+        stage_ms = {"backend_run": (ran - start) * 1000.0, "build_results": (built - ran) * 1000.0}
+        for stage, ms in stage_ms.items():
+            self.stages.observe(stage, ms)
+        if timings is not None:
+            timings.update(stage_ms)
+        return results
 
-        results = []
-        for i in range(len(windows)):
-            scores_np = anomaly_scores[i, :, 0].cpu().numpy()
-            overall = float(np.mean(scores_np))
-            max_s = float(np.max(scores_np))
-            results.append({
+    def _build_results(self, outputs: dict[str, np.ndarray], detail: ResultDetail) -> list[dict]:
+        """Turn backend output arrays into per-window result dicts."""
+        full = detail == ResultDetail.full
+        scores_np = outputs["scores"]
+        overall_scores = scores_np.mean(axis=1).tolist()
+        max_scores = scores_np.max(axis=1).tolist()
+
+        results = [
+            {
                 "overall_score": overall,
                 "max_score": max_s,
                 "is_anomaly": max_s > 0.5,
-                "per_timestep_scores": scores_np.tolist(),
-            })
+            }
+            for overall, max_s in zip(overall_scores, max_scores)
+        ]
+        if "exit_layer" in outputs:
+            for result, exit_layer in zip(results, outputs["exit_layer"].tolist()):
+                result["exit_layer"] = exit_layer
+                self._exit_counts[exit_layer] = self._exit_counts.get(exit_layer, 0) + 1
+        if detail == ResultDetail.score:
+            return results
+
+        for result, timestep_scores in zip(results, scores_np.tolist()):
+            result["per_timestep_scores"] = timestep_scores
+        if not full:
+            return results
+
+        recon_denorm = outputs["reconstruction"] * (self.std + 1e-8) + self.mean
+        disc_np = outputs["discrepancy"]
+        series_attn_np = outputs["attention"]
+        # The prior depends only on the learned sigmas, so it is shared by the whole batch.
+        # Like the series heatmap, the payload carries head 0 only: (seq_len, seq_len).
+        prior_attn_list = outputs["prior"][0].tolist()
+
+        for i, result in enumerate(results):
+            result["reconstruction"] = recon_denorm[i].tolist()
+            result["association_discrepancy"] = float(disc_np[i])
+            result["attention_heatmap"] = series_attn_np[i].tolist()
+            result["prior_attention"] = prior_attn_list
+        return results
+
+    async def _run_batch(self, key: tuple, windows: np.ndarray) -> list[dict]:
+        """Run one micro-batch in the worker processes or the thread pool, by lane priority."""
+        projected, detail, _, lane, generation = key
+        start = time.perf_counter()
+        timings: dict[str, float] = {}
+        if self._process_pool is not None and not projected and detail != ResultDetail.full:
+            async with self._pool_gate.slot(lane):
+                acquired = time.perf_counter()
+                scores = await self._process_pool.score(windows)
+                scored = time.perf_counter()
+            results = self._build_results({"scores": scores}, detail)
+            timings["pool_score"] = (scored - acquired) * 1000.0
+            timings["build_results"] = (time.perf_counter() - scored) * 1000.0
+            self.stages.observe("pool_score", timings["pool_score"])
+            self.stages.observe("build_results", timings["build_results"])
+        else:
+            async with self._gate.slot(lane):
+                acquired = time.perf_counter()
+                # A swap adopts the new model only while holding every permit, so this check cannot race it
+                if projected and generation != self.generation:
+                    raise StaleProjectionError(
+                        f"Windows projected under generation {generation}, model is at {self.generation}"
+                    )
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(
+                    self._executor, self._timed_batch_sync, acquired, windows, detail, projected, timings
+                )
+        timings["slot_wait"] = (acquired - start) * 1000.0
+        self.stages.observe("slot_wait", timings["slot_wait"])
+
+        total_ms = (time.perf_counter() - start) * 1000.0
+        if self.slow_inference_ms > 0 and total_ms > self.slow_inference_ms:
+            logger.warning("PulseNet slow inference %s", json.dumps({
+                "total_ms": round(total_ms, 3),
+                "stages_ms": {stage: round(ms, 3) for stage, ms in timings.items()},
+                "batch_size": len(windows),
+                "detail": detail.value,
+                "lane": Lane(lane).value,
+                "projected": projected,
+                "backend": self.backend.name if self.backend is not None else None,
+                "version": self.version,
+            }))
+        return results
+
+    def _timed_batch_sync(
+        self, submitted: float, windows: np.ndarray, detail: ResultDetail, projected: bool, timings: dict
+    ) -> list[dict]:
+        """`_infer_batch_sync` on an executor thread, recording how long the job queued."""
+        timings["executor_queue"] = (time.perf_counter() - submitted) * 1000.0
+        self.stages.observe("executor_queue", timings["executor_queue"])
+        return self._infer_batch_sync(windows, detail, projected, timings)
+
+    async def infer(
+        self, window: np.ndarray, detail: ResultDetail = ResultDetail.full, lane: Lane = Lane.routine
+    ) -> dict:
+        """Async inference — runs in thread pool to avoid blocking.
+
+        Concurrent calls are gathered into micro-batches; each caller still
+        receives the result for its own window. `detail` controls how much of
+        the result payload is computed and serialized; `lane` sets the
+        priority of the window's batch when the executor is saturated.
+        """
+        if not self._loaded:
+            self.load()
+        detail = ResultDetail(detail)
+        if window.ndim == 3:
+            window = window[0]
+        cache_key = None
+        if self.result_cache is not None:
+            cache_key = self.result_cache.key(window, detail, self.generation)
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        start = time.perf_counter()
+        key = (False, detail, window.shape, Lane(lane), None)
+        if self._batcher.max_batch_size <= 1:
+            result = (await self._run_batch(key, window[np.newaxis]))[0]
+        else:
+            result = await self._batcher.submit(key, window)
+        self.stages.observe("total", (time.perf_counter() - start) * 1000.0)
+        if cache_key is not None:
+            self.result_cache.put(cache_key, result)
+        return result
+
+    def project_readings(self, readings: np.ndarray) -> np.ndarray:
+        """Project raw readings (n, n_features) to (n, d_model).
+
+        Cheap enough to run on the event loop; used to feed the per-device
+        projection cache one reading at a time.
+        """
+        if not self._loaded:
+            self.load()
+        weight, bias = self._projection  # normalization already folded in
+        return (readings @ weight.T + bias).astype(np.float32)
+
+    async def infer_projected(
+        self,
+        projected: np.ndarray,
+        detail: ResultDetail = ResultDetail.score,
+        lane: Lane = Lane.routine,
+        generation: int | None = None,
+    ) -> dict:
+        """Async inference on a cached projected window of shape (seq_len, d_model).
+
+        `generation` is the model generation the window was projected with
+        (default: the current one). Raises StaleProjectionError if a hot swap
+        lands before the window runs; the caller should re-project it.
+        """
+        if not self._loaded:
+            self.load()
+        generation = self.generation if generation is None else generation
+        key = (True, ResultDetail(detail), projected.shape, Lane(lane), generation)
+        if self._batcher.max_batch_size <= 1:
+            return (await self._run_batch(key, projected[np.newaxis]))[0]
+        return await self._batcher.submit(key, projected)
+
+    def get_batching_stats(self) -> dict:
+        return self._batcher.get_stats()
+
+    def reconfigure(
+        self,
+        executor_workers: int | None = None,
+        max_batch_size: int | None = None,
+        torch_threads: int | None = None,
+    ):
+        """Resize the executor, the micro-batch limit and torch intra-op threads.
+
+        Meant for startup tuning while the service is idle: the executor and
+        its priority gate are replaced, not resized in place.
+        """
+        if torch_threads and torch is not None and torch_threads != torch.get_num_threads():
+            torch.set_num_threads(torch_threads)
+        if executor_workers and executor_workers != self._concurrency:
+            old_executor = self._executor
+            self._concurrency = executor_workers
+            self._executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="pulsenet")
+            self._gate = PriorityGate(executor_workers, self._gate.routine_max_wait_ms)
+            old_executor.shutdown(wait=False)
+        if max_batch_size:
+            self._batcher.max_batch_size = max(1, max_batch_size)
+
+    def get_runtime_config(self) -> dict:
+        return {
+            "executor_workers": self._concurrency,
+            "torch_threads": torch.get_num_threads() if torch is not None else None,
+            "max_batch_size": self._batcher.max_batch_size,
+        }
+
+    def get_latency_stats(self) -> dict:
+        """Rolling p50/p95/p99 per inference stage, in milliseconds.
+
+        batch_wait: oldest window's wait for its micro-batch; slot_wait: wait for
+        an executor/pool slot; executor_queue: thread-pool queueing;
+        backend_run: the backend call, which for torch backends splits into
+        to_tensor, forward, discrepancy (full detail) and to_numpy;
+        pool_score: worker-process round trip; build_results: result dicts;
+        total: end to end per `infer` call (cache misses).
+        """
+        return {
+            "slow_inference_ms": self.slow_inference_ms,
+            "stages": {"batch_wait": self._batcher.wait_ms.snapshot(), **self.stages.snapshot()},
+        }
+
+    def get_priority_stats(self) -> dict:
+        """Per-lane queue depth and wait-time histograms for executor slots."""
+        return {
+            "executor": self._gate.get_stats(),
+            "process_pool": self._pool_gate.get_stats() if self._pool_gate is not None else None,
+        }
+
+    def get_result_cache_stats(self) -> dict:
+        if self.result_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.result_cache.get_stats()}
+
+    def get_early_exit_stats(self) -> dict:
+        """Windows scored per exit layer (empty unless early exit is active)."""
+        backend_exit = getattr(self.backend, "early_exit", None)
+        return {
+            "enabled": backend_exit is not None,
+            "thresholds": list(backend_exit) if backend_exit else None,
+            "windows_by_exit_layer": dict(sorted(self._exit_counts.items())),
+        }
+
+    def infer_batch_sync(
+        self, windows: np.ndarray, detail: ResultDetail = ResultDetail.timesteps
+    ) -> list[dict]:
+        """Synchronous batch inference on multiple windows.
+
+        With the result cache on, only windows without a fresh cached result
+        are run through the model.
+        """
+        detail = ResultDetail(detail)
+        if self.result_cache is None:
+            return self._infer_batch_sync(windows, detail)
+
+        keys = [self.result_cache.key(w, detail, self.generation) for w in windows]
+        results = [self.result_cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            for i, result in zip(missing, self._infer_batch_sync(windows[missing], detail)):
+                self.result_cache.put(keys[i], result)
+                results[i] = result
         return results
 
 
-pulsenet_service = PulseNetInferenceService()
+pulsenet_service = PulseNetInferenceService(
+    checkpoint_dir=settings.PULSENET_CHECKPOINT_DIR,
+    max_batch_size=settings.PULSENET_BATCH_MAX_SIZE,
+    max_batch_wait_ms=settings.PULSENET_BATCH_MAX_WAIT_MS,
+    backend=settings.PULSENET_BACKEND,
+    process_workers=settings.PULSENET_PROCESS_WORKERS,
+    early_exit=(
+        (settings.PULSENET_EARLY_EXIT_LOW, settings.PULSENET_EARLY_EXIT_HIGH)
+        if settings.PULSENET_EARLY_EXIT else None
+    ),
+    model_variant=settings.PULSENET_MODEL_VARIANT,
+    result_cache_size=settings.PULSENET_RESULT_CACHE_SIZE,
+    result_cache_ttl_s=settings.PULSENET_RESULT_CACHE_TTL_S,
+    result_cache_quantum=settings.PULSENET_RESULT_CACHE_QUANTUM,
+    routine_max_wait_ms=settings.PULSENET_ROUTINE_MAX_WAIT_MS,
+    slow_inference_ms=settings.PULSENET_SLOW_INFERENCE_MS,
+    executor_workers=settings.PULSENET_EXECUTOR_WORKERS,
+)
@@ -0,0 +1,82 @@
+"""Lightweight latency metrics for the inference path."""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Upper bucket bounds in milliseconds; the last bucket is open-ended
+DEFAULT_BUCKETS_MS = (0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 1000.0)
+
+
+class RollingHistogram:
+    """Bucketed histogram and percentiles over the most recent observations.
+
+    Args:
+        window: Number of recent observations kept
+        buckets_ms: Upper bounds of the histogram buckets, in milliseconds
+    """
+
+    def __init__(self, window: int = 2048, buckets_ms: tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0  # all-time observations
+
+    def observe(self, value_ms: float):
+        self._samples.append(value_ms)
+        self.count += 1
+
+    def percentile(self, q: float) -> float:
+        samples = list(self._samples)
+        return float(np.percentile(samples, q)) if samples else 0.0
+
+    def snapshot(self) -> dict:
+        samples = np.array(list(self._samples), dtype=np.float64)  # list() copies atomically
+        if len(samples):
+            p50, p95, p99 = np.percentile(samples, (50, 95, 99)).tolist()
+            max_ms = float(samples.max())
+        else:
+            p50 = p95 = p99 = max_ms = 0.0
+        counts = np.bincount(
+            np.searchsorted(self.buckets_ms, samples, side="left"), minlength=len(self.buckets_ms) + 1
+        ).tolist()
+        labels = [f"<={b:g}ms" for b in self.buckets_ms] + [f">{self.buckets_ms[-1]:g}ms"]
+        return {
+            "count": self.count,
+            "window": len(samples),
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "max_ms": max_ms,
+            "buckets": dict(zip(labels, counts)),
+        }
+
+
+class StageLatency:
+    """Named rolling histograms, one per pipeline stage.
+
+    Observations may come from executor threads; deque appends are atomic,
+    so no lock is taken on the hot path.
+    """
+
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self._stages: dict[str, RollingHistogram] = {}
+
+    def observe(self, stage: str, value_ms: float):
+        histogram = self._stages.get(stage)
+        if histogram is None:
+            histogram = self._stages.setdefault(stage, RollingHistogram(self.window))
+        histogram.observe(value_ms)
+
+    @contextmanager
+    def time(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - start) * 1000.0)
+
+    def snapshot(self) -> dict:
+        return {stage: histogram.snapshot() for stage, histogram in sorted(list(self._stages.items()))}
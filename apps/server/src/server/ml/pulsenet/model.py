@@ -24,8 +24,17 @@ class PriorAssociation(nn.Module):
         super().__init__()
         self.n_heads = n_heads
         self.sigma = nn.Parameter(torch.ones(n_heads) * 1.0)
+        self.register_buffer("frozen_prior", None, persistent=False)
+
+    def freeze(self, seq_len: int):
+        """Precompute the kernel for `seq_len` so inference forwards reuse it."""
+        with torch.no_grad():
+            self.frozen_prior = None
+            self.frozen_prior = self.forward(seq_len, self.sigma.device)
 
     def forward(self, seq_len: int, device: torch.device) -> torch.Tensor:
+        if self.frozen_prior is not None and self.frozen_prior.size(-1) == seq_len:
+            return self.frozen_prior
         positions = torch.arange(seq_len, dtype=torch.float32, device=device)
         distances = (positions.unsqueeze(0) - positions.unsqueeze(1)).abs()
         sigma = self.sigma.clamp(min=0.1).view(self.n_heads, 1, 1)
@@ -83,7 +92,9 @@ class AnomalyAttentionLayer(nn.Module):
         self.norm2 = nn.LayerNorm(d_model)
         self.dropout = nn.Dropout(dropout)
 
-    def forward(self, x: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    def forward(
+        self, x: torch.Tensor, with_prior: bool = True
+    ) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor | None]:
         residual = x
         x_norm = self.norm1(x)
         attn_out, series_attn = self.series_association(x_norm)
@@ -92,7 +103,7 @@ class AnomalyAttentionLayer(nn.Module):
         residual = x
         x = residual + self.ff(self.norm2(x))
 
-        prior_attn = self.prior_association(x.size(1), x.device)
+        prior_attn = self.prior_association(x.size(1), x.device) if with_prior else None
         return x, series_attn, prior_attn
 
 
@@ -110,6 +121,8 @@ class PulseNet(nn.Module):
         n_layers: Number of anomaly attention layers (default: 3)
         d_ff: Feed-forward hidden dimension (default: 128)
         dropout: Dropout rate (default: 0.1)
+        early_exit: Add an auxiliary anomaly head after every layer but the last,
+            so confident windows can stop early (default: False)
     """
 
     def __init__(
@@ -121,12 +134,15 @@ class PulseNet(nn.Module):
         n_layers: int = 3,
         d_ff: int = 128,
         dropout: float = 0.1,
+        early_exit: bool = False,
     ):
         super().__init__()
         self.n_features = n_features
         self.seq_len = seq_len
         self.d_model = d_model
         self.n_layers = n_layers
+        self.early_exit = early_exit
+        self.normalization_folded = False
 
         self.input_projection = nn.Linear(n_features, d_model)
         self.positional_embedding = nn.Parameter(
@@ -145,6 +161,15 @@ class PulseNet(nn.Module):
             nn.GELU(),
             nn.Linear(d_model // 2, 1),
         )
+        # Exit i scores the hidden state after layer i; the last layer uses anomaly_head
+        self.exit_heads = nn.ModuleList([
+            nn.Sequential(
+                nn.Linear(d_model, d_model // 2),
+                nn.GELU(),
+                nn.Linear(d_model // 2, 1),
+            )
+            for _ in range(n_layers - 1 if early_exit else 0)
+        ])
 
         self._init_weights()
 
@@ -154,34 +179,106 @@ class PulseNet(nn.Module):
                 nn.init.xavier_uniform_(p)
 
     def forward(
-        self, x: torch.Tensor
-    ) -> tuple[torch.Tensor, torch.Tensor, list[torch.Tensor], list[torch.Tensor]]:
+        self, x: torch.Tensor, return_attentions: bool = True, return_exits: bool = False
+    ) -> tuple:
         """
         Args:
             x: Input tensor of shape (batch, seq_len, n_features)
+            return_attentions: Collect per-layer attentions (skipped on the score-only path)
+            return_exits: Also return the early-exit head scores (training)
 
         Returns:
             reconstruction: Reconstructed input (batch, seq_len, n_features)
             anomaly_scores: Per-timestep anomaly scores (batch, seq_len, 1)
-            series_attentions: List of series attention weights per layer
-            prior_attentions: List of prior attention weights per layer
+            series_attentions: List of series attention weights per layer (empty if not requested)
+            prior_attentions: List of prior attention weights per layer (empty if not requested)
+            exit_scores: Per-timestep scores of each early-exit head (only with `return_exits`)
+        """
+        return self.forward_projected(self.input_projection(x), return_attentions, return_exits)
+
+    def forward_projected(
+        self, projected: torch.Tensor, return_attentions: bool = True, return_exits: bool = False
+    ) -> tuple:
+        """Run the encoder on inputs that already went through `input_projection`.
+
+        The projection is applied per timestep, so streaming callers can cache
+        projected readings and only project the newest one.
+
+        Args:
+            projected: Projected input of shape (batch, seq_len, d_model), without positional embedding
+            return_attentions: Collect per-layer attentions
+            return_exits: Also return the early-exit head scores
+
+        Returns:
+            Same as `forward`.
         """
-        h = self.input_projection(x) + self.positional_embedding[:, :x.size(1), :]
+        h = projected + self.positional_embedding[:, :projected.size(1), :]
         h = self.input_dropout(h)
 
         series_attentions = []
         prior_attentions = []
+        exit_scores = []
 
-        for layer in self.layers:
-            h, series_attn, prior_attn = layer(h)
-            series_attentions.append(series_attn)
-            prior_attentions.append(prior_attn)
+        for i, layer in enumerate(self.layers):
+            h, series_attn, prior_attn = layer(h, with_prior=return_attentions)
+            if return_attentions:
+                series_attentions.append(series_attn)
+                prior_attentions.append(prior_attn)
+            if return_exits and i < len(self.exit_heads):
+                exit_scores.append(torch.sigmoid(self.exit_heads[i](h)))
 
         reconstruction = self.reconstruction_head(h)
         anomaly_scores = torch.sigmoid(self.anomaly_head(h))
 
+        if return_exits:
+            return reconstruction, anomaly_scores, series_attentions, prior_attentions, exit_scores
         return reconstruction, anomaly_scores, series_attentions, prior_attentions
 
+    def forward_early_exit(
+        self, projected: torch.Tensor, low: float, high: float
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """Score-only forward that stops each window at its first confident exit head.
+
+        A window leaves after layer i when the max of exit head i's
+        per-timestep scores is below `low` (confidently normal) or above
+        `high` (confidently anomalous). Windows still undecided continue
+        with a smaller batch. Windows that reach the last layer are scored
+        by `anomaly_head`, as in `forward`.
+
+        Args:
+            projected: Projected input (batch, seq_len, d_model), as for `forward_projected`
+            low: Exit when every timestep scores below this
+            high: Exit when any timestep scores above this
+
+        Returns:
+            anomaly_scores: Per-timestep anomaly scores (batch, seq_len)
+            exit_layers: 1-based layer after which each window was scored (batch,)
+        """
+        h = projected + self.positional_embedding[:, :projected.size(1), :]
+        h = self.input_dropout(h)
+
+        scores = h.new_empty(h.shape[:2])
+        exit_layers = torch.full((h.size(0),), self.n_layers, dtype=torch.long, device=h.device)
+        remaining = torch.arange(h.size(0), device=h.device)
+
+        for i, layer in enumerate(self.layers):
+            h, _, _ = layer(h, with_prior=False)
+            if i == len(self.exit_heads):
+                break
+            exit_scores = torch.sigmoid(self.exit_heads[i](h))[:, :, 0]
+            window_max = exit_scores.max(dim=1).values
+            done = (window_max < low) | (window_max > high)
+            if done.any():
+                scores[remaining[done]] = exit_scores[done]
+                exit_layers[remaining[done]] = i + 1
+                keep = ~done
+                h, remaining = h[keep], remaining[keep]
+                if remaining.numel() == 0:
+                    return scores, exit_layers
+
+        scores[remaining] = torch.sigmoid(self.anomaly_head(h))[:, :, 0]
+        return scores, exit_layers
+
     def compute_association_discrepancy(
         self, series_attentions: list[torch.Tensor], prior_attentions: list[torch.Tensor]
     ) -> torch.Tensor:
@@ -201,6 +298,41 @@ class PulseNet(nn.Module):
             total_kl = total_kl + kl.mean(dim=-1)
         return total_kl / len(series_attentions)
 
+    def freeze_for_inference(self, mean=None, std=None) -> "PulseNet":
+        """Prepare a loaded model for serving. Must be called after load_state_dict.
+
+        - switches to eval mode
+        - replaces dropout modules with identities
+        - stores each layer's prior attention as a precomputed buffer
+        - if `mean`/`std` are given, folds input normalization into
+          `input_projection`, so the model takes raw (unnormalized) windows
+
+        Outputs are unchanged; each forward just allocates less. Calling it
+        again is harmless, except that normalization can only be folded once.
+        """
+        if mean is not None and std is not None and self.normalization_folded:
+            raise RuntimeError("Input normalization is already folded into input_projection")
+        self.eval()
+
+        for module in list(self.modules()):
+            for name, child in list(module.named_children()):
+                if isinstance(child, nn.Dropout):
+                    setattr(module, name, nn.Identity())
+
+        for layer in self.layers:
+            layer.prior_association.freeze(self.seq_len)
+
+        if mean is not None and std is not None:
+            weight = self.input_projection.weight
+            inv_std = 1.0 / (torch.as_tensor(std, dtype=weight.dtype, device=weight.device) + 1e-8)
+            mean_t = torch.as_tensor(mean, dtype=weight.dtype, device=weight.device)
+            with torch.no_grad():
+                # W((x - m) / s) + b == (W / s)x + (b - W(m / s))
+                self.input_projection.bias -= weight @ (mean_t * inv_std)
+                weight *= inv_std
+            self.normalization_folded = True
+        return self
+
     def count_parameters(self) -> int:
         return sum(p.numel() for p in self.parameters() if p.requires_grad)
 
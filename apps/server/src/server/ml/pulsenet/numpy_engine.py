@@ -0,0 +1,211 @@
+"""
+Pure-NumPy PulseNet forward pass for serving without PyTorch.
+
+Weights come from a `.npz` export of a frozen model's state dict (input
+normalization already folded into the input projection), written by
+`export_numpy_weights` on a machine that has torch. Loading and running the
+engine needs only numpy, so serving-only deployments can skip the torch
+install entirely.
+
+Usage (with torch installed):
+    python -m server.ml.pulsenet.numpy_engine --checkpoint-dir checkpoints
+
+Layer math mirrors model.py: pre-norm series attention and GELU feed-forward
+blocks with residuals, a reconstruction head, a sigmoid anomaly head and
+Gaussian prior kernels derived from the learned sigmas.
+"""
+
+import math
+from pathlib import Path
+
+import numpy as np
+
+NUMPY_WEIGHTS_FILENAME = "pulsenet.npz"
+
+
+def export_numpy_weights(model, output_path: str | Path) -> Path:
+    """Write a frozen torch PulseNet's weights to `.npz` (requires torch)."""
+    output_path = Path(output_path)
+    state = {k: v.detach().cpu().numpy() for k, v in model.state_dict().items()}
+    with open(output_path, "wb") as f:
+        np.savez(f, **state)
+    return output_path
+
+
+def _erf(x: np.ndarray) -> np.ndarray:
+    # Abramowitz & Stegun 7.1.26, |error| < 1.5e-7 — below float32 resolution of the scores.
+    # Evaluated in place to keep temporaries down on (batch, seq_len, d_ff) activations.
+    a = np.abs(x)
+    t = 0.3275911 * a
+    t += 1.0
+    np.reciprocal(t, out=t)
+    poly = t * 1.061405429
+    for c in (-1.453152027, 1.421413741, -0.284496736, 0.254829592):
+        poly += c
+        poly *= t
+    np.square(a, out=a)
+    np.negative(a, out=a)
+    np.exp(a, out=a)
+    poly *= a
+    np.subtract(1.0, poly, out=poly)
+    return np.copysign(poly, x, out=poly)
+
+
+def _gelu(x: np.ndarray) -> np.ndarray:
+    erf = _erf(x * (1.0 / math.sqrt(2.0)))
+    erf += 1.0
+    erf *= x
+    erf *= 0.5
+    return erf
+
+
+def _layer_norm(x: np.ndarray, weight: np.ndarray, bias: np.ndarray, eps: float = 1e-5) -> np.ndarray:
+    centered = x - x.mean(axis=-1, keepdims=True)
+    var = np.mean(np.square(centered), axis=-1, keepdims=True)
+    var += eps
+    centered /= np.sqrt(var)
+    centered *= weight
+    centered += bias
+    return centered
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    e = x - x.max(axis=-1, keepdims=True)
+    np.exp(e, out=e)
+    e /= e.sum(axis=-1, keepdims=True)
+    return e
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class NumpyPulseNet:
+    """PulseNet inference in NumPy, built from a state-dict export."""
+
+    def __init__(self, weights: dict[str, np.ndarray]):
+        self.w = {k: v.astype(np.float32) for k, v in weights.items()}
+        self.d_model, self.n_features = self.w["input_projection.weight"].shape
+        self.seq_len = self.w["positional_embedding"].shape[1]
+        self.n_layers = len({k.split(".")[1] for k in self.w if k.startswith("layers.")})
+        self.n_heads = self.w["layers.0.prior_association.sigma"].shape[0]
+        self.d_k = self.d_model // self.n_heads
+        self.priors = [self._prior(i) for i in range(self.n_layers)]
+
+    @classmethod
+    def load(cls, path: str | Path) -> "NumpyPulseNet":
+        with np.load(path) as data:
+            return cls({k: data[k] for k in data.files})
+
+    def count_parameters(self) -> int:
+        return int(sum(v.size for v in self.w.values()))
+
+    def _prior(self, layer: int) -> np.ndarray:
+        positions = np.arange(self.seq_len, dtype=np.float32)
+        distances = np.abs(positions[np.newaxis, :] - positions[:, np.newaxis])
+        sigma = np.maximum(self.w[f"layers.{layer}.prior_association.sigma"], 0.1).reshape(-1, 1, 1)
+        prior = np.exp(-0.5 * (distances / sigma) ** 2)
+        return (prior / prior.sum(axis=-1, keepdims=True)).astype(np.float32)
+
+    def _linear(self, x: np.ndarray, name: str) -> np.ndarray:
+        # One 2-D GEMM over all timesteps is faster than numpy's stacked matmul
+        out = x.reshape(-1, x.shape[-1]) @ self.w[f"{name}.weight"].T
+        out += self.w[f"{name}.bias"]
+        return out.reshape(*x.shape[:-1], out.shape[-1])
+
+    def _attention(self, x: np.ndarray, p: str) -> tuple[np.ndarray, np.ndarray]:
+        B, T, _ = x.shape
+
+        def heads(t: np.ndarray) -> np.ndarray:
+            return t.reshape(B, T, self.n_heads, self.d_k).transpose(0, 2, 1, 3)
+
+        q = heads(self._linear(x, f"{p}.W_q"))
+        k = heads(self._linear(x, f"{p}.W_k"))
+        v = heads(self._linear(x, f"{p}.W_v"))
+        attn = _softmax(q @ k.transpose(0, 1, 3, 2) * (1.0 / math.sqrt(self.d_k)))
+        out = (attn @ v).transpose(0, 2, 1, 3).reshape(B, T, self.d_model)
+        return self._linear(out, f"{p}.W_o"), attn
+
+    def forward(
+        self, x: np.ndarray, return_attentions: bool = True, projected: bool = False
+    ) -> tuple[np.ndarray, np.ndarray, list[np.ndarray], list[np.ndarray]]:
+        """Same outputs as `PulseNet.forward` (anomaly scores squeezed to (batch, seq_len))."""
+        x = np.asarray(x, dtype=np.float32)
+        h = x if projected else self._linear(x, "input_projection")
+        h = h + self.w["positional_embedding"][:, :h.shape[1], :]
+
+        series_attentions = []
+        for i in range(self.n_layers):
+            p = f"layers.{i}"
+            attn_out, series_attn = self._attention(
+                _layer_norm(h, self.w[f"{p}.norm1.weight"], self.w[f"{p}.norm1.bias"]),
+                f"{p}.series_association",
+            )
+            h = h + attn_out
+            ff = _layer_norm(h, self.w[f"{p}.norm2.weight"], self.w[f"{p}.norm2.bias"])
+            h = h + self._linear(_gelu(self._linear(ff, f"{p}.ff.0")), f"{p}.ff.3")
+            if return_attentions:
+                series_attentions.append(series_attn)
+
+        reconstruction = self._linear(h, "reconstruction_head")
+        hidden = _gelu(self._linear(h, "anomaly_head.0"))
+        scores = _sigmoid(self._linear(hidden, "anomaly_head.2"))[:, :, 0]
+        priors = self.priors if return_attentions else []
+        return reconstruction, scores, series_attentions, priors
+
+    def compute_association_discrepancy(
+        self, series_attentions: list[np.ndarray], prior_attentions: list[np.ndarray]
+    ) -> np.ndarray:
+        """KL(prior || series) averaged over timesteps and layers, as in `PulseNet`."""
+        total = 0.0
+        for series, prior in zip(series_attentions, prior_attentions):
+            series_mean = series.mean(axis=1)
+            prior_mean = prior.mean(axis=0)[np.newaxis]
+            log_prior = np.log(np.where(prior_mean > 0, prior_mean, 1.0))
+            kl = np.where(prior_mean > 0, prior_mean * (log_prior - np.log(series_mean + 1e-8)), 0.0)
+            total = total + kl.sum(axis=-1).mean(axis=-1)
+        return total / len(series_attentions)
+
+
+class NumpyBackend:
+    """Backend adapter for `NumpyPulseNet` (see backends.py for the output contract)."""
+
+    name = "numpy"
+    supports_projected = True
+
+    def __init__(self, engine: NumpyPulseNet):
+        self.engine = engine
+
+    @property
+    def input_projection(self) -> tuple[np.ndarray, np.ndarray]:
+        return self.engine.w["input_projection.weight"], self.engine.w["input_projection.bias"]
+
+    def run(self, windows: np.ndarray, full: bool, projected: bool = False) -> dict[str, np.ndarray]:
+        reconstruction, scores, series_attns, prior_attns = self.engine.forward(
+            windows, return_attentions=full, projected=projected
+        )
+        out = {"scores": scores}
+        if full:
+            out["reconstruction"] = reconstruction
+            out["attention"] = series_attns[-1].mean(axis=1)
+            out["prior"] = prior_attns[-1]
+            out["discrepancy"] = self.engine.compute_association_discrepancy(series_attns, prior_attns)
+        return out
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .inference import export_stem
+    from .onnx_export import load_frozen_model
+
+    parser = argparse.ArgumentParser(description="Export PulseNet weights for the numpy backend")
+    parser.add_argument("--checkpoint-dir", default="checkpoints")
+    parser.add_argument("--variant", default="full", choices=["full", "tiny"])
+    args = parser.parse_args()
+
+    path = export_numpy_weights(
+        load_frozen_model(args.checkpoint_dir, args.variant),
+        Path(args.checkpoint_dir) / f"{export_stem(args.variant)}.npz",
+    )
+    print(f"Exported PulseNet numpy weights to {path}")
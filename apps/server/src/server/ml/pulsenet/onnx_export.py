@@ -0,0 +1,145 @@
+"""
+Export PulseNet checkpoints to ONNX for the onnxruntime serving backend.
+
+The exported graph is the frozen inference model: input normalization is
+folded into the input projection and prior attentions are constants, so it
+takes raw windows of shape (batch, seq_len, n_features) with a dynamic batch
+axis and returns the arrays described in `backends.py`.
+
+Usage:
+    python -m server.ml.pulsenet.onnx_export --checkpoint-dir checkpoints
+    python -m server.ml.pulsenet.onnx_export --checkpoint-dir checkpoints --compare
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from .backends import OnnxBackend, TorchBackend
+from .inference import export_is_stale, export_stem, find_checkpoint, load_norm_stats, load_pulsenet
+from .model import PulseNet
+
+ONNX_FILENAME = "pulsenet.onnx"
+OUTPUT_NAMES = ["scores", "reconstruction", "attention", "discrepancy", "prior"]
+
+
+class _ExportGraph(nn.Module):
+    """Flattens PulseNet's outputs into the fixed tensors the ONNX backend reads."""
+
+    def __init__(self, model: PulseNet):
+        super().__init__()
+        self.model = model
+
+    def forward(self, window: torch.Tensor):
+        reconstruction, anomaly_scores, series_attns, prior_attns = self.model(window)
+        discrepancy = self.model.compute_association_discrepancy(series_attns, prior_attns)
+        return (
+            anomaly_scores[:, :, 0],
+            reconstruction,
+            series_attns[-1].mean(dim=1),
+            discrepancy,
+            prior_attns[-1],
+        )
+
+
+def load_frozen_model(checkpoint_dir: str | Path, variant: str = "full") -> PulseNet:
+    """Load the serving checkpoint on CPU and freeze it with its normalization stats."""
+    checkpoint_dir = Path(checkpoint_dir)
+    checkpoint_path = find_checkpoint(checkpoint_dir, variant)
+    if checkpoint_path is None:
+        raise FileNotFoundError(f"No {variant} PulseNet checkpoint in {checkpoint_dir}")
+    model = load_pulsenet(checkpoint_path, torch.device("cpu"))
+    mean, std = load_norm_stats(checkpoint_dir)
+    return model.freeze_for_inference(mean, std)
+
+
+def export_model(model: PulseNet, output_path: str | Path) -> Path:
+    """Export a frozen CPU model to ONNX with a dynamic batch axis."""
+    output_path = Path(output_path)
+    dummy = torch.zeros(2, model.seq_len, model.n_features)
+    torch.onnx.export(
+        _ExportGraph(model).eval(),
+        (dummy,),
+        str(output_path),
+        input_names=["window"],
+        output_names=OUTPUT_NAMES,
+        dynamic_axes={
+            "window": {0: "batch"},
+            "scores": {0: "batch"},
+            "reconstruction": {0: "batch"},
+            "attention": {0: "batch"},
+            "discrepancy": {0: "batch"},
+        },
+        opset_version=17,
+        dynamo=False,
+    )
+    return output_path
+
+
+def export_onnx(
+    checkpoint_dir: str | Path = "checkpoints",
+    output_path: str | Path | None = None,
+    variant: str = "full",
+) -> Path:
+    """Export a checkpoint variant (default output: <checkpoint_dir>/pulsenet[_<variant>].onnx)."""
+    checkpoint_dir = Path(checkpoint_dir)
+    output_path = Path(output_path) if output_path else checkpoint_dir / f"{export_stem(variant)}.onnx"
+    export_model(load_frozen_model(checkpoint_dir, variant), output_path)
+    print(f"Exported PulseNet to {output_path}")
+    return output_path
+
+
+def compare_latency(
+    checkpoint_dir: str | Path = "checkpoints",
+    batch_sizes: tuple[int, ...] = (1, 8, 32),
+    n_iters: int = 200,
+) -> list[dict]:
+    """Time the torch and onnxruntime backends on the same checkpoint."""
+    checkpoint_dir = Path(checkpoint_dir)
+    onnx_path = checkpoint_dir / ONNX_FILENAME
+    if export_is_stale(onnx_path, find_checkpoint(checkpoint_dir)):
+        export_onnx(checkpoint_dir, onnx_path)
+
+    model = load_frozen_model(checkpoint_dir)
+    backends = [TorchBackend(model, torch.device("cpu")), OnnxBackend(onnx_path)]
+    rng = np.random.RandomState(0)
+    mean, std = load_norm_stats(checkpoint_dir)
+
+    rows = []
+    for batch_size in batch_sizes:
+        windows = (mean + rng.randn(batch_size, model.seq_len, model.n_features) * std).astype(np.float32)
+        for full in (False, True):
+            row = {"batch_size": batch_size, "full": full}
+            for backend in backends:
+                backend.run(windows, full)  # warm-up
+                start = time.perf_counter()
+                for _ in range(n_iters):
+                    backend.run(windows, full)
+                row[f"{backend.name}_ms"] = (time.perf_counter() - start) / n_iters * 1000
+            row["speedup"] = row["torch_ms"] / row["onnx_ms"]
+            rows.append(row)
+
+    print(f"{'batch':>5} {'full':>5} {'torch ms':>9} {'onnx ms':>8} {'speedup':>8}")
+    for row in rows:
+        print(
+            f"{row['batch_size']:>5} {str(row['full']):>5} "
+            f"{row['torch_ms']:>9.3f} {row['onnx_ms']:>8.3f} {row['speedup']:>7.2f}x"
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export PulseNet to ONNX")
+    parser.add_argument("--checkpoint-dir", default="checkpoints")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--variant", default="full", choices=["full", "tiny"])
+    parser.add_argument("--compare", action="store_true", help="Print torch vs onnxruntime latency")
+    args = parser.parse_args()
+
+    export_onnx(args.checkpoint_dir, args.output, args.variant)
+    if args.compare:
+        compare_latency(args.checkpoint_dir)
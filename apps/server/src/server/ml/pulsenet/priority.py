@@ -0,0 +1,106 @@
+"""
+Priority lanes for PulseNet inference.
+
+When every executor slot is busy, batches queue for a slot. The gate
+serves urgent batches (devices with an active episode or a recent high
+score) ahead of routine ones. Routine batches still have bounded
+latency: once the oldest routine batch has waited `routine_max_wait_ms`,
+it is served before any urgent batch. That way a burst of urgent traffic
+cannot starve routine windows indefinitely.
+"""
+
+import asyncio
+import enum
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from .metrics import RollingHistogram
+
+
+class Lane(str, enum.Enum):
+    urgent = "urgent"
+    routine = "routine"
+
+
+class PriorityGate:
+    """A semaphore whose waiters are released by lane priority, with routine-lane aging.
+
+    Args:
+        permits: Concurrent holders (executor slots)
+        routine_max_wait_ms: Wait after which a routine batch is served ahead of urgent ones
+    """
+
+    def __init__(self, permits: int, routine_max_wait_ms: float = 50.0):
+        self.permits = max(1, permits)
+        self.routine_max_wait_ms = routine_max_wait_ms
+        self._available = self.permits
+        self._waiters: dict[Lane, deque[tuple[float, asyncio.Future]]] = {lane: deque() for lane in Lane}
+        self._wait_ms = {lane: RollingHistogram() for lane in Lane}
+        self.aged_promotions = 0
+
+    def depth(self, lane: Lane) -> int:
+        return sum(1 for _, future in self._waiters[lane] if not future.done())
+
+    async def acquire(self, lane: Lane = Lane.routine):
+        start = time.perf_counter()
+        self._prune()
+        if self._available > 0 and not any(self._waiters.values()):
+            self._available -= 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[lane].append((start, future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self.release()  # the permit was already handed to us
+                raise
+        self._wait_ms[lane].observe((time.perf_counter() - start) * 1000.0)
+
+    def release(self):
+        future = self._next_waiter()
+        if future is not None:
+            future.set_result(None)  # hand the permit straight to the waiter
+        else:
+            self._available += 1
+
+    def _prune(self):
+        """Drop waiters that were cancelled while queued."""
+        for waiters in self._waiters.values():
+            while waiters and waiters[0][1].done():
+                waiters.popleft()
+
+    def _next_waiter(self) -> asyncio.Future | None:
+        self._prune()
+        routine, urgent = self._waiters[Lane.routine], self._waiters[Lane.urgent]
+        if routine and urgent:
+            waited_ms = (time.perf_counter() - routine[0][0]) * 1000.0
+            if waited_ms >= self.routine_max_wait_ms:
+                self.aged_promotions += 1
+                return routine.popleft()[1]
+        if urgent:
+            return urgent.popleft()[1]
+        if routine:
+            return routine.popleft()[1]
+        return None
+
+    @asynccontextmanager
+    async def slot(self, lane: Lane = Lane.routine):
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def get_stats(self) -> dict:
+        return {
+            "permits": self.permits,
+            "available": self._available,
+            "routine_max_wait_ms": self.routine_max_wait_ms,
+            "aged_promotions": self.aged_promotions,
+            "lanes": {
+                lane.value: {"depth": self.depth(lane), "wait": self._wait_ms[lane].snapshot()}
+                for lane in Lane
+            },
+        }
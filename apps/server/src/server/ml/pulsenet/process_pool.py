@@ -0,0 +1,162 @@
+"""
+Multi-process PulseNet inference with shared-memory window transfer.
+
+Each worker process loads the model once (in the pool initializer). Batches
+are handed over through preallocated shared-memory slots: the parent copies
+windows into a slot's input buffer, the worker runs the forward pass and
+writes per-timestep scores into the slot's output buffer. Only the slot
+names and the batch length are pickled. Forward passes and the numpy work
+around them then run outside the server's GIL.
+
+Only score outputs travel back through shared memory. Full visualization
+payloads (attention maps, reconstruction) stay on the in-process path.
+"""
+
+import asyncio
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+_worker_service = None
+_worker_buffers: dict[str, SharedMemory] = {}
+
+
+def _init_worker(
+    checkpoint_dir: str,
+    backend: str,
+    torch_threads: int,
+    early_exit: tuple[float, float] | None,
+    model_variant: str,
+):
+    global _worker_service
+    from .inference import PulseNetInferenceService, torch
+
+    if torch is not None:
+        torch.set_num_threads(torch_threads)
+    service = PulseNetInferenceService(
+        checkpoint_dir, max_batch_size=1, backend=backend, early_exit=early_exit, model_variant=model_variant
+    )
+    if not service.load():
+        raise RuntimeError(f"PulseNet worker failed to load model from {checkpoint_dir}")
+    _worker_service = service
+
+
+def _attach(name: str) -> SharedMemory:
+    shm = _worker_buffers.get(name)
+    if shm is None:
+        # Spawned workers share the parent's resource tracker, which already tracks
+        # the segment; the parent unlinks it (and unregisters it) on shutdown
+        shm = SharedMemory(name=name)
+        _worker_buffers[name] = shm
+    return shm
+
+
+def _worker_run(in_name: str, out_name: str, n: int, seq_len: int, n_features: int):
+    """Score `n` windows from shared memory slot `in_name` into `out_name`."""
+    inputs = np.ndarray((n, seq_len, n_features), dtype=np.float32, buffer=_attach(in_name).buf)
+    outputs = np.ndarray((n, seq_len), dtype=np.float32, buffer=_attach(out_name).buf)
+    outputs[:] = _worker_service.backend.run(inputs, full=False)["scores"]
+
+
+class _Slot:
+    """A pair of shared-memory buffers sized for one batch."""
+
+    def __init__(self, capacity: int, seq_len: int, n_features: int):
+        self.capacity = capacity
+        self.input_shm = SharedMemory(create=True, size=capacity * seq_len * n_features * 4)
+        self.output_shm = SharedMemory(create=True, size=capacity * seq_len * 4)
+        self.inputs = np.ndarray((capacity, seq_len, n_features), dtype=np.float32, buffer=self.input_shm.buf)
+        self.outputs = np.ndarray((capacity, seq_len), dtype=np.float32, buffer=self.output_shm.buf)
+
+    def release(self):
+        del self.inputs, self.outputs
+        for shm in (self.input_shm, self.output_shm):
+            shm.close()
+            shm.unlink()
+
+
+class ProcessPoolInference:
+    """Pool of model-holding worker processes fed through shared memory.
+
+    Args:
+        checkpoint_dir: Checkpoint directory each worker loads from
+        backend: Backend name each worker serves with (see PulseNetInferenceService)
+        n_workers: Number of worker processes
+        capacity: Windows per shared-memory slot; larger batches are split
+        seq_len: Window length
+        n_features: Features per timestep
+        torch_threads: Intra-op threads per worker
+        early_exit: Early-exit thresholds for the workers' services (exit layers are not reported back)
+        model_variant: Checkpoint variant the workers serve
+    """
+
+    def __init__(
+        self,
+        checkpoint_dir: str,
+        backend: str,
+        n_workers: int,
+        capacity: int = 32,
+        seq_len: int = 60,
+        n_features: int = 4,
+        torch_threads: int = 1,
+        early_exit: tuple[float, float] | None = None,
+        model_variant: str = "full",
+    ):
+        self.n_workers = n_workers
+        self.seq_len = seq_len
+        self.n_features = n_features
+        self._executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(str(checkpoint_dir), backend, torch_threads, early_exit, model_variant),
+        )
+        # Two slots per worker so the parent can fill one while the other is scored
+        self._slots = [_Slot(max(1, capacity), seq_len, n_features) for _ in range(2 * n_workers)]
+        self._free: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _free_slots(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._free is None or self._loop is not loop:
+            self._loop = loop
+            self._free = asyncio.Queue()
+            for slot in self._slots:
+                self._free.put_nowait(slot)
+        return self._free
+
+    async def score(self, windows: np.ndarray) -> np.ndarray:
+        """Per-timestep scores (batch, seq_len) for raw windows (batch, seq_len, n_features)."""
+        free = self._free_slots()
+        capacity = self._slots[0].capacity
+        if len(windows) > capacity:
+            chunks = [windows[i:i + capacity] for i in range(0, len(windows), capacity)]
+            return np.concatenate(await asyncio.gather(*(self.score(c) for c in chunks)))
+
+        slot = await free.get()
+        try:
+            n = len(windows)
+            slot.inputs[:n] = windows
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                self._executor, _worker_run,
+                slot.input_shm.name, slot.output_shm.name, n, self.seq_len, self.n_features,
+            )
+            return slot.outputs[:n].copy()
+        finally:
+            free.put_nowait(slot)
+
+    async def drain(self):
+        """Wait for in-flight batches to hand their slots back, then shut down."""
+        free = self._free_slots()
+        for _ in self._slots:
+            await free.get()
+        await asyncio.to_thread(self.shutdown)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for slot in self._slots:
+            slot.release()
+        self._slots = []
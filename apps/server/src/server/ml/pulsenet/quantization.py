@@ -0,0 +1,136 @@
+"""
+Dynamic int8 quantization for CPU serving.
+
+Weights of the nn.Linear layers in the attention blocks, feed-forward blocks
+and output heads are stored as int8; activations are quantized on the fly.
+The 4 -> d_model input projection stays in float32 so the streaming
+projection cache keeps working, and so does the rest of the model
+(positional embedding, LayerNorm, priors).
+
+Usage:
+    python -m server.ml.pulsenet.quantization --checkpoint-dir checkpoints
+"""
+
+import argparse
+import copy
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.ao.quantization import quantize_dynamic
+
+from .dataset import HELD_OUT_SEED, PulseNetDataset
+from .model import PulseNet
+
+
+def quantize_pulsenet(model: PulseNet) -> PulseNet:
+    """Return an int8 dynamically quantized copy of a frozen CPU model."""
+    linear_names = {
+        name for name, module in model.named_modules()
+        if isinstance(module, nn.Linear) and name != "input_projection"
+    }
+    return quantize_dynamic(copy.deepcopy(model).cpu(), linear_names, dtype=torch.qint8)
+
+
+def window_scores(model: PulseNet, windows: np.ndarray, batch_size: int = 256) -> np.ndarray:
+    """Per-timestep anomaly scores (n, seq_len) of a frozen model on raw windows."""
+    scores = []
+    with torch.no_grad():
+        for i in range(0, len(windows), batch_size):
+            x = torch.tensor(windows[i:i + batch_size], dtype=torch.float32)
+            _, anomaly_scores, _, _ = model(x, return_attentions=False)
+            scores.append(anomaly_scores[:, :, 0].numpy())
+    return np.concatenate(scores)
+
+
+def latency_ms(model: PulseNet, windows: np.ndarray, n_iters: int) -> float:
+    """Mean forward latency in milliseconds for `windows` as one batch, after a warm-up pass."""
+    x = torch.tensor(windows, dtype=torch.float32)
+    with torch.no_grad():
+        model(x, return_attentions=False)
+        start = time.perf_counter()
+        for _ in range(n_iters):
+            model(x, return_attentions=False)
+    return (time.perf_counter() - start) / n_iters * 1000
+
+
+def accuracy_latency_report(
+    checkpoint_dir: str | Path = "checkpoints",
+    n_samples: int = 2000,
+    batch_sizes: tuple[int, ...] = (1, 8, 32),
+    n_iters: int = 100,
+) -> dict:
+    """Compare float32 and int8 PulseNet on validation windows.
+
+    Reports per-timestep score drift, anomaly-decision agreement, window AUC
+    for both models and forward latency per batch size.
+    """
+    from .onnx_export import load_frozen_model
+    from .train import _compute_auc
+
+    model = load_frozen_model(checkpoint_dir)
+    qmodel = quantize_pulsenet(model)
+
+    dataset = PulseNetDataset(n_samples=n_samples, anomaly_ratio=0.3, seed=HELD_OUT_SEED)
+    fp32_scores = window_scores(model, dataset.data)
+    int8_scores = window_scores(qmodel, dataset.data)
+
+    drift = np.abs(fp32_scores - int8_scores)
+    fp32_anomaly = fp32_scores.max(axis=1) > 0.5
+    int8_anomaly = int8_scores.max(axis=1) > 0.5
+
+    report = {
+        "n_windows": n_samples,
+        "score_drift": {
+            "mean_abs": float(drift.mean()),
+            "p99_abs": float(np.percentile(drift, 99)),
+            "max_abs": float(drift.max()),
+            "window_mean_abs": float(np.abs(fp32_scores.mean(axis=1) - int8_scores.mean(axis=1)).mean()),
+        },
+        "decision_agreement": float((fp32_anomaly == int8_anomaly).mean()),
+        "auc": {
+            "fp32": float(_compute_auc(fp32_scores.mean(axis=1), dataset.labels)),
+            "int8": float(_compute_auc(int8_scores.mean(axis=1), dataset.labels)),
+        },
+        "latency_ms": [],
+    }
+
+    for batch_size in batch_sizes:
+        windows = dataset.data[:batch_size]
+        fp32_ms = latency_ms(model, windows, n_iters)
+        int8_ms = latency_ms(qmodel, windows, n_iters)
+        report["latency_ms"].append({
+            "batch_size": batch_size,
+            "fp32": fp32_ms,
+            "int8": int8_ms,
+            "speedup": fp32_ms / int8_ms,
+        })
+
+    drift_stats = report["score_drift"]
+    print(f"Validation windows: {n_samples}")
+    print(
+        f"Score drift  mean={drift_stats['mean_abs']:.5f}  "
+        f"p99={drift_stats['p99_abs']:.5f}  max={drift_stats['max_abs']:.5f}"
+    )
+    print(f"Anomaly decision agreement: {report['decision_agreement']:.2%}")
+    print(f"AUC  fp32={report['auc']['fp32']:.4f}  int8={report['auc']['int8']:.4f}")
+    print(f"{'batch':>5} {'fp32 ms':>8} {'int8 ms':>8} {'speedup':>8}")
+    for row in report["latency_ms"]:
+        print(f"{row['batch_size']:>5} {row['fp32']:>8.3f} {row['int8']:>8.3f} {row['speedup']:>7.2f}x")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PulseNet int8 accuracy vs latency report")
+    parser.add_argument("--checkpoint-dir", default="checkpoints")
+    parser.add_argument("--n-samples", type=int, default=2000)
+    parser.add_argument("--output", default=None, help="Optional JSON path for the report")
+    args = parser.parse_args()
+
+    result = accuracy_latency_report(args.checkpoint_dir, args.n_samples)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
@@ -0,0 +1,139 @@
+"""
+Versioned PulseNet checkpoint registry.
+
+Versions live under `<PULSENET_CHECKPOINT_DIR>/versions/<version>/`. Each
+one is a self-contained checkpoint directory: a `.pt` checkpoint plus the
+`norm_mean.npy` / `norm_std.npy` it was trained with. Checkpoints kept
+directly in the root directory are served as the `base` version, so
+existing deployments keep working without a versions/ tree. The version
+the server last switched to is recorded in `ACTIVE_VERSION`, so restarts
+come back on it.
+
+Usage:
+    python -m server.ml.pulsenet.registry list
+    python -m server.ml.pulsenet.registry register /path/to/training/output --version v2
+"""
+
+import re
+import shutil
+import time
+from pathlib import Path
+
+from .inference import MODEL_VARIANTS, find_checkpoint
+
+BASE_VERSION = "base"
+VERSIONS_DIRNAME = "versions"
+ACTIVE_FILENAME = "ACTIVE_VERSION"
+
+_VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+class ModelRegistry:
+    """Lists and registers checkpoint versions under one root directory."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    @property
+    def versions_dir(self) -> Path:
+        return self.root / VERSIONS_DIRNAME
+
+    def version_dir(self, version: str) -> Path:
+        """Checkpoint directory of a registered version (KeyError if unknown)."""
+        if version == BASE_VERSION:
+            path = self.root
+        elif _VERSION_PATTERN.match(version):
+            path = self.versions_dir / version
+        else:
+            raise KeyError(version)
+        if not _has_checkpoint(path):
+            raise KeyError(version)
+        return path
+
+    def list_versions(self) -> list[dict]:
+        """Registered versions, oldest first, with basic checkpoint metadata."""
+        entries = []
+        if _has_checkpoint(self.root):
+            entries.append(_describe(BASE_VERSION, self.root))
+        if self.versions_dir.is_dir():
+            for path in self.versions_dir.iterdir():
+                if path.is_dir() and _has_checkpoint(path):
+                    entries.append(_describe(path.name, path))
+        return sorted(entries, key=lambda e: (e["version"] != BASE_VERSION, e["registered_at"]))
+
+    def get_active(self) -> str | None:
+        """Version recorded as active, if it is still registered."""
+        path = self.root / ACTIVE_FILENAME
+        if not path.exists():
+            return None
+        version = path.read_text().strip()
+        try:
+            self.version_dir(version)
+        except KeyError:
+            return None
+        return version
+
+    def set_active(self, version: str):
+        self.version_dir(version)  # must exist
+        tmp = self.root / f".{ACTIVE_FILENAME}.tmp"
+        tmp.write_text(version)
+        tmp.replace(self.root / ACTIVE_FILENAME)
+
+    def register(self, source_dir: str | Path, version: str | None = None) -> str:
+        """Copy a training output directory into the registry as a new version."""
+        source_dir = Path(source_dir)
+        if not _has_checkpoint(source_dir):
+            raise FileNotFoundError(f"No PulseNet checkpoint in {source_dir}")
+        version = version or time.strftime("v%Y%m%d-%H%M%S")
+        if version == BASE_VERSION or not _VERSION_PATTERN.match(version):
+            raise ValueError(f"Invalid version name: {version}")
+        target = self.versions_dir / version
+        if target.exists():
+            raise FileExistsError(f"Version {version} already registered")
+
+        # Copy into a staging dir first so a half-copied version is never listed
+        staging = self.versions_dir / f".{version}.partial"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        for path in source_dir.iterdir():
+            if path.suffix in (".pt", ".npy", ".json"):
+                shutil.copy2(path, staging / path.name)
+        staging.rename(target)
+        return version
+
+
+def _has_checkpoint(path: Path) -> bool:
+    return path.is_dir() and any(find_checkpoint(path, variant) for variant in MODEL_VARIANTS)
+
+
+def _describe(version: str, path: Path) -> dict:
+    checkpoints = sorted(p.name for p in path.glob("*.pt"))
+    return {
+        "version": version,
+        "path": str(path),
+        "checkpoints": checkpoints,
+        "variants": [v for v in MODEL_VARIANTS if find_checkpoint(path, v)],
+        "registered_at": path.stat().st_mtime,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from ...config import settings
+
+    parser = argparse.ArgumentParser(description="PulseNet checkpoint registry")
+    parser.add_argument("--root", default=settings.PULSENET_CHECKPOINT_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    register_parser = sub.add_parser("register")
+    register_parser.add_argument("source_dir")
+    register_parser.add_argument("--version", default=None)
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == "list":
+        print(json.dumps(registry.list_versions(), indent=2))
+    else:
+        print(f"Registered version {registry.register(args.source_dir, args.version)}")
@@ -0,0 +1,92 @@
+"""
+Window-content result cache for PulseNet inference.
+
+Off-wrist or flatlined devices, and clients replaying the same
+`health_batch`, send identical or near-identical windows over and over.
+The cache keys each window by a hash of its values quantised to
+`quantum`, so windows that differ only below that resolution share an
+entry. Entries expire after `ttl_s` seconds and the least recently used
+entry is evicted once `max_entries` is reached. Keys also include the
+detail level and the model generation, so a reload never serves results
+from the previous model.
+"""
+
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+import numpy as np
+
+
+class ResultCache:
+    """LRU + TTL cache of per-window inference results.
+
+    Args:
+        max_entries: Cached results kept before the least recently used is evicted
+        ttl_s: Seconds a cached result stays valid (0 = no expiry)
+        quantum: Resolution windows are rounded to before hashing
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_s: float = 30.0, quantum: float = 1e-3):
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self.quantum = quantum
+        self._entries: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()  # infer_batch_sync may be called from worker threads
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def key(self, window: np.ndarray, *extra: Hashable) -> tuple:
+        """Cache key for one window; `extra` holds e.g. (detail, generation)."""
+        quantised = np.rint(window / self.quantum).astype(np.int64)
+        digest = hashlib.blake2b(quantised.tobytes(), digest_size=16).digest()
+        return (digest, window.shape, *extra)
+
+    def get(self, key: tuple) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, result = entry
+            if self.ttl_s and time.monotonic() - stored_at > self.ttl_s:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(result)  # callers may mutate nested lists (per_timestep_scores, prior, ...)
+
+    def put(self, key: tuple, result: dict):
+        if "error" in result:
+            return
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -8,6 +8,7 @@ Minimax training:
 Trains on synthetic data. ~1-2 hours on Apple Silicon MPS.
 """
 
+import itertools
 import json
 import time
 from pathlib import Path
@@ -18,7 +19,7 @@ import torch.nn as nn
 from torch.utils.data import DataLoader, random_split
 
 from .model import build_pulsenet
-from .dataset import PulseNetDataset
+from .dataset import HELD_OUT_SEED, PulseNetDataset, StreamingPulseNetDataset, TensorBatchLoader
 
 
 def get_device() -> torch.device:
@@ -29,6 +30,42 @@ def get_device() -> torch.device:
     return torch.device("cpu")
 
 
+def make_loaders(
+    dataset: PulseNetDataset, batch_size: int, batch_loader: bool = True, device: torch.device | None = None
+) -> tuple:
+    """80/20 random split into (train, val) loaders.
+
+    `batch_loader` serves whole batches from contiguous tensors
+    (`TensorBatchLoader`); without it, a per-item DataLoader collates dicts.
+    """
+    train_size = int(0.8 * len(dataset))
+    train_dataset, val_dataset = random_split(dataset, [train_size, len(dataset) - train_size])
+    if not batch_loader:
+        return (
+            DataLoader(train_dataset, batch_size=batch_size, shuffle=True, drop_last=True),
+            DataLoader(val_dataset, batch_size=batch_size, shuffle=False),
+        )
+    pin = device is not None and device.type == "cuda"
+    return (
+        TensorBatchLoader(
+            dataset, train_dataset.indices, batch_size, shuffle=True, drop_last=True, pin_memory=pin
+        ),
+        TensorBatchLoader(dataset, val_dataset.indices, batch_size, shuffle=False, pin_memory=pin),
+    )
+
+
+def loader_throughput(loader, device: torch.device, epochs: int = 1) -> float:
+    """Samples per second of iterating `loader` and moving each batch to `device`, without a model."""
+    n, start = 0, time.perf_counter()
+    for _ in range(epochs):
+        for batch in loader:
+            x = batch["input"].to(device, non_blocking=True)
+            batch["label"].to(device, non_blocking=True)
+            batch["anomaly_mask"].to(device, non_blocking=True)
+            n += len(x)
+    return n / (time.perf_counter() - start)
+
+
 def train_pulsenet(
     n_samples: int = 50000,
     batch_size: int = 128,
@@ -36,27 +73,60 @@ def train_pulsenet(
     lr: float = 1e-3,
     output_dir: str = "checkpoints",
     seq_len: int = 60,
+    early_exit: bool = False,
+    exit_loss_weight: float = 0.5,
+    data_cache_dir: str | None = None,
+    batch_loader: bool = True,
+    streaming: bool = False,
+    steps_per_epoch: int | None = None,
+    num_workers: int = 0,
 ) -> dict:
+    """Train PulseNet on synthetic data and save checkpoints to `output_dir`.
+
+    With `early_exit`, an auxiliary anomaly head after each intermediate
+    layer is trained jointly on the same per-timestep targets. Their loss is
+    weighted by `exit_loss_weight`.
+
+    With `data_cache_dir`, the synthetic data is cached there and memory-mapped
+    (see `PulseNetDataset`), so repeated runs skip generation. `batch_loader`
+    selects the batch-native loader over a per-item DataLoader (see
+    `make_loaders`).
+
+    With `streaming`, training batches come from an unbounded
+    `StreamingPulseNetDataset` generated in `num_workers` DataLoader workers,
+    and normalization stats are estimated from a streaming sample. Each epoch
+    is then `steps_per_epoch` batches (default: as many as a finite run of
+    `n_samples`), and validation uses a fixed set of `n_samples // 5` windows.
+    `steps_per_epoch` also caps the epochs of a finite run.
+    """
     device = get_device()
     print(f"Training on: {device}")
 
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    print("Generating synthetic training data...")
-    dataset = PulseNetDataset(n_samples=n_samples, seq_len=seq_len, anomaly_ratio=0.3)
-    mean, std = dataset.get_normalization_stats()
+    stream = None
+    if streaming:
+        print(f"Streaming synthetic training data ({num_workers} workers)...")
+        stream = StreamingPulseNetDataset(batch_size=batch_size, seq_len=seq_len, anomaly_ratio=0.3)
+        mean, std = stream.estimate_normalization_stats()
+        train_loader = DataLoader(
+            stream, batch_size=None, num_workers=num_workers, pin_memory=device.type == "cuda"
+        )
+        val_dataset = PulseNetDataset(
+            n_samples=max(batch_size, n_samples // 5), seq_len=seq_len, anomaly_ratio=0.3, cache_dir=data_cache_dir
+        )
+        val_loader = TensorBatchLoader(val_dataset, batch_size=batch_size, pin_memory=device.type == "cuda")
+        steps_per_epoch = steps_per_epoch or int(0.8 * n_samples) // batch_size
+    else:
+        print("Generating synthetic training data...")
+        dataset = PulseNetDataset(n_samples=n_samples, seq_len=seq_len, anomaly_ratio=0.3, cache_dir=data_cache_dir)
+        mean, std = dataset.get_normalization_stats()
+        train_loader, val_loader = make_loaders(dataset, batch_size, batch_loader, device)
     np.save(output_path / "norm_mean.npy", mean)
     np.save(output_path / "norm_std.npy", std)
 
-    train_size = int(0.8 * len(dataset))
-    val_size = len(dataset) - train_size
-    train_dataset, val_dataset = random_split(dataset, [train_size, val_size])
-
-    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True, drop_last=True)
-    val_loader = DataLoader(val_dataset, batch_size=batch_size, shuffle=False)
-
-    model = build_pulsenet(seq_len=seq_len).to(device)
+    model = build_pulsenet(seq_len=seq_len, early_exit=early_exit).to(device)
     optimizer = torch.optim.AdamW(model.parameters(), lr=lr, weight_decay=1e-4)
     scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=n_epochs)
     mse_loss_fn = nn.MSELoss(reduction="none")
@@ -77,15 +147,19 @@ def train_pulsenet(
         model.train()
         epoch_losses = {"total": 0, "recon": 0, "discrepancy": 0, "anomaly": 0}
         n_batches = 0
+        if stream is not None:
+            stream.set_epoch(epoch)
 
-        for batch in train_loader:
+        for batch in itertools.islice(train_loader, steps_per_epoch):
             x = batch["input"].to(device)
             labels = batch["label"].to(device)
             anomaly_mask = batch["anomaly_mask"].to(device)
 
             x_norm = (x - mean_t) / (std_t + 1e-8)
 
-            reconstruction, anomaly_scores, series_attns, prior_attns = model(x_norm)
+            reconstruction, anomaly_scores, series_attns, prior_attns, exit_scores = model(
+                x_norm, return_exits=True
+            )
 
             recon_loss = mse_loss_fn(reconstruction, x_norm).mean(dim=-1)  # [B, T]
 
@@ -114,6 +188,10 @@ def train_pulsenet(
                 disc_loss = disc_loss + normal_d - 0.1 * anomaly_d
 
             loss = normal_recon + anomaly_loss + 0.1 * disc_loss
+            for scores in exit_scores:
+                loss = loss + exit_loss_weight * nn.functional.binary_cross_entropy(
+                    scores, anomaly_target, reduction="mean"
+                )
 
             optimizer.zero_grad()
             loss.backward()
@@ -192,6 +270,7 @@ def train_pulsenet(
                     "n_heads": 4,
                     "n_layers": 3,
                     "d_ff": 128,
+                    "early_exit": early_exit,
                 },
             }, output_path / "pulsenet_best.pt")
             print(f"  -> Saved best model (val_loss={avg_val_loss:.4f}, AUC={auc:.4f})")
@@ -206,6 +285,7 @@ def train_pulsenet(
             "n_heads": 4,
             "n_layers": 3,
             "d_ff": 128,
+            "early_exit": early_exit,
         },
     }, output_path / "pulsenet_final.pt")
 
@@ -220,6 +300,174 @@ def train_pulsenet(
     return history
 
 
+def distill_pulsenet(
+    teacher_dir: str = "checkpoints",
+    output_dir: str | None = None,
+    n_samples: int = 50000,
+    batch_size: int = 128,
+    n_epochs: int = 20,
+    lr: float = 1e-3,
+    seq_len: int = 60,
+    d_model: int = 32,
+    n_heads: int = 2,
+    n_layers: int = 1,
+    d_ff: int = 64,
+    recon_weight: float = 0.5,
+    label_weight: float = 0.2,
+    compare_samples: int = 2000,
+    data_cache_dir: str | None = None,
+    batch_loader: bool = True,
+) -> dict:
+    """Distill the teacher checkpoint into PulseNet-Tiny (`pulsenet_tiny.pt`).
+
+    The student matches the teacher's per-timestep anomaly scores (soft BCE)
+    and its reconstruction (MSE). A small hard-label term on the anomaly
+    masks keeps it anchored to the ground truth. It reuses the teacher's
+    normalization stats, so `output_dir` defaults to `teacher_dir`, where the
+    service looks for them. Serve it with PULSENET_MODEL_VARIANT=tiny.
+
+    Returns the latency/AUC comparison from `compare_variants`.
+    """
+    from .inference import find_checkpoint, load_norm_stats, load_pulsenet
+
+    device = get_device()
+    output_path = Path(output_dir or teacher_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    teacher_path = find_checkpoint(Path(teacher_dir))
+    if teacher_path is None:
+        raise FileNotFoundError(f"No teacher checkpoint in {teacher_dir}")
+    teacher = load_pulsenet(teacher_path, device)
+    mean, std = load_norm_stats(Path(teacher_dir))
+    if output_path != Path(teacher_dir):
+        np.save(output_path / "norm_mean.npy", mean)
+        np.save(output_path / "norm_std.npy", std)
+    print(f"Distilling {teacher_path} on: {device}")
+
+    dataset = PulseNetDataset(n_samples=n_samples, seq_len=seq_len, anomaly_ratio=0.3, cache_dir=data_cache_dir)
+    train_loader, val_loader = make_loaders(dataset, batch_size, batch_loader, device)
+
+    config = {
+        "seq_len": seq_len,
+        "n_features": 4,
+        "d_model": d_model,
+        "n_heads": n_heads,
+        "n_layers": n_layers,
+        "d_ff": d_ff,
+    }
+    student = build_pulsenet(**config).to(device)
+    optimizer = torch.optim.AdamW(student.parameters(), lr=lr, weight_decay=1e-4)
+    scheduler = torch.optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=n_epochs)
+    bce = nn.functional.binary_cross_entropy
+    mse = nn.functional.mse_loss
+
+    mean_t = torch.tensor(mean, dtype=torch.float32, device=device)
+    std_t = torch.tensor(std, dtype=torch.float32, device=device)
+
+    def distill_loss(batch: dict) -> tuple[torch.Tensor, torch.Tensor]:
+        x_norm = (batch["input"].to(device) - mean_t) / (std_t + 1e-8)
+        with torch.no_grad():
+            teacher_recon, teacher_scores, _, _ = teacher(x_norm, return_attentions=False)
+        recon, scores, _, _ = student(x_norm, return_attentions=False)
+        loss = (
+            bce(scores, teacher_scores)
+            + recon_weight * mse(recon, teacher_recon)
+            + label_weight * bce(scores, batch["anomaly_mask"].to(device).unsqueeze(-1))
+        )
+        return loss, scores
+
+    best_val_loss = float("inf")
+    start_time = time.time()
+
+    for epoch in range(n_epochs):
+        student.train()
+        train_loss = 0.0
+        for batch in train_loader:
+            loss, _ = distill_loss(batch)
+            optimizer.zero_grad()
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(student.parameters(), max_norm=1.0)
+            optimizer.step()
+            train_loss += loss.item()
+        scheduler.step()
+
+        student.eval()
+        val_loss = 0.0
+        all_scores = []
+        all_labels = []
+        with torch.no_grad():
+            for batch in val_loader:
+                loss, scores = distill_loss(batch)
+                val_loss += loss.item()
+                all_scores.append(scores.squeeze(-1).mean(dim=-1).cpu())
+                all_labels.append(batch["label"])
+        val_loss /= len(val_loader)
+        auc = _compute_auc(torch.cat(all_scores).numpy(), torch.cat(all_labels).numpy())
+
+        print(
+            f"Epoch {epoch + 1}/{n_epochs} | "
+            f"Train Loss: {train_loss / len(train_loader):.4f} | Val Loss: {val_loss:.4f} | "
+            f"AUC: {auc:.4f} | Time: {time.time() - start_time:.0f}s"
+        )
+
+        if val_loss < best_val_loss:
+            best_val_loss = val_loss
+            torch.save({
+                "model_state_dict": student.state_dict(),
+                "epoch": epoch,
+                "val_loss": val_loss,
+                "auc": auc,
+                "config": config,
+                "teacher": teacher_path.name,
+            }, output_path / "pulsenet_tiny.pt")
+            print(f"  -> Saved tiny model (val_loss={val_loss:.4f}, AUC={auc:.4f})")
+
+    report = compare_variants(output_path, teacher_dir=teacher_dir, n_samples=compare_samples)
+    with open(output_path / "distillation_report.json", "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def compare_variants(
+    checkpoint_dir: str | Path = "checkpoints",
+    teacher_dir: str | Path | None = None,
+    n_samples: int = 2000,
+    batch_sizes: tuple[int, ...] = (1, 32),
+    n_iters: int = 100,
+) -> dict:
+    """Latency/AUC table for the full model vs PulseNet-Tiny on held-out windows (CPU)."""
+    from .onnx_export import load_frozen_model
+    from .quantization import latency_ms, window_scores
+
+    models = {
+        "full": load_frozen_model(teacher_dir or checkpoint_dir),
+        "tiny": load_frozen_model(checkpoint_dir, "tiny"),
+    }
+    dataset = PulseNetDataset(n_samples=n_samples, anomaly_ratio=0.3, seed=HELD_OUT_SEED)
+
+    rows = []
+    for name, model in models.items():
+        scores = window_scores(model, dataset.data)
+        row = {
+            "model": name,
+            "parameters": model.count_parameters(),
+            "auc": float(_compute_auc(scores.mean(axis=1), dataset.labels)),
+            "decision_recall": float((scores.max(axis=1) > 0.5)[dataset.labels == 1].mean()),
+        }
+        for batch_size in batch_sizes:
+            row[f"latency_ms_b{batch_size}"] = latency_ms(model, dataset.data[:batch_size], n_iters)
+        rows.append(row)
+
+    latency_cols = [f"latency_ms_b{b}" for b in batch_sizes]
+    print(f"{'model':>6} {'params':>8} {'AUC':>7} {'recall':>7} " + " ".join(f"{c[8:]:>8}" for c in latency_cols))
+    for row in rows:
+        print(
+            f"{row['model']:>6} {row['parameters']:>8,} {row['auc']:>7.4f} {row['decision_recall']:>7.2%} "
+            + " ".join(f"{row[c]:>6.3f}ms" for c in latency_cols)
+        )
+    return {"n_windows": n_samples, "models": rows}
+
+
 def _compute_auc(scores: np.ndarray, labels: np.ndarray) -> float:
     """Simple AUC computation without sklearn dependency."""
     if len(np.unique(labels)) < 2:
@@ -235,9 +483,45 @@ def _compute_auc(scores: np.ndarray, labels: np.ndarray) -> float:
 
 
 if __name__ == "__main__":
-    train_pulsenet(
-        n_samples=50000,
-        batch_size=128,
-        n_epochs=30,
-        output_dir="checkpoints",
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train PulseNet")
+    parser.add_argument("--output-dir", default="checkpoints")
+    parser.add_argument(
+        "--distill", action="store_true",
+        help="Distill PulseNet-Tiny from the checkpoint in --output-dir instead of training the full model",
+    )
+    parser.add_argument(
+        "--data-cache-dir", default=None,
+        help="Cache the synthetic data here as memory-mapped .npy files and reuse it on later runs",
+    )
+    parser.add_argument(
+        "--streaming", action="store_true",
+        help="Train on an unbounded synthetic stream generated in DataLoader workers",
     )
+    parser.add_argument("--steps-per-epoch", type=int, default=None, help="Training batches per epoch")
+    parser.add_argument("--num-workers", type=int, default=0, help="DataLoader workers generating the stream")
+    parser.add_argument(
+        "--per-item-loader", action="store_true",
+        help="Use a per-item DataLoader instead of the batch-native tensor loader",
+    )
+    args = parser.parse_args()
+
+    if args.distill:
+        distill_pulsenet(
+            teacher_dir=args.output_dir,
+            data_cache_dir=args.data_cache_dir,
+            batch_loader=not args.per_item_loader,
+        )
+    else:
+        train_pulsenet(
+            n_samples=50000,
+            batch_size=128,
+            n_epochs=30,
+            output_dir=args.output_dir,
+            data_cache_dir=args.data_cache_dir,
+            batch_loader=not args.per_item_loader,
+            streaming=args.streaming,
+            steps_per_epoch=args.steps_per_epoch,
+            num_workers=args.num_workers,
+        )
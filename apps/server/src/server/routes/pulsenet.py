@@ -1,18 +1,38 @@
 """PulseNet model API — for the judge-killer visualizer screen."""
 
+import asyncio
 import json
+import secrets
 from pathlib import Path
 
 import numpy as np
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Header, HTTPException
 from pydantic import BaseModel
 
-from ..ml.pulsenet.inference import pulsenet_service
+from ..config import settings
+from ..ml.pulsenet.inference import ResultDetail, pulsenet_service
 from ..ml.pulsenet.dataset import PulseNetDataset
+from ..ml.pulsenet.registry import ModelRegistry
 from ..services.anomaly_detection import anomaly_detection_service
 
 router = APIRouter(prefix="/api/pulsenet", tags=["pulsenet"])
 
+# /demo draws windows from a fixed-seed pool, generated (or memory-mapped from the data cache) once
+DEMO_POOL_SIZE = 1024
+DEMO_POOL_SEED = 7
+_demo_pool: PulseNetDataset | None = None
+_demo_rng = np.random.default_rng()
+
+
+def _get_demo_pool() -> PulseNetDataset:
+    global _demo_pool
+    if _demo_pool is None:
+        _demo_pool = PulseNetDataset(
+            n_samples=DEMO_POOL_SIZE, seq_len=60, anomaly_ratio=0.5, seed=DEMO_POOL_SEED,
+            cache_dir=settings.PULSENET_DATA_CACHE_DIR or None,
+        )
+    return _demo_pool
+
 
 class InferRequest(BaseModel):
     window: list[list[float]]  # 60x4 array
@@ -21,13 +41,26 @@ class InferRequest(BaseModel):
 @router.get("/status")
 async def model_status():
     """Get PulseNet model status and info."""
-    if pulsenet_service.model is None:
+    if pulsenet_service.backend is None:
         return {"loaded": False}
     return {
         "loaded": True,
-        "parameters": pulsenet_service.model.count_parameters(),
-        "device": str(pulsenet_service.device),
+        "parameters": pulsenet_service.parameter_count,
+        "version": pulsenet_service.version,
+        "model_variant": pulsenet_service.model_variant,
+        "device": str(pulsenet_service.device or "cpu"),
+        "backend": pulsenet_service.backend.name,
         "checkpoint_dir": str(pulsenet_service.checkpoint_dir),
+        "runtime": anomaly_detection_service.get_runtime_stats(),
+        "batching": pulsenet_service.get_batching_stats(),
+        "result_cache": pulsenet_service.get_result_cache_stats(),
+        "priority": pulsenet_service.get_priority_stats(),
+        "latency": pulsenet_service.get_latency_stats(),
+        "early_exit": pulsenet_service.get_early_exit_stats(),
+        "prefilter": anomaly_detection_service.get_prefilter_stats(),
+        "cadence": anomaly_detection_service.get_cadence_stats(),
+        "coalescing": anomaly_detection_service.get_coalescing_stats(),
+        "shadow": anomaly_detection_service.get_shadow_stats(),
     }
 
 
@@ -35,20 +68,20 @@ async def model_status():
 async def run_inference(body: InferRequest):
     """Run PulseNet inference on a provided window. Returns full visualization data."""
     window = np.array(body.window, dtype=np.float32)
-    result = await pulsenet_service.infer(window)
+    result = await pulsenet_service.infer(window, ResultDetail.full)
     return result
 
 
 @router.get("/demo")
 async def demo_inference():
-    """Generate a random demo window and run inference — for live demos."""
-    dataset = PulseNetDataset(n_samples=2, seq_len=60, anomaly_ratio=0.5, seed=None)
-    sample = dataset[0]
-    window = sample["input"].numpy()
-    label = sample["label"].item()
-    anomaly_mask = sample["anomaly_mask"].numpy().tolist()
-
-    result = await pulsenet_service.infer(window)
+    """Pick a random demo window and run inference — for live demos."""
+    dataset = _get_demo_pool()
+    idx = int(_demo_rng.integers(len(dataset)))
+    window = np.array(dataset.data[idx])
+    label = float(dataset.labels[idx])
+    anomaly_mask = dataset.anomaly_masks[idx].tolist()
+
+    result = await pulsenet_service.infer(window, ResultDetail.full)
     return {
         "input": window.tolist(),
         "ground_truth_label": label,
@@ -73,7 +106,8 @@ async def architecture():
     return {
         "name": "PulseNet",
         "type": "Anomaly Detection Transformer",
-        "parameters": pulsenet_service.model.count_parameters() if pulsenet_service.model else 0,
+        "parameters": pulsenet_service.parameter_count,
+        "model_variant": pulsenet_service.model_variant,
         "layers": [
             {"name": "Input Projection", "type": "Linear", "shape": "4 → 64"},
             {"name": "Positional Embedding", "type": "Learnable", "shape": "60 × 64"},
@@ -109,3 +143,95 @@ async def architecture():
         "fine_tuned": False,
         "tagline": "No pre-trained weights. No fine-tuning. Every parameter learned from our pipeline.",
     }
+
+
+# --- Model registry / hot reload (admin) ---
+
+def require_admin(x_admin_token: str = Header(default="")):
+    """Fail closed: admin endpoints are disabled until PULSENET_ADMIN_TOKEN is set."""
+    expected = settings.PULSENET_ADMIN_TOKEN
+    if not expected:
+        raise HTTPException(status_code=503, detail="Model admin endpoints are disabled (no admin token configured)")
+    if not secrets.compare_digest(x_admin_token.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+def _registry() -> ModelRegistry:
+    return ModelRegistry(settings.PULSENET_CHECKPOINT_DIR)
+
+
+def _record_active(task: asyncio.Task):
+    if task.cancelled() or task.exception() is not None:
+        return
+    version = pulsenet_service.version
+    if version is not None:
+        _registry().set_active(version)
+
+
+async def _run_swap(task: asyncio.Task, wait: bool) -> dict:
+    task.add_done_callback(_record_active)
+    if not wait:
+        return {"status": "loading", **pulsenet_service.get_model_info()}
+    try:
+        return {"status": "active", **await task}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model swap failed: {e}")
+
+
+@router.get("/models", dependencies=[Depends(require_admin)])
+async def list_models():
+    """Registered checkpoint versions and the serving model."""
+    return {"active": pulsenet_service.get_model_info(), "versions": _registry().list_versions()}
+
+
+@router.post("/models/{version}/activate", dependencies=[Depends(require_admin)])
+async def activate_model(version: str, wait: bool = False):
+    """Load, warm up and atomically swap in a registered version.
+
+    Returns immediately unless `wait` is set; poll GET /models for progress.
+    """
+    try:
+        checkpoint_dir = _registry().version_dir(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {version}")
+    try:
+        task = pulsenet_service.start_hot_swap(checkpoint_dir, version)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return await _run_swap(task, wait)
+
+
+@router.post("/models/rollback", dependencies=[Depends(require_admin)])
+async def rollback_model(wait: bool = False):
+    """Swap back to the version that served before the last activation."""
+    try:
+        task = pulsenet_service.start_rollback()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return await _run_swap(task, wait)
+
+
+# --- Shadow evaluation (admin) ---
+
+@router.get("/shadow", dependencies=[Depends(require_admin)])
+async def shadow_status():
+    """Rolling score deltas and disagreement rate of the shadow model vs the primary."""
+    return {"primary_version": pulsenet_service.version, **anomaly_detection_service.get_shadow_stats()}
+
+
+@router.post("/shadow/{version}/start", dependencies=[Depends(require_admin)])
+async def start_shadow(version: str):
+    """Load a registered version as the shadow model (replaces any running shadow)."""
+    try:
+        await anomaly_detection_service.start_shadow(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {version}")
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return anomaly_detection_service.get_shadow_stats()
+
+
+@router.post("/shadow/stop", dependencies=[Depends(require_admin)])
+async def stop_shadow():
+    await anomaly_detection_service.shadow.stop()
+    return anomaly_detection_service.get_shadow_stats()
@@ -1,13 +1,21 @@
 """Anomaly detection service — orchestrates PulseNet inference on health data."""
 
+import asyncio
 import logging
 from datetime import datetime
 
 import numpy as np
 
 from ..config import settings
-from ..ml.pulsenet.inference import pulsenet_service
-from .health import health_service
+from ..ml.pulsenet.autotune import TUNABLE, autotune
+from ..ml.pulsenet.inference import ResultDetail, StaleProjectionError, pulsenet_service
+from ..ml.pulsenet.prefilter import StatisticalPrefilter
+from ..ml.pulsenet.priority import Lane
+from ..ml.pulsenet.registry import BASE_VERSION, ModelRegistry
+from .episode_service import episode_service
+from .health import WINDOW_SIZE, health_service
+from .inference_cadence import InferenceCadence
+from .shadow_evaluation import ShadowEvaluator
 
 logger = logging.getLogger(__name__)
 
@@ -18,28 +26,243 @@ class AnomalyDetectionService:
     def __init__(self):
         self._device_scores: dict[str, float] = {}
         self._device_results: dict[str, dict] = {}
+        self.prefilter = StatisticalPrefilter(
+            z_threshold=settings.PULSENET_PREFILTER_Z,
+            max_skip=settings.PULSENET_PREFILTER_MAX_SKIP,
+            decay=settings.PULSENET_PREFILTER_DECAY,
+        )
+        self.cadence = InferenceCadence(
+            min_stride=settings.PULSENET_CADENCE_MIN_STRIDE,
+            max_stride=settings.PULSENET_CADENCE_MAX_STRIDE,
+            low_score=settings.PULSENET_CADENCE_LOW_SCORE,
+        )
+        self.shadow = ShadowEvaluator(
+            sample_rate=settings.PULSENET_SHADOW_SAMPLE_RATE,
+            queue_size=settings.PULSENET_SHADOW_QUEUE_SIZE,
+            backend=settings.PULSENET_BACKEND,
+        )
+        # Latest-wins coalescing: devices with an inference in flight, and the
+        # one caller per device waiting to score next
+        self._inflight: set[str] = set()
+        self._next_waiter: dict[str, asyncio.Future] = {}
+        self.coalesced_dropped = 0
+        self.autotune_report: dict | None = None
 
     async def initialize(self):
+        registry = ModelRegistry(settings.PULSENET_CHECKPOINT_DIR)
+        version = registry.get_active() or BASE_VERSION
+        if version != BASE_VERSION:
+            pulsenet_service.checkpoint_dir = registry.version_dir(version)
+        pulsenet_service.version = version
         pulsenet_service.load()
+        if settings.PULSENET_TORCH_THREADS > 0:
+            pulsenet_service.reconfigure(torch_threads=settings.PULSENET_TORCH_THREADS)
+        if settings.PULSENET_AUTOTUNE and pulsenet_service.backend is not None:
+            await self.run_autotune()
 
-    async def process_reading(self, device_id: str, reading: dict) -> dict | None:
-        """Process a new reading. Returns inference result if window is full."""
-        window = health_service.get_window(device_id)
-        if window is None:
-            window = health_service.get_partial_window(device_id)
-            if window is None:
-                return None
+        if settings.PULSENET_SHADOW_VERSION:
+            try:
+                await self.start_shadow(settings.PULSENET_SHADOW_VERSION)
+            except (KeyError, RuntimeError) as e:
+                logger.warning(f"Shadow PulseNet not started: {e!r}")
+
+    async def shutdown(self):
+        await self.shadow.stop()
+        pulsenet_service.shutdown()
+
+    async def run_autotune(self) -> dict:
+        """Benchmark and apply the fastest inference concurrency for this host."""
+        pinned = {name.strip() for name in settings.PULSENET_AUTOTUNE_PIN.split(",") if name.strip()}
+        unknown = pinned - set(TUNABLE)
+        if unknown:
+            logger.warning(f"Ignoring unknown PULSENET_AUTOTUNE_PIN entries: {sorted(unknown)}")
+        self.autotune_report = await autotune(pulsenet_service, pinned & set(TUNABLE))
+        return self.autotune_report
+
+    def get_runtime_stats(self) -> dict:
+        """Serving concurrency, plus how the last autotune arrived at it."""
+        report = self.autotune_report
+        return {
+            **pulsenet_service.get_runtime_config(),
+            "autotune": None if report is None else {
+                "chosen": report["chosen"],
+                "pinned": report["pinned"],
+                "cpu_count": report["cpu_count"],
+                "duration_s": report["duration_s"],
+                "trials": len(report["trials"]),
+            },
+        }
+
+    async def start_shadow(self, version: str):
+        """Score a sample of live windows with a registered version, off the hot path."""
+        registry = ModelRegistry(settings.PULSENET_CHECKPOINT_DIR)
+        await self.shadow.start(registry.version_dir(version), version)
 
-        result = await pulsenet_service.infer(window)
+    async def process_reading(
+        self, device_id: str, reading: dict, detail: ResultDetail = ResultDetail.score
+    ) -> dict | None:
+        """Process a new reading. Returns inference result if window is full.
 
+        Streaming ingest only needs the window score, so the lean score-only
+        result is computed unless a richer `detail` level is requested.
+
+        With PULSENET_PREFILTER on, score-level windows that the statistical
+        pre-filter clears skip PulseNet and reuse the device's decayed last score.
+        With PULSENET_ADAPTIVE_CADENCE on, readings between a device's scheduled
+        inferences return its last result, marked `held`.
+        Windows from devices with an active episode or a recent max score at
+        or above PULSENET_PRIORITY_SCORE run in the urgent inference lane.
+        When a shadow model is running, a sample of the windows that reach
+        PulseNet is also queued to it; this never waits on the shadow model.
+        With PULSENET_COALESCE on, a score-level call for a device that already
+        has an inference in flight waits for it and then scores the newest
+        window; if a newer call arrives first, the waiting one returns None.
+        Calls for one device overlap when it streams `health_data` over more
+        than one connection; each socket's messages are handled in order.
+        """
+        active = episode_service.get_active_episode(device_id) is not None
+        cadence = settings.PULSENET_ADAPTIVE_CADENCE and detail == ResultDetail.score
+        if cadence and not self.cadence.is_due(device_id, active_episode=active):
+            last = self._device_results.get(device_id)
+            if last is not None and "error" not in last:
+                return {**last, "held": True}
+
+        prefilter = settings.PULSENET_PREFILTER and detail == ResultDetail.score
+        if prefilter:
+            result = self._prefilter_check(device_id)
+            if result is not None:
+                self._device_scores[device_id] = result["overall_score"]
+                self._device_results[device_id] = result
+                if cadence:
+                    self.cadence.record(device_id, result, inferred=False)
+                return result
+
+        if settings.PULSENET_COALESCE and detail == ResultDetail.score:
+            if not await self._claim_device(device_id):
+                return None
+            try:
+                result = await self._score_window(device_id, detail, active)
+            finally:
+                self._release_device(device_id)
+        else:
+            result = await self._score_window(device_id, detail, active)
+        if result is None:
+            return None
+
+        if prefilter and "error" not in result:
+            self.prefilter.record(device_id, result)
+        if cadence and "error" not in result:
+            self.cadence.record(device_id, result)
         self._device_scores[device_id] = result.get("overall_score", 0)
         self._device_results[device_id] = result
 
         return result
 
-    async def infer_window(self, device_id: str, window: np.ndarray) -> dict:
+    async def _score_window(self, device_id: str, detail: ResultDetail, active_episode: bool) -> dict | None:
+        """Run PulseNet on the device's current window (None if it has no readings yet)."""
+        lane = self._lane(device_id, active_episode)
+        sample = self.shadow.should_sample()
+        window = None
+        while settings.PULSENET_INCREMENTAL_PROJECTION and pulsenet_service.supports_projection:
+            projected = self._get_projected_window(device_id)
+            if projected is None:
+                return None
+            if sample:
+                # Snapshot before the await: newer readings must not reach the shadow's copy
+                window = self._get_raw_window(device_id)
+            try:
+                result = await pulsenet_service.infer_projected(
+                    projected, detail, lane, health_service.projection_cache.generation
+                )
+                break
+            except StaleProjectionError:
+                continue  # a model swap landed while queued: re-project against the new model
+        else:
+            window = self._get_raw_window(device_id)
+            if window is None:
+                return None
+            result = await pulsenet_service.infer(window, detail, lane)
+
+        if sample and window is not None and "error" not in result:
+            self.shadow.offer(window, result)
+        return result
+
+    async def _claim_device(self, device_id: str) -> bool:
+        """Become the device's scoring call; False if a newer call superseded this one."""
+        if device_id not in self._inflight:
+            self._inflight.add(device_id)
+            return True
+
+        waiter = asyncio.get_running_loop().create_future()
+        superseded = self._next_waiter.get(device_id)
+        self._next_waiter[device_id] = waiter
+        if superseded is not None and not superseded.done():
+            superseded.set_result(False)
+            self.coalesced_dropped += 1
+        try:
+            return await waiter  # True once the in-flight call hands the device over
+        except asyncio.CancelledError:
+            if self._next_waiter.get(device_id) is waiter:
+                del self._next_waiter[device_id]
+            elif waiter.done() and not waiter.cancelled() and waiter.result():
+                self._release_device(device_id)
+            raise
+
+    def _release_device(self, device_id: str):
+        """Hand the device to its waiting call, if any, or mark it idle."""
+        waiter = self._next_waiter.pop(device_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(True)
+        else:
+            self._inflight.discard(device_id)
+
+    def _lane(self, device_id: str, active_episode: bool) -> Lane:
+        """Urgent for devices in an episode or whose last result scored high."""
+        if active_episode:
+            return Lane.urgent
+        last = self._device_results.get(device_id)
+        if last is not None and last.get("max_score", 0.0) >= settings.PULSENET_PRIORITY_SCORE:
+            return Lane.urgent
+        return Lane.routine
+
+    def _get_raw_window(self, device_id: str) -> np.ndarray | None:
+        window = health_service.get_window(device_id)
+        if window is None:
+            window = health_service.get_partial_window(device_id)
+        return window
+
+    def _prefilter_check(self, device_id: str) -> dict | None:
+        """Fold unseen readings into the device baseline; return a reused result if PulseNet can be skipped."""
+        total = health_service.get_reading_count(device_id)
+        missing = min(total - self.prefilter.seen(device_id), WINDOW_SIZE)
+        if missing > 0:
+            entries = health_service.get_recent_entries(device_id, missing)
+            if entries is not None:
+                self.prefilter.observe(device_id, entries, total)
+        return self.prefilter.check(device_id)
+
+    def _get_projected_window(self, device_id: str) -> np.ndarray | None:
+        """Bring the device's projection cache up to date and return its window.
+
+        Only readings ingested since the last call are projected — normally just
+        the newest one. After a model reload the cache is rebuilt from the raw buffer.
+        """
+        cache = health_service.projection_cache
+        if cache.generation != pulsenet_service.generation:
+            cache.reset(pulsenet_service.generation)
+
+        total = health_service.get_reading_count(device_id)
+        missing = min(total - cache.seen(device_id), WINDOW_SIZE)
+        if missing > 0:
+            entries = health_service.get_recent_entries(device_id, missing)
+            cache.extend(device_id, pulsenet_service.project_readings(entries), total)
+        return cache.get_window(device_id)
+
+    async def infer_window(
+        self, device_id: str, window: np.ndarray, detail: ResultDetail = ResultDetail.timesteps
+    ) -> dict:
         """Run inference on an explicit window (e.g., from batch upload)."""
-        result = await pulsenet_service.infer(window)
+        result = await pulsenet_service.infer(window, detail)
         self._device_scores[device_id] = result.get("overall_score", 0)
         self._device_results[device_id] = result
         return result
@@ -50,6 +273,23 @@ class AnomalyDetectionService:
     def get_device_result(self, device_id: str) -> dict | None:
         return self._device_results.get(device_id)
 
+    def get_prefilter_stats(self) -> dict:
+        return {"enabled": settings.PULSENET_PREFILTER, **self.prefilter.get_stats()}
+
+    def get_cadence_stats(self) -> dict:
+        return {"enabled": settings.PULSENET_ADAPTIVE_CADENCE, **self.cadence.get_stats()}
+
+    def get_coalescing_stats(self) -> dict:
+        return {
+            "enabled": settings.PULSENET_COALESCE,
+            "in_flight": len(self._inflight),
+            "waiting": len(self._next_waiter),
+            "dropped": self.coalesced_dropped,
+        }
+
+    def get_shadow_stats(self) -> dict:
+        return self.shadow.get_stats()
+
     def get_all_scores(self) -> dict[str, float]:
         return dict(self._device_scores)
 
@@ -11,12 +11,62 @@ logger = logging.getLogger(__name__)
 WINDOW_SIZE = 60  # 5 minutes at 12-sec intervals
 
 
+class ProjectionCache:
+    """Per-device ring buffers of input-projected readings for streaming PulseNet inference.
+
+    Mirrors the raw sliding windows kept by HealthService, so each new reading
+    only needs its own projection. Positional embeddings are added by the model
+    when the window is gathered. Entries belong to one model generation and are
+    discarded when the model changes.
+    """
+
+    def __init__(self, window_size: int = WINDOW_SIZE):
+        self.window_size = window_size
+        self.generation: int | None = None
+        self._rings: dict[str, np.ndarray] = {}
+        self._seen: dict[str, int] = {}
+
+    def reset(self, generation: int | None = None):
+        self.generation = generation
+        self._rings.clear()
+        self._seen.clear()
+
+    def seen(self, device_id: str) -> int:
+        """Running count of readings whose projection has been stored."""
+        return self._seen.get(device_id, 0)
+
+    def extend(self, device_id: str, embeddings: np.ndarray, seen: int):
+        """Store projections for the readings ending at running count `seen`."""
+        embeddings = embeddings[-self.window_size:]
+        ring = self._rings.get(device_id)
+        if ring is None or ring.shape[1] != embeddings.shape[1]:
+            ring = np.empty((self.window_size, embeddings.shape[1]), dtype=np.float32)
+            self._rings[device_id] = ring
+        positions = np.arange(seen - len(embeddings), seen) % self.window_size
+        ring[positions] = embeddings
+        self._seen[device_id] = seen
+
+    def get_window(self, device_id: str) -> np.ndarray | None:
+        """Projected window (oldest first), front-padded like HealthService.get_partial_window."""
+        ring = self._rings.get(device_id)
+        seen = self._seen.get(device_id, 0)
+        if ring is None or seen == 0:
+            return None
+        if seen >= self.window_size:
+            start = seen % self.window_size
+            return np.concatenate([ring[start:], ring[:start]], axis=0)
+        pad = np.repeat(ring[:1], self.window_size - seen, axis=0)
+        return np.concatenate([pad, ring[:seen]], axis=0)
+
+
 class HealthService:
     """Manages health data ingestion and sliding window buffers per device."""
 
     def __init__(self):
         self._buffers: dict[str, deque] = defaultdict(lambda: deque(maxlen=WINDOW_SIZE))
         self._latest: dict[str, dict] = {}
+        self._counts: dict[str, int] = defaultdict(int)
+        self.projection_cache = ProjectionCache()
 
     async def ingest_reading(self, reading: dict):
         device_id = reading["device_id"]
@@ -27,6 +77,7 @@ class HealthService:
             reading.get("skin_temp", 36.5),
         ]
         self._buffers[device_id].append(entry)
+        self._counts[device_id] += 1
         self._latest[device_id] = reading
 
     def get_window(self, device_id: str) -> np.ndarray | None:
@@ -49,6 +100,17 @@ class HealthService:
             data = np.concatenate([pad, data], axis=0)
         return data
 
+    def get_recent_entries(self, device_id: str, n: int) -> np.ndarray | None:
+        """Return the newest `n` raw readings (oldest first), or None if none are buffered."""
+        buf = self._buffers.get(device_id)
+        if buf is None or len(buf) == 0 or n <= 0:
+            return None
+        return np.array(list(buf)[-n:], dtype=np.float32)
+
+    def get_reading_count(self, device_id: str) -> int:
+        """Total readings ingested for a device (not capped at the window size)."""
+        return self._counts.get(device_id, 0)
+
     def get_latest(self, device_id: str) -> dict | None:
         return self._latest.get(device_id)
 
@@ -0,0 +1,112 @@
+"""Adaptive per-device inference cadence for streaming PulseNet scoring."""
+
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class _DeviceCadence:
+    __slots__ = ("stride", "since_inference", "last_score")
+
+    def __init__(self, stride: int):
+        self.stride = stride
+        self.since_inference = 0
+        self.last_score: float | None = None
+
+
+class InferenceCadence:
+    """Decides on which readings each device's window is actually scored.
+
+    Each device has a stride: its window is scored once every `stride`
+    readings and the last result is held in between. After every score the
+    stride is adjusted:
+      - it doubles (up to `max_stride`) while the score stays below `low_score`
+      - it drops to `min_stride` when the score rises by more than
+        `rise_delta`, or the max score reaches `escalate_score`
+      - otherwise it halves
+
+    Devices with an active episode are scored on every reading.
+
+    Args:
+        min_stride: Stride for devices that need attention (1 = every reading)
+        max_stride: Longest stride for low, stable devices
+        low_score: Overall score below which a device counts as healthy
+        rise_delta: Score increase between inferences that counts as rising
+        escalate_score: Max score at or above which the stride resets
+    """
+
+    def __init__(
+        self,
+        min_stride: int = 1,
+        max_stride: int = 8,
+        low_score: float = 0.2,
+        rise_delta: float = 0.05,
+        escalate_score: float = 0.3,
+    ):
+        self.min_stride = max(1, min_stride)
+        self.max_stride = max(self.min_stride, max_stride)
+        self.low_score = low_score
+        self.rise_delta = rise_delta
+        self.escalate_score = escalate_score
+        self._devices: dict[str, _DeviceCadence] = {}
+
+        self.readings_seen = 0
+        self.inferences_run = 0
+
+    def _state(self, device_id: str) -> _DeviceCadence:
+        state = self._devices.get(device_id)
+        if state is None:
+            state = _DeviceCadence(self.min_stride)
+            self._devices[device_id] = state
+        return state
+
+    def is_due(self, device_id: str, active_episode: bool = False) -> bool:
+        """Count a new reading and report whether the device's window should be scored now."""
+        self.readings_seen += 1
+        state = self._state(device_id)
+        state.since_inference += 1
+        if active_episode:
+            state.stride = self.min_stride
+        return state.last_score is None or active_episode or state.since_inference >= state.stride
+
+    def record(self, device_id: str, result: dict, inferred: bool = True):
+        """Adjust the device's stride from a freshly computed result.
+
+        `inferred` is False for results that did not come from a PulseNet
+        forward (e.g. pre-filter reuses); only real inferences are counted.
+        """
+        state = self._state(device_id)
+        if inferred:
+            self.inferences_run += 1
+        score = result.get("overall_score", 0.0)
+        max_score = result.get("max_score", score)
+        rising = state.last_score is not None and score - state.last_score > self.rise_delta
+
+        if rising or max_score >= self.escalate_score:
+            stride = self.min_stride
+        elif score < self.low_score:
+            stride = state.stride * 2
+        else:
+            stride = state.stride // 2
+        stride = min(self.max_stride, max(self.min_stride, stride))
+        if stride != state.stride:
+            logger.debug(f"Inference stride for {device_id}: {state.stride} -> {stride}")
+
+        state.stride = stride
+        state.since_inference = 0
+        state.last_score = score
+
+    def get_stride(self, device_id: str) -> int:
+        state = self._devices.get(device_id)
+        return state.stride if state is not None else self.min_stride
+
+    def get_stats(self) -> dict:
+        saved = self.readings_seen - self.inferences_run
+        return {
+            "readings_seen": self.readings_seen,
+            "inferences_run": self.inferences_run,
+            "inferences_saved": saved,
+            "saved_fraction": saved / self.readings_seen if self.readings_seen else 0.0,
+            "devices_by_stride": dict(sorted(Counter(s.stride for s in self._devices.values()).items())),
+        }
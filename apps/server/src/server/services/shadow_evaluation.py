@@ -0,0 +1,161 @@
+"""Shadow-model evaluation lane — scores sampled live windows with a candidate PulseNet off the hot path."""
+
+import asyncio
+import logging
+import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from ..ml.pulsenet.inference import PulseNetInferenceService, ResultDetail
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowEvaluator:
+    """Runs a second model on a sample of the windows the primary model scored.
+
+    `offer` never waits: sampled windows go onto a bounded queue, and when the
+    queue is full they are dropped and counted. A single consumer task drains
+    the queue in small batches on a dedicated one-thread executor, separate
+    from the primary model's pool. It compares each shadow score with the
+    primary result it was queued with.
+
+    Args:
+        sample_rate: Fraction of primary inferences mirrored to the shadow model
+        queue_size: Pending windows kept before new ones are dropped
+        batch_size: Largest batch the consumer scores in one forward
+        stats_window: Number of recent comparisons the rolling statistics cover
+        backend: Backend for the shadow model (see PulseNetInferenceService)
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.1,
+        queue_size: int = 64,
+        batch_size: int = 16,
+        stats_window: int = 2000,
+        backend: str = "torch",
+    ):
+        self.sample_rate = sample_rate
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.backend = backend
+        self.service: PulseNetInferenceService | None = None
+        self.version: str | None = None
+        self._queue: asyncio.Queue | None = None
+        self._consumer: asyncio.Task | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+        self._deltas: deque[float] = deque(maxlen=stats_window)
+        self._disagreements: deque[bool] = deque(maxlen=stats_window)
+        self.sampled = 0
+        self.dropped = 0
+        self.evaluated = 0
+        self.errors = 0
+
+    @property
+    def active(self) -> bool:
+        return self.service is not None
+
+    async def start(self, checkpoint_dir: str | Path, version: str | None = None):
+        """Load the shadow model (off the event loop) and start consuming."""
+        service = PulseNetInferenceService(
+            str(checkpoint_dir), max_batch_size=1, backend=self.backend, version=version
+        )
+        if not await asyncio.to_thread(service.load):
+            raise RuntimeError(f"Failed to load shadow PulseNet from {checkpoint_dir}")
+        await self.stop()
+        self.service = service
+        self.version = version
+        self.reset_stats()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pulsenet-shadow")
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._consumer = asyncio.create_task(self._consume())
+        logger.info(f"Shadow PulseNet started ({version or checkpoint_dir})")
+
+    async def stop(self):
+        if self._consumer is not None:
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.service is not None:
+            self.service.shutdown()
+        self.service = self.version = self._queue = self._consumer = self._executor = None
+
+    def should_sample(self) -> bool:
+        """Cheap gate so callers only build a window for sampled inferences."""
+        return self.active and random.random() < self.sample_rate
+
+    def offer(self, window: np.ndarray, primary: dict) -> bool:
+        """Queue a window with its primary result; returns False if it was dropped."""
+        if self._queue is None:
+            return False
+        self.sampled += 1
+        try:
+            self._queue.put_nowait((window, primary))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    async def _consume(self):
+        """Score queued windows until cancelled; a failing batch is counted, never fatal."""
+        while True:
+            items = [await self._queue.get()]
+            while len(items) < self.batch_size and not self._queue.empty():
+                items.append(self._queue.get_nowait())
+            try:
+                await self._evaluate(items)
+            except Exception as e:
+                self.errors += len(items)
+                logger.warning(f"Shadow PulseNet inference failed: {e}")
+
+    async def _evaluate(self, items: list[tuple[np.ndarray, dict]]):
+        windows = np.stack([window for window, _ in items])
+        results = await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.service.infer_batch_sync, windows, ResultDetail.score
+        )
+        for (_, primary), shadow in zip(items, results):
+            if "error" in shadow or "error" in primary:
+                self.errors += 1
+                continue
+            self._deltas.append(shadow["overall_score"] - primary["overall_score"])
+            self._disagreements.append(shadow["is_anomaly"] != primary["is_anomaly"])
+            self.evaluated += 1
+
+    def reset_stats(self):
+        self._deltas.clear()
+        self._disagreements.clear()
+        self.sampled = self.dropped = self.evaluated = self.errors = 0
+
+    def get_stats(self) -> dict:
+        stats = {
+            "active": self.active,
+            "version": self.version,
+            "sample_rate": self.sample_rate,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "sampled": self.sampled,
+            "dropped": self.dropped,
+            "evaluated": self.evaluated,
+            "errors": self.errors,
+            "window": len(self._deltas),
+        }
+        if self._deltas:
+            deltas = np.array(self._deltas)
+            abs_deltas = np.abs(deltas)
+            stats.update({
+                "mean_delta": float(deltas.mean()),
+                "mean_abs_delta": float(abs_deltas.mean()),
+                "p95_abs_delta": float(np.percentile(abs_deltas, 95)),
+                "max_abs_delta": float(abs_deltas.max()),
+                "disagreement_rate": float(np.mean(self._disagreements)),
+            })
+        return stats
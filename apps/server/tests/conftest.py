@@ -1,8 +1,13 @@
 """Shared test fixtures for Pulsera server tests."""
 
+from pathlib import Path
+
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 
+PULSENET_CHECKPOINT_DIR = Path(__file__).resolve().parent.parent / "checkpoints"
+
 
 @pytest.fixture
 def test_app():
@@ -72,3 +77,52 @@ def sample_presage_calm():
         "eye_responsiveness": "normal",
         "confidence_score": 0.90,
     }
+
+
+@pytest.fixture
+def make_windows():
+    """Factory for resting-like (n, 60, 4) PulseNet windows, reproducible per seed."""
+    def make(n: int, seed: int = 0) -> np.ndarray:
+        rng = np.random.RandomState(seed)
+        base = np.array([72.0, 50.0, 1.0, 36.5], dtype=np.float32)
+        noise = rng.randn(n, 60, 4).astype(np.float32) * np.array([8.0, 8.0, 0.1, 0.2], dtype=np.float32)
+        return base + noise
+    return make
+
+
+@pytest.fixture
+def checkpoint_dir() -> Path:
+    """The bundled PulseNet checkpoint directory (read-only: copy before modifying)."""
+    return PULSENET_CHECKPOINT_DIR
+
+
+@pytest.fixture
+def service(checkpoint_dir):
+    """PulseNet inference service loaded from the bundled checkpoint, with micro-batching on."""
+    from server.ml.pulsenet.inference import PulseNetInferenceService
+
+    svc = PulseNetInferenceService(str(checkpoint_dir), max_batch_size=8, max_batch_wait_ms=20.0)
+    assert svc.load()
+    return svc
+
+
+@pytest.fixture
+def health(monkeypatch):
+    """Fresh HealthService installed as the anomaly detector's reading store."""
+    from server.services import anomaly_detection
+    from server.services.health import HealthService
+
+    health = HealthService()
+    monkeypatch.setattr(anomaly_detection, "health_service", health)
+    return health
+
+
+@pytest.fixture
+def detector(health, service, monkeypatch):
+    """AnomalyDetectionService wired to `health`, `service` and a fresh EpisodeService."""
+    from server.services import anomaly_detection
+    from server.services.episode_service import EpisodeService
+
+    monkeypatch.setattr(anomaly_detection, "pulsenet_service", service)
+    monkeypatch.setattr(anomaly_detection, "episode_service", EpisodeService())
+    return anomaly_detection.AnomalyDetectionService()
@@ -0,0 +1,139 @@
+"""Tests for the synthetic PulseNet training data."""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from server.ml.pulsenet.dataset import (
+    CommunityAnomalyDataset,
+    PulseNetDataset,
+    StreamingPulseNetDataset,
+    TensorBatchLoader,
+)
+
+
+def test_generation_is_reproducible_and_well_formed():
+    dataset = PulseNetDataset(n_samples=3000, anomaly_ratio=0.3, seed=5, chunk_size=1000)
+    again = PulseNetDataset(n_samples=3000, anomaly_ratio=0.3, seed=5, chunk_size=1000)
+
+    assert np.array_equal(dataset.data, again.data)
+    assert np.array_equal(dataset.anomaly_masks, again.anomaly_masks)
+    assert dataset.data.shape == (3000, 60, 4) and dataset.data.dtype == np.float32
+    assert dataset.labels.sum() == 900
+    assert np.isfinite(dataset.data).all()
+
+    # Anomalous windows carry one contiguous 5-14 step span starting at or after step 5
+    masks = dataset.anomaly_masks
+    assert not masks[dataset.labels == 0].any()
+    anomalous = masks[dataset.labels == 1]
+    lengths = anomalous.sum(axis=1)
+    assert lengths.min() >= 5 and lengths.max() <= 14
+    assert (np.abs(np.diff(anomalous, axis=1)).sum(axis=1) <= 2).all()
+    assert not anomalous[:, :5].any()
+
+    assert 50 < dataset.data[dataset.labels == 0, :, 0].mean() < 110
+    assert not np.array_equal(PulseNetDataset(n_samples=3000, seed=6).data, dataset.data)
+
+
+def test_cached_dataset_is_memory_mapped_and_matches_fresh_generation(tmp_path):
+    fresh = PulseNetDataset(n_samples=2000, seed=5, chunk_size=500)
+    first = PulseNetDataset(n_samples=2000, seed=5, chunk_size=500, cache_dir=tmp_path)
+    second = PulseNetDataset(n_samples=2000, seed=5, chunk_size=500, cache_dir=tmp_path)
+
+    assert [p.name for p in tmp_path.iterdir()] == [first.cache_key()]
+    for name in ("data", "labels", "anomaly_masks"):
+        assert isinstance(getattr(second, name), np.memmap)
+        assert np.array_equal(getattr(second, name), getattr(fresh, name))
+    assert not second.data.flags.writeable
+    assert second.data[3].shape == (60, 4)
+
+    mean, std = second.get_normalization_stats()
+    flat = fresh.data.reshape(-1, 4).astype(np.float64)
+    assert np.allclose(mean, flat.mean(axis=0), rtol=1e-5)
+    assert np.allclose(std, flat.std(axis=0), rtol=1e-4)
+
+    # Other parameters get their own entry; unseeded datasets are never cached
+    assert PulseNetDataset(n_samples=2000, seed=6, chunk_size=500, cache_dir=tmp_path).cache_key() != first.cache_key()
+    assert len(list(tmp_path.iterdir())) == 2
+    assert PulseNetDataset(n_samples=10, seed=None, cache_dir=tmp_path).cache_path is None
+    assert len(list(tmp_path.iterdir())) == 2
+
+    # An unwritable cache location falls back to in-memory generation with the same data
+    (tmp_path / "not-a-dir").write_text("")
+    fallback = PulseNetDataset(n_samples=2000, seed=5, chunk_size=500, cache_dir=tmp_path / "not-a-dir" / "cache")
+    assert fallback.cache_path is None and not isinstance(fallback.data, np.memmap)
+    assert np.array_equal(fallback.data, fresh.data)
+
+
+def test_batch_loader_serves_each_selected_window_once_per_epoch(tmp_path):
+    torch = pytest.importorskip("torch")
+    fresh = PulseNetDataset(n_samples=1000, seed=5)
+    mapped = PulseNetDataset(n_samples=1000, seed=5, cache_dir=tmp_path)
+    indices = np.random.default_rng(0).permutation(1000)[:700]
+
+    for dataset in (fresh, mapped):
+        loader = TensorBatchLoader(dataset, indices, batch_size=64, shuffle=True, generator=torch.Generator().manual_seed(1))
+        batches = list(loader)
+        assert len(batches) == len(loader) == 11 and len(batches[-1]["input"]) == 700 - 10 * 64
+
+        inputs = torch.cat([b["input"] for b in batches]).numpy()
+        masks = torch.cat([b["anomaly_mask"] for b in batches]).numpy()
+        # Windows and their labels/masks stay aligned, and every selected window appears exactly once
+        order = np.lexsort(inputs[:, :, 0].T)
+        expected = np.lexsort(fresh.data[indices][:, :, 0].T)
+        assert np.array_equal(inputs[order], fresh.data[indices][expected])
+        assert np.array_equal(masks[order], fresh.anomaly_masks[indices][expected])
+
+    unshuffled = TensorBatchLoader(fresh, indices, batch_size=64, drop_last=True)
+    assert len(unshuffled) == 10
+    first = next(iter(unshuffled))
+    assert np.array_equal(first["input"].numpy(), fresh.data[indices[:64]])
+    assert np.array_equal(first["label"].numpy(), fresh.labels[indices[:64]])
+
+
+def test_streaming_dataset_is_deterministic_per_worker_and_never_repeats():
+    pytest.importorskip("torch")
+    from torch.utils.data import DataLoader
+
+    def take(stream, n=4):
+        loader = DataLoader(stream, batch_size=None, num_workers=2)
+        return [b["input"].numpy() for b in itertools.islice(loader, n)]
+
+    stream = StreamingPulseNetDataset(batch_size=32, seed=3)
+    first = take(stream)
+    assert [b.shape for b in first] == [(32, 60, 4)] * 4
+    assert all(np.array_equal(a, b) for a, b in zip(first, take(StreamingPulseNetDataset(batch_size=32, seed=3))))
+
+    # Workers alternate batches; no two batches (across workers or epochs) are equal
+    stream.set_epoch(1)
+    batches = first + take(stream)
+    assert all(not np.array_equal(a, b) for a, b in itertools.combinations(batches, 2))
+
+    mean, std = stream.estimate_normalization_stats(n_windows=5000)
+    ref_mean, ref_std = PulseNetDataset(n_samples=5000, seed=9).get_normalization_stats()
+    assert np.allclose(mean, ref_mean, rtol=0.02) and np.allclose(std, ref_std, rtol=0.05)
+
+
+def test_community_dataset_injects_correlated_shifts_in_chunks():
+    dataset = CommunityAnomalyDataset(n_samples=400, n_members=40, seed=2, chunk_size=1000)
+    again = CommunityAnomalyDataset(n_samples=400, n_members=40, seed=2, chunk_size=1000)
+
+    assert dataset.data.shape == (400, 40, 60, 4) and dataset.data.dtype == np.float32
+    assert np.array_equal(dataset.data, again.data) and np.array_equal(dataset.labels, again.labels)
+    assert 0.2 < dataset.labels.mean() < 0.4
+    assert np.isfinite(dataset.data).all()
+
+    # Each injection shifts HR up and HRV down by one 8-14 step span in 3+ members, starting at step 10 or later
+    shifts = dataset._inject(np.zeros((500, 40, 60, 4), dtype=np.float32))
+    hr_span, hrv_span = shifts[..., 0] > 0, shifts[..., 1] < 0
+    assert np.array_equal(hr_span, hrv_span) and not shifts[..., 2:].any()
+    lengths = hr_span.sum(axis=2)
+    affected = lengths > 0
+    assert (affected.sum(axis=1) >= 3).all()
+    assert lengths[affected].min() >= 8 and lengths[affected].max() <= 14
+    assert not hr_span[..., :10].any()
+    assert (np.abs(np.diff(hr_span.astype(np.int8), axis=2)).sum(axis=2) <= 2).all()
+    assert shifts[..., 0].max() <= 35 and shifts[..., 0][hr_span].min() >= 15
+
+    assert CommunityAnomalyDataset(n_samples=20, n_members=2, seed=2).data.shape == (20, 2, 60, 4)
@@ -0,0 +1,648 @@
+"""Tests for the PulseNet inference service."""
+
+import asyncio
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from server.ml.pulsenet.inference import PulseNetInferenceService, ResultDetail
+
+
+@pytest.mark.asyncio
+async def test_concurrent_infer_is_micro_batched(service, make_windows):
+    """Concurrent callers share forward passes but each gets its own result."""
+    windows = make_windows(8)
+
+    results = await asyncio.gather(*(service.infer(w) for w in windows))
+
+    stats = service.get_batching_stats()
+    assert stats["windows_dispatched"] == 8
+    assert stats["batches_dispatched"] < 8
+    for window, result in zip(windows, results):
+        expected = service._infer_sync(window)
+        assert result["overall_score"] == pytest.approx(expected["overall_score"], abs=1e-5)
+        assert result["per_timestep_scores"] == pytest.approx(expected["per_timestep_scores"], abs=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_batching_disabled_runs_single_windows(make_windows, checkpoint_dir):
+    svc = PulseNetInferenceService(str(checkpoint_dir), max_batch_size=1)
+    assert svc.load()
+
+    result = await svc.infer(make_windows(1)[0])
+
+    assert 0.0 <= result["overall_score"] <= 1.0
+    assert svc.get_batching_stats()["batches_dispatched"] == 0
+
+
+@pytest.mark.asyncio
+async def test_result_cache_reuses_repeated_windows(make_windows, checkpoint_dir):
+    svc = PulseNetInferenceService(str(checkpoint_dir), max_batch_size=1, result_cache_size=4)
+    assert svc.load()
+    windows = np.round(make_windows(3), 2)
+
+    first = await svc.infer(windows[0], ResultDetail.score)
+    # Below the quantum: same entry, and no batch is run
+    run_batch = svc._run_batch
+    svc._run_batch = None
+    again = await svc.infer(windows[0] + 1e-4, ResultDetail.score)
+    assert again == first
+    svc._run_batch = run_batch
+
+    batch = svc.infer_batch_sync(windows, ResultDetail.score)
+    assert batch[0] == first
+    stats = svc.get_result_cache_stats()
+    assert stats["hits"] == 2 and stats["misses"] == 3 and stats["entries"] == 3
+    # Detail level and model generation are part of the key
+    timesteps = await svc.infer(windows[0], ResultDetail.timesteps)
+    assert "per_timestep_scores" in timesteps
+    # Callers get their own copies: mutating one never reaches later hits
+    expected = list(timesteps["per_timestep_scores"])
+    timesteps["per_timestep_scores"][0] = -1.0
+    hit = await svc.infer(windows[0], ResultDetail.timesteps)
+    assert hit["per_timestep_scores"] == expected
+    hit["per_timestep_scores"].clear()
+    assert (await svc.infer(windows[0], ResultDetail.timesteps))["per_timestep_scores"] == expected
+    svc.generation += 1
+    await svc.infer(windows[0], ResultDetail.score)
+    assert svc.get_result_cache_stats()["hits"] == 4
+
+
+@pytest.mark.asyncio
+async def test_priority_gate_serves_urgent_lane_first():
+    from server.ml.pulsenet.priority import Lane, PriorityGate
+
+    async def run(gate: PriorityGate, lanes: list[Lane]) -> list[str]:
+        order = []
+
+        async def waiter(name: str, lane: Lane):
+            async with gate.slot(lane):
+                order.append(name)
+
+        await gate.acquire()  # saturate the only slot
+        tasks = [asyncio.create_task(waiter(f"{lane.value}{i}", lane)) for i, lane in enumerate(lanes)]
+        await asyncio.sleep(0.01)
+        assert gate.depth(Lane.routine) == lanes.count(Lane.routine)
+        gate.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    lanes = [Lane.routine, Lane.routine, Lane.urgent]
+    gate = PriorityGate(1, routine_max_wait_ms=1000.0)
+    assert await run(gate, lanes) == ["urgent2", "routine0", "routine1"]
+    stats = gate.get_stats()
+    assert stats["lanes"]["routine"]["wait"]["count"] == 3 and stats["lanes"]["urgent"]["depth"] == 0
+
+    # Routine batches past their wait budget go ahead of urgent ones
+    aged = PriorityGate(1, routine_max_wait_ms=1.0)
+    assert await run(aged, lanes) == ["routine0", "routine1", "urgent2"]
+    assert aged.aged_promotions == 2
+
+
+@pytest.mark.asyncio
+async def test_urgent_windows_jump_saturated_executor(make_windows, checkpoint_dir):
+    svc = PulseNetInferenceService(str(checkpoint_dir), max_batch_size=1, routine_max_wait_ms=10_000.0)
+    assert svc.load()
+    windows = make_windows(16)
+    granted = []
+    acquire = svc._gate.acquire
+
+    async def record_acquire(lane):
+        await acquire(lane)
+        granted.append(lane)
+
+    svc._gate.acquire = record_acquire
+
+    from server.ml.pulsenet.priority import Lane
+
+    routine = [asyncio.create_task(svc.infer(windows[i], ResultDetail.score, Lane.routine)) for i in range(15)]
+    await asyncio.sleep(0)
+    await svc.infer(windows[15], ResultDetail.score, Lane.urgent)
+    # The urgent window takes the first freed slot: only routine batches that
+    # were already running when it arrived got a slot before it
+    assert granted.index(Lane.urgent) <= svc._concurrency
+    await asyncio.gather(*routine)
+    assert svc.get_priority_stats()["executor"]["lanes"]["urgent"]["wait"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stage_latency_and_slow_inference_log(service, caplog, make_windows):
+    import json
+
+    service.slow_inference_ms = 1e-6
+    with caplog.at_level("WARNING", logger="server.ml.pulsenet.inference"):
+        await asyncio.gather(*(service.infer(w, ResultDetail.full) for w in make_windows(4)))
+
+    stages = service.get_latency_stats()["stages"]
+    for stage in ("batch_wait", "slot_wait", "executor_queue", "backend_run", "to_tensor",
+                  "forward", "discrepancy", "to_numpy", "build_results", "total"):
+        assert stages[stage]["count"] >= 1, stage
+        assert 0.0 <= stages[stage]["p50_ms"] <= stages[stage]["p99_ms"]
+    assert stages["total"]["count"] == 4
+    assert stages["backend_run"]["p50_ms"] >= stages["forward"]["p50_ms"]
+
+    record = json.loads(caplog.records[0].getMessage().split(" ", 3)[3])
+    assert record["detail"] == "full" and record["lane"] == "routine"
+    assert {"slot_wait", "executor_queue", "backend_run", "build_results"} <= set(record["stages_ms"])
+
+
+def test_detail_levels_trim_payload(service, make_windows):
+    """Lean detail levels return a subset of the full payload with identical scores."""
+    window = make_windows(1)[0]
+
+    score = service._infer_sync(window, ResultDetail.score)
+    timesteps = service._infer_sync(window, ResultDetail.timesteps)
+    full = service._infer_sync(window, ResultDetail.full)
+
+    assert set(score) == {"overall_score", "max_score", "is_anomaly"}
+    assert set(timesteps) == set(score) | {"per_timestep_scores"}
+    assert {"reconstruction", "attention_heatmap", "prior_attention", "association_discrepancy"} <= set(full)
+    assert np.shape(full["prior_attention"]) == np.shape(full["attention_heatmap"]) == (60, 60)
+    assert score["overall_score"] == pytest.approx(full["overall_score"], abs=1e-6)
+    assert timesteps["per_timestep_scores"] == pytest.approx(full["per_timestep_scores"], abs=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_incremental_projection_matches_full_window(service, health, detector, monkeypatch, make_windows):
+    """Streaming inference from cached projections scores like the raw window."""
+    from server.config import settings
+
+    monkeypatch.setattr(settings, "PULSENET_INCREMENTAL_PROJECTION", True)
+
+    readings = make_windows(2).reshape(-1, 4)[:75]
+    for i, (hr, hrv, accel, temp) in enumerate(readings):
+        await health.ingest_reading({
+            "device_id": "dev-1", "heart_rate": hr, "hrv": hrv, "acceleration": accel, "skin_temp": temp,
+        })
+        result = await detector.process_reading("dev-1", {}, ResultDetail.timesteps)
+        if i not in (0, 10, 59, 74):
+            continue
+        window = health.get_window("dev-1")
+        if window is None:
+            window = health.get_partial_window("dev-1")
+        expected = service._infer_sync(window, ResultDetail.timesteps)
+        assert result["per_timestep_scores"] == pytest.approx(expected["per_timestep_scores"], abs=1e-4)
+
+    assert health.projection_cache.seen("dev-1") == 75
+
+
+@pytest.mark.asyncio
+async def test_shadow_gets_the_window_the_primary_scored(service, health, detector, monkeypatch, make_windows):
+    """A reading ingested while a projected window is queued does not reach the shadow's copy."""
+    from server.config import settings
+
+    monkeypatch.setattr(settings, "PULSENET_INCREMENTAL_PROJECTION", True)
+    offered = []
+    monkeypatch.setattr(detector.shadow, "should_sample", lambda: True)
+    monkeypatch.setattr(detector.shadow, "offer", lambda window, result: offered.append(window))
+
+    readings = make_windows(2).reshape(-1, 4)[:61]
+    for hr, hrv, accel, temp in readings[:60]:
+        await health.ingest_reading({
+            "device_id": "dev-1", "heart_rate": hr, "hrv": hrv, "acceleration": accel, "skin_temp": temp,
+        })
+    scored = health.get_window("dev-1")
+
+    scoring = asyncio.create_task(detector.process_reading("dev-1", {}))
+    while service.get_batching_stats()["pending"] == 0:
+        await asyncio.sleep(0)
+    hr, hrv, accel, temp = readings[60]
+    await health.ingest_reading({
+        "device_id": "dev-1", "heart_rate": hr, "hrv": hrv, "acceleration": accel, "skin_temp": temp,
+    })
+    await scoring
+
+    assert len(offered) == 1
+    np.testing.assert_array_equal(offered[0], scored)
+
+
+@pytest.mark.asyncio
+async def test_prefilter_skips_steady_readings_and_escalates_spikes(health, detector, monkeypatch):
+    """Steady streams reuse decayed scores; a heart-rate spike reaches PulseNet."""
+    from server.config import settings
+
+    monkeypatch.setattr(settings, "PULSENET_PREFILTER", True)
+
+    rng = np.random.RandomState(3)
+
+    async def ingest(heart_rate: float) -> dict:
+        await health.ingest_reading({
+            "device_id": "dev-1", "heart_rate": heart_rate, "hrv": 55 + rng.randn(),
+            "acceleration": 1.0, "skin_temp": 36.5,
+        })
+        return await detector.process_reading("dev-1", {})
+
+    results = [await ingest(70 + rng.randn()) for _ in range(40)]
+    skipped = [r for r in results if r.get("prefiltered")]
+    assert skipped
+    assert skipped[1]["overall_score"] < skipped[0]["overall_score"]
+
+    spike = await ingest(150.0)
+    assert "prefiltered" not in spike
+    stats = detector.get_prefilter_stats()
+    assert stats["windows_checked"] == 41
+    assert stats["skip_rate"] == pytest.approx(len(skipped) / 41)
+
+
+@pytest.mark.asyncio
+async def test_prefilter_passes_through_error_results(service, health, detector, monkeypatch):
+    """Error results are returned as-is and never become the base for skipped windows."""
+    from server.config import settings
+
+    monkeypatch.setattr(settings, "PULSENET_PREFILTER", True)
+
+    async def failing_infer(window, detail=ResultDetail.score, lane=None):
+        return {"error": "Model not loaded"}
+
+    monkeypatch.setattr(service, "infer", failing_infer)
+    for _ in range(40):
+        await health.ingest_reading({
+            "device_id": "dev-1", "heart_rate": 70.0, "hrv": 55.0, "acceleration": 1.0, "skin_temp": 36.5,
+        })
+        assert await detector.process_reading("dev-1", {}) == {"error": "Model not loaded"}
+    assert detector.get_prefilter_stats()["windows_skipped"] == 0
+
+    detector.prefilter.record("dev-2", {"overall_score": 0.1})
+    assert detector.prefilter.should_escalate("dev-2")
+
+
+def test_prefilter_recall_on_synthetic_anomalies():
+    from server.ml.pulsenet.prefilter import measure_recall
+
+    report = measure_recall(n_samples=600)
+    assert report["recall"] > 0.9
+    assert report["skip_rate"] > 0.2
+
+
+def test_frozen_model_matches_eager_model(make_windows):
+    """freeze_for_inference folds normalization and caches priors without changing outputs."""
+    import torch
+    from server.ml.pulsenet.model import PulseNet
+
+    torch.manual_seed(0)
+    eager = PulseNet().eval()
+    frozen = PulseNet()
+    frozen.load_state_dict(eager.state_dict())
+    mean = np.array([72.0, 50.0, 1.0, 36.5], dtype=np.float32)
+    std = np.array([15.0, 15.0, 0.5, 0.5], dtype=np.float32)
+    frozen.freeze_for_inference(mean, std)
+
+    x = torch.tensor(make_windows(4))
+    with torch.no_grad():
+        recon_e, scores_e, series_e, prior_e = eager((x - torch.tensor(mean)) / (torch.tensor(std) + 1e-8))
+        recon_f, scores_f, series_f, prior_f = frozen(x)
+
+    assert not any(isinstance(m, torch.nn.Dropout) for m in frozen.modules())
+    assert torch.allclose(scores_e, scores_f, atol=1e-5)
+    assert torch.allclose(recon_e, recon_f, atol=1e-4)
+    assert torch.allclose(prior_e[-1], prior_f[-1])
+    assert prior_f[0] is frozen.layers[0].prior_association.frozen_prior
+
+    # A second call must not fold the statistics into the weights again
+    with pytest.raises(RuntimeError):
+        frozen.freeze_for_inference(mean, std)
+    frozen.freeze_for_inference()
+    with torch.no_grad():
+        assert torch.allclose(frozen(x)[1], scores_f)
+
+
+def test_onnx_backend_matches_torch(tmp_path, make_windows, checkpoint_dir):
+    """The onnxruntime backend returns the same result dict as the torch backend."""
+    pytest.importorskip("onnxruntime")
+    import shutil
+
+    for path in checkpoint_dir.glob("*.pt"):
+        shutil.copy(path, tmp_path / path.name)
+    for path in checkpoint_dir.glob("*.npy"):
+        shutil.copy(path, tmp_path / path.name)
+
+    torch_svc = PulseNetInferenceService(str(tmp_path), backend="torch")
+    onnx_svc = PulseNetInferenceService(str(tmp_path), backend="onnx")
+    assert torch_svc.load() and onnx_svc.load()
+    assert (tmp_path / "pulsenet.onnx").exists()
+
+    windows = make_windows(5)
+    for detail in ResultDetail:
+        expected = torch_svc.infer_batch_sync(windows, detail)
+        actual = onnx_svc.infer_batch_sync(windows, detail)
+        for exp, act in zip(expected, actual):
+            assert set(exp) == set(act)
+            assert act["overall_score"] == pytest.approx(exp["overall_score"], abs=1e-4)
+            if detail == ResultDetail.full:
+                assert act["association_discrepancy"] == pytest.approx(exp["association_discrepancy"], rel=1e-3)
+                assert np.allclose(act["attention_heatmap"], exp["attention_heatmap"], atol=1e-4)
+                assert np.allclose(act["reconstruction"], exp["reconstruction"], atol=1e-2)
+
+    # New norm stats (or a new checkpoint) make the export stale, also for --compare
+    import os
+
+    from server.ml.pulsenet.inference import export_is_stale, find_checkpoint
+    from server.ml.pulsenet.onnx_export import compare_latency
+
+    onnx_path = tmp_path / "pulsenet.onnx"
+    assert not export_is_stale(onnx_path, find_checkpoint(tmp_path))
+    built = (tmp_path / "norm_std.npy").stat().st_mtime - 10
+    os.utime(onnx_path, (built, built))
+    assert export_is_stale(onnx_path, find_checkpoint(tmp_path))
+    compare_latency(tmp_path, batch_sizes=(1,), n_iters=1)
+    assert onnx_path.stat().st_mtime > built
+    assert not export_is_stale(onnx_path, find_checkpoint(tmp_path))
+
+
+def test_int8_backend_scores_close_to_fp32(make_windows, checkpoint_dir):
+    svc = PulseNetInferenceService(str(checkpoint_dir), backend="torch_int8")
+    assert svc.load()
+    assert svc.backend.name == "torch_int8"
+    reference = PulseNetInferenceService(str(checkpoint_dir))
+    assert reference.load()
+
+    windows = make_windows(4)
+    for exp, act in zip(reference.infer_batch_sync(windows), svc.infer_batch_sync(windows)):
+        assert act["overall_score"] == pytest.approx(exp["overall_score"], abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_process_pool_scores_match_in_process(make_windows, checkpoint_dir):
+    """Worker processes fed through shared memory return the in-process scores."""
+    svc = PulseNetInferenceService(str(checkpoint_dir), max_batch_size=4, process_workers=1)
+    assert svc.load()
+    try:
+        windows = make_windows(6)
+        results = await asyncio.gather(*(svc.infer(w, ResultDetail.timesteps) for w in windows))
+        full = await svc.infer(windows[0], ResultDetail.full)
+    finally:
+        svc.shutdown()
+
+    expected = svc.infer_batch_sync(windows, ResultDetail.timesteps)
+    for exp, act in zip(expected, results):
+        assert act["per_timestep_scores"] == pytest.approx(exp["per_timestep_scores"], abs=1e-5)
+    assert "attention_heatmap" in full
+
+
+def test_numpy_backend_matches_torch(make_windows, checkpoint_dir):
+    torch_svc = PulseNetInferenceService(str(checkpoint_dir))
+    numpy_svc = PulseNetInferenceService(str(checkpoint_dir), backend="numpy")
+    assert torch_svc.load() and numpy_svc.load()
+    assert numpy_svc.backend.name == "numpy"
+
+    windows = make_windows(3)
+    expected = torch_svc.infer_batch_sync(windows, ResultDetail.full)
+    actual = numpy_svc.infer_batch_sync(windows, ResultDetail.full)
+    for exp, act in zip(expected, actual):
+        assert act["per_timestep_scores"] == pytest.approx(exp["per_timestep_scores"], abs=1e-4)
+        assert act["association_discrepancy"] == pytest.approx(exp["association_discrepancy"], rel=1e-3)
+        assert np.allclose(act["attention_heatmap"], exp["attention_heatmap"], atol=1e-4)
+        assert np.allclose(act["prior_attention"], exp["prior_attention"], atol=1e-5)
+
+
+def test_serving_without_torch(tmp_path, checkpoint_dir):
+    """With torch unimportable, the server starts and serves from a .npz export."""
+    import subprocess
+    import sys
+
+    from server.ml.pulsenet.numpy_engine import export_numpy_weights
+    from server.ml.pulsenet.onnx_export import load_frozen_model
+
+    export_numpy_weights(load_frozen_model(checkpoint_dir), tmp_path / "pulsenet.npz")
+    script = f"""
+import sys
+sys.modules["torch"] = None
+import numpy as np
+import server.main
+from server.ml.pulsenet.inference import PulseNetInferenceService
+svc = PulseNetInferenceService({str(tmp_path)!r})
+assert svc.load() and svc.backend.name == "numpy"
+result = svc.infer_batch_sync(np.full((1, 60, 4), [72.0, 50.0, 1.0, 36.5], dtype=np.float32))[0]
+assert 0.0 <= result["overall_score"] <= 1.0
+assert "torch" not in {{m.split(".")[0] for m, mod in sys.modules.items() if mod is not None}}
+"""
+    src = Path(__file__).resolve().parent.parent / "src"
+    proc = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env={"PYTHONPATH": str(src)},
+                          capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    assert f"PulseNet loaded from {tmp_path / 'pulsenet.npz'} " in proc.stdout
+
+
+def test_inference_cadence_stride_policy():
+    from server.services.inference_cadence import InferenceCadence
+
+    cadence = InferenceCadence(max_stride=4)
+    due = []
+    for _ in range(20):
+        due.append(cadence.is_due("dev-1"))
+        if due[-1]:
+            cadence.record("dev-1", {"overall_score": 0.05, "max_score": 0.1})
+    assert cadence.get_stride("dev-1") == 4
+    assert sum(due) < 10
+
+    cadence.record("dev-1", {"overall_score": 0.15, "max_score": 0.2})  # rising
+    assert cadence.get_stride("dev-1") == 1
+
+    cadence.record("dev-1", {"overall_score": 0.05, "max_score": 0.1})
+    assert cadence.get_stride("dev-1") == 2
+    assert all(cadence.is_due("dev-1", active_episode=True) for _ in range(3))
+    assert cadence.get_stride("dev-1") == 1
+
+    stats = cadence.get_stats()
+    assert stats["inferences_saved"] == stats["readings_seen"] - stats["inferences_run"] > 0
+
+    # Due readings count as inferences only once a real result is recorded
+    run = stats["inferences_run"]
+    assert cadence.is_due("dev-2")
+    cadence.record("dev-2", {"overall_score": 0.05, "max_score": 0.1}, inferred=False)
+    assert cadence.get_stats()["inferences_run"] == run
+
+
+@pytest.mark.asyncio
+async def test_adaptive_cadence_holds_results_between_inferences(health, detector, monkeypatch, make_windows):
+    from server.config import settings
+
+    monkeypatch.setattr(settings, "PULSENET_ADAPTIVE_CADENCE", True)
+    # Treat the checkpoint's resting scores as healthy regardless of calibration
+    detector.cadence.low_score = detector.cadence.escalate_score = 1.0
+
+    results = []
+    for hr, hrv, accel, temp in make_windows(1)[0]:
+        await health.ingest_reading({
+            "device_id": "dev-1", "heart_rate": hr, "hrv": hrv, "acceleration": accel, "skin_temp": temp,
+        })
+        results.append(await detector.process_reading("dev-1", {}))
+
+    held = [r for r in results if r.get("held")]
+    stats = detector.get_cadence_stats()
+    assert held and stats["inferences_saved"] == len(held)
+    assert stats["readings_seen"] == 60
+    assert detector.cadence.get_stride("dev-1") == settings.PULSENET_CADENCE_MAX_STRIDE
+
+    # An error is never held: the next reading is scored even though it is not due
+    detector._device_results["dev-1"] = {"error": "Model not loaded"}
+    result = await detector.process_reading("dev-1", {})
+    assert "error" not in result and not result.get("held")
+
+
+@pytest.mark.asyncio
+async def test_coalescing_keeps_only_newest_pending_window(health, detector, monkeypatch, make_windows):
+    from server.config import settings
+
+    monkeypatch.setattr(settings, "PULSENET_COALESCE", True)
+
+    for hr, hrv, accel, temp in make_windows(1)[0]:
+        await health.ingest_reading({
+            "device_id": "dev-1", "heart_rate": hr, "hrv": hrv, "acceleration": accel, "skin_temp": temp,
+        })
+    # One call in flight, four arriving behind it: only the last of those is scored
+    results = await asyncio.gather(*(detector.process_reading("dev-1", {}) for _ in range(5)))
+
+    assert [r is not None for r in results] == [True, False, False, False, True]
+    assert detector.get_coalescing_stats() == {"enabled": True, "in_flight": 0, "waiting": 0, "dropped": 3}
+    assert await detector.process_reading("dev-1", {}) is not None
+
+
+@pytest.mark.asyncio
+async def test_coalescing_across_websocket_connections(health, detector, monkeypatch, make_windows):
+    """Each socket is read sequentially, but `health_data` names its device in the payload,
+    so several connections (watch and phone relay, or a reconnect racing the old socket)
+    score the same device concurrently."""
+    from server.config import settings
+    from server.websocket import handler
+
+    monkeypatch.setattr(settings, "PULSENET_COALESCE", True)
+    monkeypatch.setattr(handler, "health_service", health)
+    monkeypatch.setattr(handler, "anomaly_detection_service", detector)
+
+    class FakeSocket:
+        def __init__(self):
+            self.sent = []
+
+        async def send_json(self, message: dict):
+            self.sent.append(message)
+
+    readings = make_windows(1)[0]
+    for hr, hrv, accel, temp in readings[:-3]:
+        await health.ingest_reading({
+            "device_id": "dev-1", "heart_rate": hr, "hrv": hrv, "acceleration": accel, "skin_temp": temp,
+        })
+    sockets = [FakeSocket() for _ in range(3)]
+    await asyncio.gather(*(
+        handler.handle_message(ws, {
+            "type": "health_data", "device_id": "dev-1",
+            "heart_rate": float(hr), "hrv": float(hrv), "acceleration": float(accel), "skin_temp": float(temp),
+        })
+        for ws, (hr, hrv, accel, temp) in zip(sockets, readings[-3:])
+    ))
+
+    # The middle reading's window is superseded before it is scored: no result is sent for it
+    assert [len(ws.sent) for ws in sockets] == [1, 0, 1]
+    assert detector.get_coalescing_stats()["dropped"] == 1
+    assert health.get_reading_count("dev-1") == 60
+
+
+def test_early_exit_forward_matches_heads(make_windows):
+    """Confident windows take the first exit head; undecided ones run the full stack."""
+    import torch
+    from server.ml.pulsenet.model import PulseNet
+
+    torch.manual_seed(0)
+    model = PulseNet(early_exit=True).freeze_for_inference()
+    x = torch.tensor(make_windows(6))
+    with torch.no_grad():
+        _, full_scores, _, _, exit_scores = model(x, return_attentions=False, return_exits=True)
+        projected = model.input_projection(x)
+
+        scores, exits = model.forward_early_exit(projected, low=1.0, high=1.0)
+        assert exits.tolist() == [1] * 6
+        assert torch.allclose(scores, exit_scores[0][:, :, 0], atol=1e-6)
+
+        scores, exits = model.forward_early_exit(projected, low=0.0, high=1.0)
+        assert exits.tolist() == [model.n_layers] * 6
+        assert torch.allclose(scores, full_scores[:, :, 0], atol=1e-6)
+
+
+def test_service_reports_early_exit_layer(tmp_path, make_windows, checkpoint_dir):
+    """Checkpoints trained with exit heads report the exit taken; others are unaffected."""
+    from server.ml.pulsenet.train import train_pulsenet
+
+    train_pulsenet(n_samples=64, batch_size=16, n_epochs=1, output_dir=str(tmp_path), early_exit=True)
+
+    svc = PulseNetInferenceService(str(tmp_path), max_batch_size=1, early_exit=(1.0, 1.0))
+    assert svc.load()
+    results = svc.infer_batch_sync(make_windows(3), ResultDetail.score)
+    assert [r["exit_layer"] for r in results] == [1, 1, 1]
+    assert "exit_layer" not in svc.infer_batch_sync(make_windows(1), ResultDetail.full)[0]
+    assert svc.get_early_exit_stats()["windows_by_exit_layer"] == {1: 3}
+
+    plain = PulseNetInferenceService(str(checkpoint_dir), max_batch_size=1, early_exit=(1.0, 1.0))
+    assert plain.load()
+    assert "exit_layer" not in plain.infer_batch_sync(make_windows(1), ResultDetail.score)[0]
+    assert not plain.get_early_exit_stats()["enabled"]
+
+
+def test_distilled_tiny_variant_is_served(tmp_path, make_windows, checkpoint_dir):
+    """distill_pulsenet writes pulsenet_tiny.pt next to the teacher; the service can select it."""
+    import shutil
+
+    from server.ml.pulsenet.train import distill_pulsenet
+
+    for path in [*checkpoint_dir.glob("*.pt"), *checkpoint_dir.glob("*.npy")]:
+        shutil.copy(path, tmp_path / path.name)
+
+    report = distill_pulsenet(
+        teacher_dir=str(tmp_path), n_samples=64, batch_size=16, n_epochs=1, compare_samples=200
+    )
+    assert (tmp_path / "pulsenet_tiny.pt").exists()
+    full_row, tiny_row = report["models"]
+    assert tiny_row["parameters"] < full_row["parameters"]
+    assert {"auc", "latency_ms_b1", "latency_ms_b32"} <= set(tiny_row)
+
+    tiny = PulseNetInferenceService(str(tmp_path), max_batch_size=1, model_variant="tiny")
+    assert tiny.load()
+    assert tiny.parameter_count == tiny_row["parameters"]
+    assert 0.0 <= tiny.infer_batch_sync(make_windows(1), ResultDetail.score)[0]["overall_score"] <= 1.0
+
+    fallback = PulseNetInferenceService(str(checkpoint_dir), max_batch_size=1, model_variant="tiny")
+    assert fallback.load()
+    assert fallback.model_variant == "full"
+
+
+def test_benchmark_report_and_regression_check(checkpoint_dir):
+    from server.ml.pulsenet.benchmark import compare, run_benchmark
+
+    grid = {"threads": (1,), "batch_sizes": (4,), "executor_sizes": (1,), "details": ("score",)}
+    report = run_benchmark(checkpoint_dir, n_windows=16, repeats=1, grid=grid)
+
+    assert [row["key"] for row in report["results"]] == ["batch/t1/b4/score", "concurrent/t1/e1/b4/score"]
+    assert all(row["windows_per_s"] > 0 and row["p95_ms"] >= row["p50_ms"] for row in report["results"])
+    assert compare(report, report) == []
+
+    faster_baseline = {"results": [{**row, "windows_per_s": row["windows_per_s"] * 2} for row in report["results"]]}
+    assert [r["key"] for r in compare(report, faster_baseline)] == [row["key"] for row in report["results"]]
+
+    # A model that fails to load aborts the run instead of timing error results
+    with pytest.raises(RuntimeError, match="Failed to load"):
+        run_benchmark(checkpoint_dir, n_windows=16, repeats=1, backend="missing", grid=grid)
+
+
+@pytest.mark.asyncio
+async def test_autotune_applies_fastest_config_and_respects_pins(make_windows, checkpoint_dir):
+    import torch
+    from server.ml.pulsenet.autotune import autotune, candidate_pairs
+
+    assert candidate_pairs(4) == [(1, 1), (2, 1), (1, 2), (4, 1), (2, 2), (1, 4)]
+    assert all(threads * workers <= 32 for threads, workers in candidate_pairs(32))
+
+    threads = torch.get_num_threads()
+    svc = PulseNetInferenceService(str(checkpoint_dir), max_batch_size=8)
+    assert svc.load()
+    try:
+        report = await autotune(svc, pinned={"max_batch_size"}, n_windows=32, repeats=1, cpu_count=2)
+    finally:
+        torch.set_num_threads(threads)
+
+    chosen = report["chosen"]
+    assert chosen["max_batch_size"] == 8
+    assert (chosen["torch_threads"], chosen["executor_workers"]) in candidate_pairs(2) + [(threads, 2)]
+    assert svc.get_runtime_config()["executor_workers"] == chosen["executor_workers"]
+    assert svc._gate.permits == chosen["executor_workers"]
+    assert len(report["trials"]) >= 3
+    assert "error" not in await svc.infer(make_windows(1)[0], ResultDetail.score)
@@ -0,0 +1,201 @@
+"""Tests for the PulseNet model registry and hot reload."""
+
+import asyncio
+import shutil
+
+import pytest
+
+from server.ml.pulsenet.inference import PulseNetInferenceService, ResultDetail, StaleProjectionError
+from server.ml.pulsenet.registry import BASE_VERSION, ModelRegistry
+
+torch = pytest.importorskip("torch")
+
+
+@pytest.fixture
+def registry(tmp_path, checkpoint_dir):
+    """A registry root holding the shipped checkpoint as `base` plus a shifted `v2`."""
+    root = tmp_path / "checkpoints"
+    staging = tmp_path / "v2-output"
+    root.mkdir()
+    staging.mkdir()
+    for path in [*checkpoint_dir.glob("*.pt"), *checkpoint_dir.glob("*.npy")]:
+        shutil.copy(path, root / path.name)
+    for path in checkpoint_dir.glob("*.npy"):
+        shutil.copy(path, staging / path.name)
+    checkpoint = torch.load(root / "pulsenet_best.pt", map_location="cpu", weights_only=False)
+    checkpoint["model_state_dict"]["anomaly_head.2.bias"] += 2.0
+    torch.save(checkpoint, staging / "pulsenet_best.pt")
+
+    registry = ModelRegistry(root)
+    assert registry.register(staging, "v2") == "v2"
+    return registry
+
+
+def test_registry_lists_and_resolves_versions(registry):
+    versions = [entry["version"] for entry in registry.list_versions()]
+    assert versions == [BASE_VERSION, "v2"]
+    assert registry.version_dir("v2") == registry.root / "versions" / "v2"
+    with pytest.raises(KeyError):
+        registry.version_dir("../v2")
+    with pytest.raises(FileExistsError):
+        registry.register(registry.version_dir("v2"), "v2")
+
+    assert registry.get_active() is None
+    registry.set_active("v2")
+    assert registry.get_active() == "v2"
+
+
+@pytest.mark.asyncio
+async def test_hot_swap_and_rollback_while_serving(registry, make_windows):
+    service = PulseNetInferenceService(str(registry.root), max_batch_size=8, max_batch_wait_ms=5.0)
+    service.version = BASE_VERSION
+    assert service.load()
+    windows = make_windows(4)
+    base_scores = [r["overall_score"] for r in service.infer_batch_sync(windows, ResultDetail.score)]
+    generation = service.generation
+
+    async def traffic():
+        results = []
+        for _ in range(20):
+            results += await asyncio.gather(*(service.infer(w, ResultDetail.score) for w in windows))
+        return results
+
+    served, info = await asyncio.gather(traffic(), service.hot_swap(registry.version_dir("v2"), "v2"))
+
+    assert all("error" not in r for r in served)
+    assert info["version"] == "v2" and info["previous_versions"] == [BASE_VERSION]
+    assert info["reload"]["state"] == "active"
+    assert service.generation == generation + 1
+    v2_scores = [r["overall_score"] for r in service.infer_batch_sync(windows, ResultDetail.score)]
+    assert all(v2 > base for v2, base in zip(v2_scores, base_scores))
+
+    info = await service.rollback()
+    assert info["version"] == BASE_VERSION and info["previous_versions"] == []
+    rolled_back = [r["overall_score"] for r in service.infer_batch_sync(windows, ResultDetail.score)]
+    assert rolled_back == pytest.approx(base_scores, abs=1e-6)
+    with pytest.raises(RuntimeError):
+        await service.rollback()
+
+
+@pytest.mark.asyncio
+async def test_projected_windows_queued_across_a_swap_are_reprojected(registry, health, monkeypatch, make_windows):
+    from server.config import settings
+    from server.services import anomaly_detection
+
+    service = PulseNetInferenceService(str(registry.root), max_batch_size=8, max_batch_wait_ms=500.0)
+    assert service.load()
+    candidate = PulseNetInferenceService(str(registry.version_dir("v2")), max_batch_size=1)
+    assert candidate.load()
+    monkeypatch.setattr(anomaly_detection, "pulsenet_service", service)
+    monkeypatch.setattr(settings, "PULSENET_INCREMENTAL_PROJECTION", True)
+    detector = anomaly_detection.AnomalyDetectionService()
+
+    window = make_windows(1)[0]
+    for hr, hrv, accel, temp in window:
+        await health.ingest_reading({
+            "device_id": "dev-1", "heart_rate": hr, "hrv": hrv, "acceleration": accel, "skin_temp": temp,
+        })
+    old_generation = service.generation
+    stale = service.project_readings(window)
+
+    # The window waits in the micro-batcher while the swap adopts the new model
+    scoring = asyncio.create_task(detector.process_reading("dev-1", {}))
+    while service.get_batching_stats()["pending"] == 0:
+        await asyncio.sleep(0)
+    service._adopt(candidate, None)
+    result = await scoring
+
+    assert health.projection_cache.generation == service.generation == old_generation + 1
+    expected = candidate.infer_batch_sync(window[None], ResultDetail.score)[0]
+    assert result["overall_score"] == pytest.approx(expected["overall_score"], abs=1e-5)
+    with pytest.raises(StaleProjectionError):
+        await service.infer_projected(stale, generation=old_generation)
+
+
+@pytest.mark.asyncio
+async def test_failed_swap_keeps_serving_model(registry, make_windows):
+    service = PulseNetInferenceService(str(registry.root), max_batch_size=1)
+    assert service.load()
+    broken = registry.root / "versions" / "broken"
+    broken.mkdir()
+    (broken / "pulsenet_best.pt").write_bytes(b"not a checkpoint")
+
+    with pytest.raises(RuntimeError):
+        await service.hot_swap(broken, "broken")
+
+    assert service.reload_status["state"] == "failed"
+    assert service.version is None and service.checkpoint_dir == registry.root
+    assert "error" not in await service.infer(make_windows(1)[0], ResultDetail.score)
+
+
+def test_model_admin_endpoints(registry, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from server.config import settings
+    from server.main import app
+
+    monkeypatch.setattr(settings, "PULSENET_CHECKPOINT_DIR", str(registry.root))
+    client = TestClient(app)
+
+    # No configured token: the endpoints stay closed, even to callers sending an empty one
+    monkeypatch.setattr(settings, "PULSENET_ADMIN_TOKEN", "")
+    assert client.get("/api/pulsenet/models").status_code == 503
+    assert client.post("/api/pulsenet/shadow/stop", headers={"X-Admin-Token": ""}).status_code == 503
+
+    monkeypatch.setattr(settings, "PULSENET_ADMIN_TOKEN", "secret")
+    assert client.get("/api/pulsenet/models").status_code == 403
+    assert client.get("/api/pulsenet/models", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    headers = {"X-Admin-Token": "secret"}
+    listing = client.get("/api/pulsenet/models", headers=headers).json()
+    assert [v["version"] for v in listing["versions"]] == [BASE_VERSION, "v2"]
+    assert client.post("/api/pulsenet/models/nope/activate", headers=headers).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_shadow_lane_compares_and_drops_when_saturated(registry, make_windows):
+    from server.services.shadow_evaluation import ShadowEvaluator
+
+    primary = PulseNetInferenceService(str(registry.root), max_batch_size=1)
+    assert primary.load()
+    windows = make_windows(10)
+    primary_results = primary.infer_batch_sync(windows, ResultDetail.score)
+
+    shadow = ShadowEvaluator(sample_rate=1.0, queue_size=4)
+    await shadow.start(registry.version_dir("v2"), "v2")
+    try:
+        assert shadow.should_sample()
+        # offer never waits: the queue takes 4 and the rest are dropped
+        accepted = [shadow.offer(w, r) for w, r in zip(windows, primary_results)]
+        assert accepted == [True] * 4 + [False] * 6
+        for _ in range(200):
+            if shadow.evaluated == 4:
+                break
+            await asyncio.sleep(0.01)
+
+        stats = shadow.get_stats()
+        assert stats["sampled"] == 10 and stats["dropped"] == 6 and stats["evaluated"] == 4
+        assert stats["queue_depth"] == 0 and stats["window"] == 4
+        assert stats["mean_delta"] > 0  # v2's anomaly head is shifted up
+        assert 0.0 <= stats["disagreement_rate"] <= 1.0
+
+        # Error results and unscorable windows are counted, and the consumer keeps running
+        assert shadow.offer(windows[0], {"error": "Model not loaded"})
+        for _ in range(200):
+            if shadow.errors == 1:
+                break
+            await asyncio.sleep(0.01)
+        assert shadow.offer(windows[0][:, :3], primary_results[0])
+        for _ in range(200):
+            if shadow.errors == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert shadow.offer(windows[0], primary_results[0])
+        for _ in range(200):
+            if shadow.evaluated == 5:
+                break
+            await asyncio.sleep(0.01)
+        assert shadow.get_stats()["errors"] == 2 and shadow.evaluated == 5 and shadow.dropped == 6
+    finally:
+        await shadow.stop()
+        primary.shutdown()
+    assert not shadow.active and not shadow.should_sample()